@@ -0,0 +1,280 @@
+# bench.py
+"""
+Benchmarks reproducibles de los caminos críticos del tablero, la validación y la IA.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench                        # mide y compara con baseline.json
+    python -m benchmarks.bench --tamanos 12 20        # solo algunos tamaños
+    python -m benchmarks.bench --guardar-baseline --nota "motivo"  # reemplaza la línea base
+
+Todas las métricas son microsegundos por operación (menor es mejor); cada
+una es el mejor valor de varias rondas para filtrar el ruido de la máquina.
+`calibracion_us` mide un bucle fijo del intérprete para saber si la máquina
+va más lenta que al grabar la línea base. Una métrica empeora si supera a la
+línea base en más del umbral (20 % por defecto, estirado por esa lentitud) y
+la regresión se repite al volver a medir ese tamaño (`--confirmar` veces);
+en ese caso el proceso termina con código 1. La línea
+base guardada solo es comparable en la misma máquina, y `--nota` deja
+escrito por qué se reemplazó.
+
+`referencia_7031feb.json` es una medición del árbol del commit que introdujo
+estos benchmarks (ya con las peticiones user-001 a user-012), hecha en la
+misma máquina y sesión alternando ejecuciones; si existe, se imprime la
+aceleración respecto a ella de cada métrica. El árbol original no tiene la
+API que usa este script: `referencia.py` lo compara con las operaciones
+comunes a todas las versiones.
+"""
+import json
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.medicion import aceleraciones, bucle_calibracion, medir_operacion
+from src.ai.mcts import LoteSimulaciones
+from src.ai.solver import Solver
+from src.ai.state import TwixtState
+from src.Ficha import Ficha
+from src.Jugador import Jugador
+from src.Muralla import Muralla
+from src.RegistroPartida import RegistroPartida, reproducir
+from src.Tablero import Tablero, etiquetas_filas
+
+TAMANOS = (12, 20, 24, 48)
+BASELINE = Path(__file__).with_name("baseline.json")
+REFERENCIA = Path(__file__).with_name("referencia_7031feb.json")
+UMBRAL = 0.20
+SEMILLA = 2024
+
+
+def _tablero(n: int) -> Tablero:
+    return Tablero(etiquetas_filas(n), list(range(1, n + 1)))
+
+
+def _partida(n: int, n_jugadas: int):
+    """
+    Media partida reproducible sobre `Tablero`: fichas a un salto de las propias
+    y, cuando se puede, la muralla que las une.
+    """
+    rng = random.Random(SEMILLA + n)
+    tablero = _tablero(n)
+    jugadores = [Jugador("A", "A"), Jugador("B", "B")]
+    for turno in range(n_jugadas):
+        jugador = jugadores[turno % 2]
+        vertical = jugador.is_vertical_player
+        candidatas = sorted(tablero.fichas_posibles(vertical)) or list(range(n * n))
+        for celda in rng.sample(candidatas, min(len(candidatas), 8)):
+            ficha = Ficha.desde_celda(celda, tablero, jugador.symbol, vertical)
+            if ficha.anadir_ficha():
+                jugador.add_piece(ficha)
+                break
+        murallas = sorted(tablero.murallas_posibles(vertical))
+        if murallas:
+            a, b = rng.choice(murallas)
+            f1 = next(f for f in jugador.pieces if f.celda == a)
+            f2 = next(f for f in jugador.pieces if f.celda == b)
+            muralla = Muralla(tablero, f1, f2, vertical)
+            if muralla.anadir_muralla():
+                jugador.add_wall(muralla)
+    return tablero, jugadores
+
+
+def _registros(n: int, n_partidas: int) -> list:
+    """Registros binarios de partidas reproducibles con jugadas enfocadas al azar, hasta que alguien gana."""
+    rng = random.Random(SEMILLA + n)
+    registros = []
+    for _ in range(n_partidas):
+        state = TwixtState(n, n)
+        acciones = []
+        while state.winner is None:
+            jugadas = state.focused_moves()
+            if not jugadas:
+                break
+            jugada = rng.choice(jugadas)
+            acciones.append(2 * jugada + state.turn)
+            state.make(jugada)
+        registros.append(RegistroPartida(n, n, acciones).a_bytes())
+    return registros
+
+
+def medir_tamano(n: int, tiempo_busqueda: float = 0.5) -> dict:
+    """
+    Mide todas las operaciones sobre un tablero de `n` x `n`.
+
+    Returns:
+        Diccionario métrica -> microsegundos por operación.
+    """
+    resultados = {"calibracion_us": medir_operacion(bucle_calibracion, 1)}
+    filas = etiquetas_filas(n)
+    columnas = list(range(1, n + 1))
+    celdas = [(fila, columna) for fila in filas for columna in columnas]
+
+    resultados["tablero_init_us"] = medir_operacion(lambda: Tablero(filas, columnas), 1)
+
+    tablero, jugadores = _partida(n, n)
+    resultados["validar_posicion_us"] = medir_operacion(
+        lambda: [tablero.validar_posicion(x, y, False, True) for x, y in celdas], len(celdas)
+    )
+
+    # Colocar fichas en un tablero limpio: se mide solo recibir_pieza
+    libres = [c for c in range(n * n) if tablero.validar_celda(c, False, True)][: n * 2]
+
+    def colocar():
+        nuevo = _tablero(n)
+        fichas = [Ficha.desde_celda(c, nuevo, "A", True) for c in libres]
+        inicio = time.perf_counter()
+        for ficha in fichas:
+            nuevo.recibir_pieza(ficha, True, True, "A")
+        return time.perf_counter() - inicio
+
+    resultados["recibir_pieza_us"] = min(colocar() for _ in range(5)) / len(libres) * 1e6
+
+    jugador = jugadores[0]
+    pares = [
+        (f1, f2)
+        for f1 in jugador.pieces
+        for f2 in jugador.pieces
+        if abs(f1.idx_x - f2.idx_x) == 2 and f2.idx_y - f1.idx_y == 2
+    ] or [(jugador.pieces[0], jugador.pieces[-1])]
+    resultados["muralla_init_us"] = medir_operacion(
+        lambda: [Muralla(tablero, f1, f2, True) for f1, f2 in pares], len(pares)
+    )
+
+    resultados["movimientos_tablero_us"] = medir_operacion(
+        lambda: [tablero.conocer_movimientos_posibles(j) for j in jugadores for _ in range(50)], 100
+    )
+
+    state = TwixtState.from_tablero(tablero, jugadores[0], jugadores[1])
+    resultados["legal_moves_us"] = medir_operacion(lambda: [state.legal_moves() for _ in range(20)], 20)
+    resultados["focused_moves_us"] = medir_operacion(lambda: [state.focused_moves() for _ in range(20)], 20)
+    resultados["conecta_bordes_us"] = medir_operacion(
+        lambda: [state.bits.conecta_bordes(j) for j in (0, 1) for _ in range(500)], 1000
+    )
+    jugadas = state.legal_moves()
+
+    def make_unmake():
+        for jugada in jugadas:
+            state.make(jugada)
+            state.unmake()
+
+    resultados["make_unmake_us"] = medir_operacion(make_unmake, len(jugadas))
+
+    lote = LoteSimulaciones(n, n)
+    rng = random.Random(SEMILLA)
+    resultados["playout_us"] = medir_operacion(lambda: lote.simular(state, 16, rng), 16, repeticiones=3)
+
+    registros = _registros(n, 20)
+    acciones = sum(len(RegistroPartida.desde_bytes(datos)) for datos in registros)
+    resultados["reproducir_us"] = medir_operacion(lambda: [reproducir(datos) for datos in registros], acciones)
+
+    solver = Solver(max_time_s=tiempo_busqueda, max_depth=64, tt_mb=8.0)
+    busqueda = solver.solve(state)
+    resultados["nodo_busqueda_us"] = busqueda.elapsed / max(1, busqueda.nodes) * 1e6
+    return resultados
+
+
+def comparar(actual: dict, base: dict, umbral: float) -> list:
+    """
+    Lista las métricas que empeoraron más de `umbral` respecto a la línea base.
+
+    Si la máquina va más lenta que al grabar la línea base (`calibracion_us`
+    mayor), el límite de cada tamaño se estira en la misma proporción.
+
+    Returns:
+        Tuplas (tamaño, métrica, base, actual, cambio relativo).
+    """
+    regresiones = []
+    for tamano, metricas in actual["resultados"].items():
+        base_tamano = base["resultados"].get(tamano, {})
+        lentitud = 1.0
+        if base_tamano.get("calibracion_us") and metricas.get("calibracion_us"):
+            lentitud = max(1.0, metricas["calibracion_us"] / base_tamano["calibracion_us"])
+        for nombre, valor in metricas.items():
+            if nombre == "calibracion_us":
+                continue
+            referencia = base_tamano.get(nombre)
+            if referencia and valor > referencia * lentitud * (1 + umbral):
+                regresiones.append((tamano, nombre, referencia, valor, valor / referencia - 1))
+    return regresiones
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks del tablero, la validación y la IA.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--salida", default=None, help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="Empeoramiento tolerado (0.2 = 20 %%)")
+    parser.add_argument("--busqueda", type=float, default=0.5, help="Segundos de búsqueda por tamaño")
+    parser.add_argument("--rondas", type=int, default=3, help="Rondas por tamaño; se guarda el mejor valor")
+    parser.add_argument(
+        "--confirmar", type=int, default=2, help="Veces que se vuelve a medir un tamaño con regresiones"
+    )
+    parser.add_argument("--referencia", default=str(REFERENCIA))
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--nota", default=None, help="Motivo del cambio de línea base (con --guardar-baseline)")
+    args = parser.parse_args(argv)
+
+    def medir(n: int) -> dict:
+        rondas = [medir_tamano(n, args.busqueda) for _ in range(max(1, args.rondas))]
+        return {nombre: min(r[nombre] for r in rondas) for nombre in rondas[0]}
+
+    resultados = {}
+    for n in args.tamanos:
+        resultados[str(n)] = medir(n)
+        print(f"{n}x{n}: " + ", ".join(f"{k}={v:.2f}" for k, v in resultados[str(n)].items()))
+    informe = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+    }
+    if args.nota:
+        informe["nota"] = args.nota
+    ruta_referencia = Path(args.referencia)
+    if ruta_referencia.exists():
+        referencia = json.loads(ruta_referencia.read_text(encoding="utf-8"))
+        for tamano, cocientes in aceleraciones(informe, referencia).items():
+            if cocientes:
+                print(
+                    f"{tamano}x{tamano} vs referencia: "
+                    + ", ".join(f"{k}={v:.2f}x" for k, v in cocientes.items())
+                )
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(informe, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    ruta_base = Path(args.baseline)
+    if args.guardar_baseline:
+        ruta_base.write_text(json.dumps(informe, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Línea base guardada en {ruta_base}")
+        return 0
+    if not ruta_base.exists():
+        print(f"No hay línea base en {ruta_base}; usa --guardar-baseline")
+        return 0
+    base = json.loads(ruta_base.read_text(encoding="utf-8"))
+    regresiones = comparar(informe, base, args.umbral)
+    # Una máquina cargada enlentece rondas enteras: solo cuenta lo que se repite
+    confirmado = False
+    for _ in range(args.confirmar):
+        if not regresiones:
+            break
+        tamanos = sorted({tamano for tamano, *_ in regresiones}, key=int)
+        print("Confirmando regresiones en " + ", ".join(f"{t}x{t}" for t in tamanos))
+        for tamano in tamanos:
+            nuevas = medir(int(tamano))
+            resultados[tamano] = {k: min(v, nuevas[k]) for k, v in resultados[tamano].items()}
+        regresiones = comparar(informe, base, args.umbral)
+        confirmado = True
+    if args.salida and confirmado:
+        Path(args.salida).write_text(json.dumps(informe, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    for tamano, nombre, referencia, valor, cambio in regresiones:
+        print(f"REGRESIÓN {tamano}x{tamano} {nombre}: {referencia:.2f} -> {valor:.2f} us (+{cambio:.0%})")
+    if not regresiones:
+        print(f"Sin regresiones por encima del {args.umbral:.0%}")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# medicion.py
+"""
+Utilidades de medición compartidas por `bench.py` y `referencia.py`.
+
+No importa nada de `src`, para poder medir también árboles antiguos del
+proyecto que no tienen los módulos actuales.
+"""
+import time
+
+
+def medir_operacion(funcion, operaciones: int, repeticiones: int = 5) -> float:
+    """Mejor tiempo de `repeticiones` llamadas a `funcion`, en microsegundos por operación."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / operaciones * 1e6
+
+
+def bucle_calibracion() -> int:
+    """Trabajo fijo del intérprete que no depende del proyecto: mide la velocidad de la máquina."""
+    tabla = {}
+    total = 0
+    for i in range(2000):
+        tabla[i & 63] = total
+        total += (i * 7) >> 3
+    return total
+
+
+def aceleraciones(actual: dict, referencia: dict) -> dict:
+    """
+    Cociente referencia / actual de cada métrica presente en ambas (>1 es más rápido).
+
+    Si ambas tienen `calibracion_us`, cada tiempo se divide antes por la suya
+    para descontar la diferencia de velocidad de la máquina entre mediciones.
+    """
+    cocientes = {}
+    for tamano, metricas in actual["resultados"].items():
+        base = referencia["resultados"].get(tamano, {})
+        escala = 1.0
+        if base.get("calibracion_us") and metricas.get("calibracion_us"):
+            escala = metricas["calibracion_us"] / base["calibracion_us"]
+        cocientes[tamano] = {
+            nombre: base[nombre] * escala / valor
+            for nombre, valor in metricas.items()
+            if nombre != "calibracion_us" and valor and base.get(nombre)
+        }
+    return cocientes
@@ -0,0 +1,133 @@
+# referencia.py
+"""
+Medición de referencia que solo usa la API común a todas las versiones del
+proyecto, para comparar el árbol actual con el original (d573906), anterior
+a todas las optimizaciones.
+
+El árbol original solo tiene `Tablero(filas, columnas)`, `validar_posicion`,
+`recibir_pieza`, `Ficha` y `Muralla`, así que `bench.py` no puede ejecutarse
+sobre él. Este script mide esas cuatro operaciones en ambos árboles con la
+misma carga: casillas interiores (filas y columnas 2..N-3), que son válidas
+en las dos versiones y no pasan por los mensajes que el original imprime al
+rechazar. Cada métrica es el mejor valor de varias rondas, en microsegundos.
+
+Uso (desde la raíz del repositorio):
+    git worktree add /tmp/original d573906
+    python -m benchmarks.referencia --arbol /tmp/original --salida original.json
+    python -m benchmarks.referencia --comparar original.json   # árbol actual
+
+La máquina es ruidosa: conviene alternar varias ejecuciones de cada árbol.
+"""
+import contextlib
+import json
+import os
+import platform
+import string
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.medicion import aceleraciones, bucle_calibracion, medir_operacion
+
+TAMANOS = (12, 20, 24, 48)
+
+
+def _etiquetas(n: int) -> list:
+    """Etiquetas de fila A..Z, AA..AZ, BA... (el árbol original no tiene `etiquetas_filas`)."""
+    etiquetas = []
+    for i in range(1, n + 1):
+        etiqueta = ""
+        while i:
+            i, resto = divmod(i - 1, 26)
+            etiqueta = string.ascii_uppercase[resto] + etiqueta
+        etiquetas.append(etiqueta)
+    return etiquetas
+
+
+def medir_tamano(n: int, rondas: int = 20) -> dict:
+    """
+    Mide las operaciones comunes sobre un tablero de `n` x `n` del árbol importado.
+
+    Returns:
+        Diccionario métrica -> microsegundos por operación.
+    """
+    from src.Ficha import Ficha
+    from src.Muralla import Muralla
+    from src.Tablero import Tablero
+
+    filas = _etiquetas(n)
+    columnas = list(range(1, n + 1))
+    interiores = [(fila, columna) for fila in filas[2 : n - 2] for columna in columnas[2 : n - 2]]
+    resultados = {"calibracion_us": medir_operacion(bucle_calibracion, 1)}
+    resultados["tablero_init_us"] = medir_operacion(lambda: Tablero(filas, columnas), 1, rondas)
+
+    tablero = Tablero(filas, columnas)
+    resultados["validar_posicion_us"] = medir_operacion(
+        lambda: [tablero.validar_posicion(x, y, False, True) for x, y in interiores], len(interiores), rondas
+    )
+
+    # Fichas separadas un salto en diagonal: también sirven de extremos de murallas
+    casillas = [(x, y) for x, y in interiores if filas.index(x) % 2 == 0 and y % 2 == 1][: n * 2]
+
+    def colocar():
+        nuevo = Tablero(filas, columnas)
+        fichas = [Ficha(x, y, nuevo, "A", True) for x, y in casillas]
+        inicio = time.perf_counter()
+        for ficha in fichas:
+            nuevo.recibir_pieza(ficha, True, True, "A")
+        return time.perf_counter() - inicio
+
+    resultados["recibir_pieza_us"] = min(colocar() for _ in range(rondas)) / len(casillas) * 1e6
+
+    fichas = {(x, y): Ficha(x, y, tablero, "A", True) for x, y in casillas}
+    pares = [
+        (ficha, fichas[(filas[filas.index(x) + 2], y + 2)])
+        for (x, y), ficha in fichas.items()
+        if filas.index(x) + 2 < n and (filas[filas.index(x) + 2], y + 2) in fichas
+    ]
+    resultados["muralla_init_us"] = medir_operacion(
+        lambda: [Muralla(tablero, f1, f2, True) for f1, f2 in pares], len(pares), rondas
+    )
+    return resultados
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Medición con la API común a todas las versiones.")
+    parser.add_argument("--arbol", default=".", help="Raíz del árbol del proyecto a medir")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--salida", default=None, help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de otra ejecución: imprime la aceleración")
+    parser.add_argument("--nota", default=None, help="Qué árbol se midió y cómo")
+    args = parser.parse_args(argv)
+
+    # El árbol medido va primero en la ruta para que `src` sea el suyo
+    sys.path.insert(0, str(Path(args.arbol).resolve()))
+    resultados = {}
+    # El árbol original imprime mensajes de depuración al validar
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for n in args.tamanos:
+            resultados[str(n)] = medir_tamano(n)
+    for tamano, metricas in resultados.items():
+        print(f"{tamano}x{tamano}: " + ", ".join(f"{k}={v:.2f}" for k, v in metricas.items()))
+    informe = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+    }
+    if args.nota:
+        informe["nota"] = args.nota
+    if args.comparar:
+        otra = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        for tamano, cocientes in aceleraciones(informe, otra).items():
+            if cocientes:
+                print(f"{tamano}x{tamano} vs {args.comparar}: " + ", ".join(f"{k}={v:.2f}x" for k, v in cocientes.items()))
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(informe, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
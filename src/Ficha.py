@@ -15,24 +15,35 @@ class Ficha:
         """
         # print(tablero.columnas, tablero.filas)
         self.x = x
-        self.idx_x =  tablero.columnas.index(y)
-        self.idx_y =  tablero.filas.index(x)
+        self.idx_x =  tablero.indice_columna[y]
+        self.idx_y =  tablero.indice_fila[x]
+        self.celda = self.idx_y * len(tablero.columnas) + self.idx_x
         self.vertical_player =  vertical_player
         self.simbolo = f"{simbolo_jugador}"
         self.y = y
         self.tablero = tablero
         # return self.anadir_ficha()
+
+    @classmethod
+    def desde_celda(cls, celda: int, tablero: Tablero, simbolo_jugador: str, vertical_player = True) -> "Ficha":
+        """
+        Crea una ficha a partir de un id de celda del tablero.
+        - parametro celda: Id plano de la celda (ver Tablero.celda_de).
+        """
+        x, y = tablero.coordenadas_de(celda)
+        return cls(x, y, tablero, simbolo_jugador, vertical_player)
         
 
-    def anadir_ficha(self) -> object:
+    def anadir_ficha(self, propietario=None) -> object:
         """
         Añade la ficha al tablero usando el método recibir_pieza del tablero.
         Valida primero si la posición es correcta.
+        - parametro propietario: Jugador al que se agrega la ficha si es válida (opcional).
         - devuelve: El objeto retornado por el tablero si es válida, None si no se añade.
         """
         
 
-        resultado = self.tablero.recibir_pieza(self, True, self.vertical_player, self.simbolo)
+        resultado = self.tablero.recibir_pieza(self, True, self.vertical_player, self.simbolo, propietario)
         if resultado:
             return resultado
         return None
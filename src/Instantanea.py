@@ -0,0 +1,367 @@
+# instantanea.py
+import mmap
+import os
+import struct
+
+from src.TablaCruces import tabla_extremos
+from src.TableroBits import JUGADOR_HORIZONTAL, JUGADOR_VERTICAL
+
+MAGIA_ALMACEN = b"TWXS"
+VERSION = 1
+# Cabecera del almacén: magia, versión, filas, columnas, bytes por registro
+CABECERA = struct.Struct("<4sHHHI")
+
+# Bits del byte de banderas de cada instantánea
+TURNO_B = 1
+GANA_A = 2
+GANA_B = 4
+IA_A = 8
+IA_B = 16
+
+
+def _bits_a_int(indices) -> int:
+    valor = 0
+    for indice in indices:
+        valor |= 1 << indice
+    return valor
+
+
+def _int_a_bits(valor: int):
+    while valor:
+        menor = valor & -valor
+        yield menor.bit_length() - 1
+        valor ^= menor
+
+
+class FormatoInstantanea:
+    """
+    Codificación de ancho fijo de una posición de un tamaño de tablero.
+
+    Cada instantánea ocupa `tamano` bytes:
+    - Fichas de A y de B: un bit por celda (`bytes_celdas` bytes cada una).
+    - Murallas de A y de B: un bit por id de muralla (`bytes_murallas` cada una).
+    - Un byte de banderas: turno, ganador y qué jugadores son IA.
+
+    Como todas miden lo mismo, la posición `i` de un almacén está en
+    `cabecera + i * tamano` y se lee sin recorrer las anteriores.
+
+    Attributes:
+        n_filas: Filas del tablero.
+        n_columnas: Columnas del tablero.
+        tamano: Bytes por instantánea (301 en 20x20).
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int):
+        """
+        Calcula los tamaños para un tablero de `n_filas` x `n_columnas`.
+
+        Args:
+            n_filas: Filas del tablero.
+            n_columnas: Columnas del tablero.
+        """
+        self.n_filas = n_filas
+        self.n_columnas = n_columnas
+        self.n_celdas = n_filas * n_columnas
+        self.bytes_celdas = (self.n_celdas + 7) // 8
+        self.bytes_murallas = (2 * self.n_celdas + 7) // 8
+        self.tamano = 2 * self.bytes_celdas + 2 * self.bytes_murallas + 1
+
+    def _empaquetar_bits(self, bits, banderas: int) -> bytes:
+        bc = self.bytes_celdas
+        bm = self.bytes_murallas
+        return b"".join(
+            (
+                bits.fichas[JUGADOR_VERTICAL].to_bytes(bc, "little"),
+                bits.fichas[JUGADOR_HORIZONTAL].to_bytes(bc, "little"),
+                _bits_a_int(bits.puentes_jugador[JUGADOR_VERTICAL]).to_bytes(bm, "little"),
+                _bits_a_int(bits.puentes_jugador[JUGADOR_HORIZONTAL]).to_bytes(bm, "little"),
+                bytes((banderas,)),
+            )
+        )
+
+    def empaquetar(self, tablero, jugador_a, jugador_b, jugador_actual=None) -> bytes:
+        """
+        Codifica la posición de un `Tablero` y sus dos `Jugador`.
+
+        Args:
+            tablero: Tablero de la partida.
+            jugador_a: Jugador vertical (A).
+            jugador_b: Jugador horizontal (B).
+            jugador_actual: Jugador que mueve; por defecto A.
+
+        Returns:
+            `tamano` bytes.
+        """
+        banderas = 0
+        if jugador_actual is not None and not jugador_actual.is_vertical_player:
+            banderas |= TURNO_B
+        if tablero.winner["is_winner"]:
+            banderas |= GANA_A if tablero.winner["player"] == "A" else GANA_B
+        if jugador_a.is_ai:
+            banderas |= IA_A
+        if jugador_b.is_ai:
+            banderas |= IA_B
+        return self._empaquetar_bits(tablero.bits, banderas)
+
+    def empaquetar_estado(self, state) -> bytes:
+        """Codifica un `TwixtState` (por ejemplo, cada posición del autojuego)."""
+        banderas = TURNO_B if state.turn == JUGADOR_HORIZONTAL else 0
+        if state.winner == JUGADOR_VERTICAL:
+            banderas |= GANA_A
+        elif state.winner == JUGADOR_HORIZONTAL:
+            banderas |= GANA_B
+        return self._empaquetar_bits(state.bits, banderas)
+
+    def desempaquetar(self, datos) -> tuple:
+        """
+        Decodifica una instantánea (bytes o memoryview) sin crear el tablero.
+
+        Returns:
+            (fichas, murallas, banderas): `fichas[jugador]` y `murallas[jugador]`
+            son enteros con un bit por celda o por id de muralla.
+        """
+        bc = self.bytes_celdas
+        bm = self.bytes_murallas
+        inicio_murallas = 2 * bc
+        fichas = (
+            int.from_bytes(datos[:bc], "little"),
+            int.from_bytes(datos[bc:inicio_murallas], "little"),
+        )
+        murallas = (
+            int.from_bytes(datos[inicio_murallas : inicio_murallas + bm], "little"),
+            int.from_bytes(datos[inicio_murallas + bm : inicio_murallas + 2 * bm], "little"),
+        )
+        return fichas, murallas, datos[self.tamano - 1]
+
+    def restaurar(self, datos, filas=None, columnas=None) -> tuple:
+        """
+        Reconstruye el `Tablero` y los dos `Jugador` de una instantánea.
+
+        Args:
+            datos: Instantánea (bytes o memoryview).
+            filas: Etiquetas de fila; por defecto A, B, ... (ver `etiquetas_filas`).
+            columnas: Etiquetas de columna; por defecto 1..n.
+
+        Returns:
+            (tablero, jugador_a, jugador_b, jugador_actual).
+        """
+        from src.Ficha import Ficha
+        from src.Jugador import Jugador
+        from src.Muralla import Muralla
+        from src.Tablero import Tablero, etiquetas_filas
+
+        fichas, murallas, banderas = self.desempaquetar(datos)
+        tablero = Tablero(
+            filas or etiquetas_filas(self.n_filas),
+            columnas or list(range(1, self.n_columnas + 1)),
+        )
+        jugador_a = Jugador("Jugador A", "A", is_ai=bool(banderas & IA_A))
+        jugador_b = Jugador("Jugador B", "B", is_ai=bool(banderas & IA_B))
+        extremos = tabla_extremos(self.n_filas, self.n_columnas)
+        for indice, jugador in ((JUGADOR_VERTICAL, jugador_a), (JUGADOR_HORIZONTAL, jugador_b)):
+            vertical = jugador.is_vertical_player
+            for celda in _int_a_bits(fichas[indice]):
+                ficha = Ficha.desde_celda(celda, tablero, jugador.symbol, vertical)
+                tablero.colocar_sin_validar(ficha, True, vertical, jugador)
+        for indice, jugador in ((JUGADOR_VERTICAL, jugador_a), (JUGADOR_HORIZONTAL, jugador_b)):
+            vertical = jugador.is_vertical_player
+            for id_muralla in _int_a_bits(murallas[indice]):
+                a, b, _ = extremos[id_muralla]
+                muralla = Muralla(tablero, jugador.get_piece_by_cell(a), jugador.get_piece_by_cell(b), vertical)
+                tablero.colocar_sin_validar(muralla, False, vertical, jugador)
+        jugador_actual = jugador_b if banderas & TURNO_B else jugador_a
+        return tablero, jugador_a, jugador_b, jugador_actual
+
+    def a_estado(self, datos):
+        """Reconstruye un `TwixtState` (más rápido que `restaurar`, sin la capa de consola)."""
+        from src.ai.state import TwixtState
+
+        fichas, murallas, banderas = self.desempaquetar(datos)
+        state = TwixtState(
+            self.n_filas, self.n_columnas, JUGADOR_HORIZONTAL if banderas & TURNO_B else JUGADOR_VERTICAL
+        )
+        for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+            for celda in _int_a_bits(fichas[jugador]):
+                state.place(jugador, celda)
+        for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+            for id_muralla in _int_a_bits(murallas[jugador]):
+                state.place(jugador, state.wall_move(id_muralla))
+        return state
+
+
+class AlmacenInstantaneas:
+    """
+    Archivo de instantáneas de ancho fijo, con escritura por anexado y lectura vía `mmap`.
+
+    La lectura mapea el archivo en memoria: `almacen[i]` devuelve un
+    `memoryview` de la instantánea `i` sin copiarla ni leer el resto del
+    archivo, y recorrer el almacén avanza secuencialmente por el mapa (el
+    sistema operativo lee por adelantado), así que el recorrido va a la
+    velocidad del disco. Tras `agregar` el mapa se vuelve a crear en la
+    siguiente lectura.
+
+    Uso:
+        with AlmacenInstantaneas("posiciones.twxs", 20, 20) as almacen:
+            almacen.agregar(almacen.formato.empaquetar_estado(state))
+            tablero, a, b, actual = almacen.formato.restaurar(almacen[0])
+
+    Attributes:
+        ruta: Archivo del almacén.
+        formato: `FormatoInstantanea` del tamaño de tablero del archivo.
+    """
+
+    def __init__(self, ruta: str, n_filas=None, n_columnas=None):
+        """
+        Abre (o crea) un almacén.
+
+        Args:
+            ruta: Archivo del almacén.
+            n_filas: Filas del tablero; obligatorio solo si el archivo no existe.
+            n_columnas: Columnas del tablero; obligatorio solo si el archivo no existe.
+
+        Raises:
+            ValueError: Si el archivo no es un almacén o su tamaño de tablero no coincide.
+        """
+        self.ruta = str(ruta)
+        existe = os.path.exists(self.ruta) and os.path.getsize(self.ruta) > 0
+        if existe:
+            with open(self.ruta, "rb") as archivo:
+                cabecera = archivo.read(CABECERA.size)
+            if len(cabecera) < CABECERA.size:
+                raise ValueError(f"{self.ruta} no es un almacén de instantáneas")
+            magia, version, filas, columnas, tamano = CABECERA.unpack(cabecera)
+            if magia != MAGIA_ALMACEN or version != VERSION:
+                raise ValueError(f"{self.ruta} no es un almacén de instantáneas")
+            if (n_filas, n_columnas) not in ((None, None), (filas, columnas)):
+                raise ValueError(f"{self.ruta} guarda tableros de {filas}x{columnas}")
+            self.formato = FormatoInstantanea(filas, columnas)
+        else:
+            if n_filas is None or n_columnas is None:
+                raise ValueError("Un almacén nuevo necesita n_filas y n_columnas")
+            self.formato = FormatoInstantanea(n_filas, n_columnas)
+            with open(self.ruta, "wb") as archivo:
+                archivo.write(
+                    CABECERA.pack(MAGIA_ALMACEN, VERSION, n_filas, n_columnas, self.formato.tamano)
+                )
+        self.tamano = self.formato.tamano
+        self._escritura = None
+        self._archivo = None
+        self._mapa = None
+
+    def agregar(self, instantanea: bytes) -> int:
+        """
+        Anexa una instantánea al final del archivo.
+
+        Returns:
+            Índice de la instantánea agregada.
+
+        Raises:
+            ValueError: Si no mide `formato.tamano` bytes.
+        """
+        if len(instantanea) != self.tamano:
+            raise ValueError(f"La instantánea debe medir {self.tamano} bytes")
+        if self._escritura is None:
+            self._escritura = open(self.ruta, "ab")
+        self._escritura.write(instantanea)
+        self._soltar_mapa()
+        return (self._escritura.tell() - CABECERA.size) // self.tamano - 1
+
+    def agregar_varias(self, instantaneas) -> None:
+        """Anexa varias instantáneas con una sola escritura."""
+        datos = b"".join(instantaneas)
+        if len(datos) % self.tamano:
+            raise ValueError(f"Cada instantánea debe medir {self.tamano} bytes")
+        if self._escritura is None:
+            self._escritura = open(self.ruta, "ab")
+        self._escritura.write(datos)
+        self._soltar_mapa()
+
+    def _soltar_mapa(self) -> None:
+        if self._mapa is not None:
+            try:
+                self._mapa.close()
+            except BufferError:
+                # Aún hay vistas entregadas: el mapa se libera cuando dejen de usarse
+                pass
+            self._archivo.close()
+            self._mapa = self._archivo = None
+
+    def _mapear(self) -> mmap.mmap:
+        if self._mapa is None:
+            if self._escritura is not None:
+                self._escritura.flush()
+            self._archivo = open(self.ruta, "rb")
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._mapa, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._mapa.madvise(mmap.MADV_SEQUENTIAL)
+        return self._mapa
+
+    def __len__(self) -> int:
+        if self._escritura is not None:
+            self._escritura.flush()
+        return (os.path.getsize(self.ruta) - CABECERA.size) // self.tamano
+
+    def __getitem__(self, indice: int) -> memoryview:
+        """Instantánea `indice` como `memoryview` sobre el mapa (sin copiar)."""
+        mapa = self._mapear()
+        n = (len(mapa) - CABECERA.size) // self.tamano
+        if indice < 0:
+            indice += n
+        if not 0 <= indice < n:
+            raise IndexError("Índice de instantánea fuera de rango")
+        inicio = CABECERA.size + indice * self.tamano
+        return memoryview(mapa)[inicio : inicio + self.tamano]
+
+    def __iter__(self):
+        """Recorre las instantáneas en orden como `memoryview` sobre el mapa."""
+        mapa = self._mapear()
+        tamano = self.tamano
+        n = (len(mapa) - CABECERA.size) // tamano
+        vista = memoryview(mapa)
+        for inicio in range(CABECERA.size, CABECERA.size + n * tamano, tamano):
+            yield vista[inicio : inicio + tamano]
+
+    def cerrar(self) -> None:
+        """Cierra el mapa y el archivo de escritura (las vistas entregadas dejan de ser válidas)."""
+        self._soltar_mapa()
+        if self._escritura is not None:
+            self._escritura.close()
+            self._escritura = None
+
+    def __enter__(self) -> "AlmacenInstantaneas":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Consulta un almacén de instantáneas TWIXT.")
+    parser.add_argument("ruta", help="Archivo del almacén")
+    parser.add_argument("--indice", type=int, default=None, help="Muestra el tablero de esa posición")
+    args = parser.parse_args()
+
+    with AlmacenInstantaneas(args.ruta) as almacen:
+        formato = almacen.formato
+        if args.indice is not None:
+            tablero, _, _, actual = formato.restaurar(almacen[args.indice])
+            tablero.mostrar_tablero()
+            print(f"Turno de {actual.player_id.value}; ganador: {tablero.winner['player'] or '-'}")
+        else:
+            inicio = time.perf_counter()
+            ganadas = [0, 0]
+            for instantanea in almacen:
+                banderas = instantanea[formato.tamano - 1]
+                ganadas[0] += bool(banderas & GANA_A)
+                ganadas[1] += bool(banderas & GANA_B)
+            segundos = time.perf_counter() - inicio
+            n = len(almacen)
+            print(
+                f"{n} posiciones de {formato.n_filas}x{formato.n_columnas} ({formato.tamano} bytes c/u), "
+                f"{ganadas[0]} con victoria de A y {ganadas[1]} de B"
+            )
+            if segundos:
+                print(f"Recorrido: {n * formato.tamano / segundos / 1e6:.0f} MB/s")
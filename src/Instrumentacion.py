@@ -0,0 +1,207 @@
+# instrumentacion.py
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from typing import Optional
+
+# Medidor activo; None (por defecto) desactiva toda la instrumentación. Los
+# puntos de medición solo comprueban `instrumentacion.actual is not None`, así
+# que con la capa apagada el costo es una consulta de atributo por llamada.
+actual: Optional["Medidor"] = None
+
+
+class Medidor:
+    """
+    Recolecta métricas por turno y las escribe como JSON lines.
+
+    `Juego`, `Tablero.recibir_pieza`, `Muralla.anadir_muralla` y los
+    buscadores de la IA informan al medidor activo (`actual`):
+
+    - `fase(nombre, segundos, desde)`: tiempo de pared acumulado por fase del
+      turno. Las fases se anidan (`muralla.anadir` llama a `recibir_pieza`,
+      que informa `tablero.validar` y `tablero.aplicar`); una fase que
+      envuelve a otras pasa `desde=marca()` tomada al empezar y se le resta lo
+      que informaron las internas, así que cada fase cuenta solo su tiempo
+      exclusivo y las fases de un turno se pueden sumar sin contar dos veces.
+    - `busqueda(...)`: nodos, nodos/s, aciertos de la tabla de transposición
+      y factor de ramificación de cada búsqueda.
+
+    Al cerrar cada turno (`terminar_turno`) se escribe una línea con las
+    fases, las búsquedas y la variación de bloques de memoria asignados
+    (`sys.getallocatedblocks`). Opcionalmente, los turnos se perfilan con
+    `cProfile` y se miden con `tracemalloc` (pico y principales líneas que
+    reservan memoria).
+
+    Attributes:
+        salida: Flujo de texto donde se escriben las líneas JSON.
+        perfil: `cProfile.Profile` activo durante los turnos, o None.
+        memoria: True si se mide con `tracemalloc`.
+        turnos: Turnos escritos.
+    """
+
+    def __init__(self, salida=None, ruta_perfil: Optional[str] = None, memoria: bool = False):
+        """
+        Prepara el medidor (sin activarlo; ver `activar`).
+
+        Args:
+            salida: Ruta del archivo JSON lines o flujo de texto; por defecto `sys.stderr`.
+            ruta_perfil: Archivo donde guardar las estadísticas de `cProfile`
+                (se leen con `pstats`); None para no perfilar.
+            memoria: Si se activa `tracemalloc` para medir reservas por turno.
+        """
+        self._ruta = salida if isinstance(salida, str) else None
+        self.salida = open(salida, "a", encoding="utf-8") if self._ruta else (salida or sys.stderr)
+        self.ruta_perfil = ruta_perfil
+        self.perfil = cProfile.Profile() if ruta_perfil else None
+        self.memoria = memoria
+        self.turnos = 0
+        self._contexto: dict = {}
+        self._fases: dict = {}
+        self._medido = 0.0
+        self._busquedas: list = []
+        self._inicio = None
+        self._bloques = 0
+        self._instantanea = None
+
+    def iniciar_turno(self, **contexto) -> None:
+        """Empieza a medir un turno; `contexto` se copia a su línea (jugador, ia, ...)."""
+        self._contexto = contexto
+        self._bloques = sys.getallocatedblocks()
+        if self.memoria:
+            tracemalloc.reset_peak()
+            self._instantanea = tracemalloc.take_snapshot()
+        if self.perfil is not None:
+            self.perfil.enable()
+        self._inicio = time.perf_counter()
+
+    def marca(self) -> float:
+        """Tiempo ya informado en el turno; se pasa a `fase(..., desde=)` al cerrar una fase que envuelve a otras."""
+        return self._medido
+
+    def fase(self, nombre: str, segundos: float, desde: Optional[float] = None) -> None:
+        """
+        Suma el tiempo exclusivo de una llamada a la fase `nombre` del turno.
+
+        Args:
+            nombre: Fase, p. ej. "tablero.validar".
+            segundos: Tiempo de pared de la llamada completa.
+            desde: `marca()` tomada al empezar la llamada; se descuenta lo que
+                informaron las fases anidadas desde entonces.
+        """
+        if desde is not None:
+            segundos -= self._medido - desde
+        self._medido += segundos
+        fase = self._fases.get(nombre)
+        if fase is None:
+            self._fases[nombre] = [1, segundos]
+        else:
+            fase[0] += 1
+            fase[1] += segundos
+
+    def busqueda(
+        self,
+        motor: str,
+        resultado,
+        tt_consultas: Optional[int] = None,
+        tt_aciertos: Optional[int] = None,
+        ramificacion: Optional[float] = None,
+    ) -> None:
+        """
+        Anota una búsqueda de la IA.
+
+        Args:
+            motor: Nombre del buscador ("minimax", "mcts", "paralelo", "libro").
+            resultado: `ResultadoBusqueda` devuelto.
+            tt_consultas: Consultas a la tabla de transposición en esta búsqueda.
+            tt_aciertos: Consultas que encontraron la posición.
+            ramificacion: Factor de ramificación efectivo.
+        """
+        registro = {
+            "motor": motor,
+            "profundidad": resultado.depth,
+            "nodos": resultado.nodes,
+            "segundos": resultado.elapsed,
+            "nodos_por_s": resultado.nodes / resultado.elapsed if resultado.elapsed else 0.0,
+        }
+        if tt_consultas is not None:
+            registro["tt_consultas"] = tt_consultas
+            registro["tt_aciertos"] = tt_aciertos
+            registro["tt_tasa_aciertos"] = tt_aciertos / tt_consultas if tt_consultas else 0.0
+        if ramificacion is not None:
+            registro["ramificacion"] = ramificacion
+        self._busquedas.append(registro)
+
+    def terminar_turno(self) -> dict:
+        """Cierra el turno, escribe su línea JSON y la devuelve."""
+        segundos = time.perf_counter() - self._inicio if self._inicio is not None else 0.0
+        if self.perfil is not None:
+            self.perfil.disable()
+        linea = {"turno": self.turnos, **self._contexto, "segundos": segundos}
+        linea["fases"] = {
+            nombre: {"llamadas": llamadas, "segundos": total}
+            for nombre, (llamadas, total) in self._fases.items()
+        }
+        linea["busquedas"] = self._busquedas
+        linea["bloques_asignados"] = sys.getallocatedblocks() - self._bloques
+        if self.memoria and self._instantanea is not None:
+            actual_bytes, pico = tracemalloc.get_traced_memory()
+            diferencias = tracemalloc.take_snapshot().compare_to(self._instantanea, "lineno")
+            linea["memoria"] = {
+                "actual_bytes": actual_bytes,
+                "pico_bytes": pico,
+                "principales": [
+                    {"lugar": str(d.traceback), "bytes": d.size_diff, "bloques": d.count_diff}
+                    for d in diferencias[:5]
+                ],
+            }
+            self._instantanea = None
+        self.salida.write(json.dumps(linea, ensure_ascii=False) + "\n")
+        self.salida.flush()
+        self.turnos += 1
+        self._contexto = {}
+        self._fases = {}
+        self._medido = 0.0
+        self._busquedas = []
+        self._inicio = None
+        return linea
+
+    def cerrar(self) -> None:
+        """Escribe un turno pendiente, guarda el perfil y cierra el archivo."""
+        if self._inicio is not None:
+            self.terminar_turno()
+        if self.perfil is not None:
+            self.perfil.dump_stats(self.ruta_perfil)
+        if self._ruta:
+            self.salida.close()
+
+
+def activar(salida=None, ruta_perfil: Optional[str] = None, memoria: bool = False) -> Medidor:
+    """
+    Crea un `Medidor` y lo deja activo para todo el proceso.
+
+    Args:
+        salida: Ruta del archivo JSON lines o flujo; por defecto `sys.stderr`.
+        ruta_perfil: Archivo de estadísticas de `cProfile`, o None.
+        memoria: Si se mide la memoria con `tracemalloc`.
+
+    Returns:
+        El medidor activo.
+    """
+    global actual
+    desactivar()
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    actual = Medidor(salida, ruta_perfil, memoria)
+    return actual
+
+
+def desactivar() -> None:
+    """Cierra el medidor activo, si lo hay, y apaga la instrumentación."""
+    global actual
+    if actual is not None:
+        medidor, actual = actual, None
+        medidor.cerrar()
+        if medidor.memoria and tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -1,11 +1,18 @@
 # juego.py
+import os
+import time
 from typing import Optional, Tuple
-import string
+import src.Instrumentacion as instrumentacion
 from src.Tablero import Tablero
 from src.Jugador import Jugador
 from src.Ficha import Ficha
-from src.Muralla import Muralla
-
+from src.Partida import Partida, etiquetas_tablero
+from src.RegistroPartida import RegistroPartida
+from src.ai.book import LIBRO_20X20, LibroAperturas, SolverConLibro
+from src.ai.mcts import MCTSSolver
+from src.ai.parallel import ParallelSolver
+from src.ai.ponder import SolverConPonder
+from src.ai.solver import Solver
 
 class Juego:
     """Orquestador del flujo del juego TWIXT en consola.
@@ -14,23 +21,89 @@ class Juego:
     - Crear el `Tablero` y los dos `Jugador`.
     - Gestionar el bucle principal por turnos.
     - Solicitar entradas por consola para colocar fichas o murallas.
-    - Invocar a `Ficha` y `Muralla` para aplicar cambios sobre el `Tablero`.
+    - Invocar a `Partida` para aplicar fichas y murallas sobre el `Tablero`.
     - Consultar `tablero.is_winner` para determinar el final de la partida.
 
     Notas de diseño:
     - Las validaciones de posiciones y cruces pertenecen al `Tablero` y a las
-      piezas; aquí solo se maneja el flujo de interacción.
+      piezas, y las acciones del turno a `Partida`; aquí solo se maneja el
+      flujo de interacción por consola.
     - Tras colocar una ficha, se puede preguntar por construir una muralla si
       la función utilizada lo indica (vía un booleano retornado).
+    - Los jugadores marcados como IA juegan mediante `Solver` (alfa-beta con
+      iterative deepening); cada uno conserva su tabla de transposición. Con
+      `workers_ia > 1` (y más de un núcleo) se usa `ParallelSolver`, que
+      reparte las jugadas raíz entre procesos de larga vida. Con `motor_ia="mcts"` se usa `MCTSSolver`.
+    - Con `ponder=True` (por defecto), una IA minimax de un proceso sigue
+      buscando en un hilo la respuesta esperada del rival humano mientras
+      este escribe su jugada (`SolverConPonder`).
+    - Con `grabar=True` (por defecto) cada pieza aceptada se anota en
+      `registro` (`RegistroPartida`); si hay `ruta_registro`, la partida se
+      guarda al terminar.
+    - Si existe el libro de aperturas (`libro`), la IA lo consulta antes de
+      buscar (`SolverConLibro`).
+    - Con `metricas` se activa la instrumentación (`src/Instrumentacion.py`):
+      cada turno escribe una línea JSON con el tiempo por fase y las
+      estadísticas de búsqueda de la IA.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        workers_ia: int = 1,
+        motor_ia: str = "minimax",
+        grabar: bool = True,
+        ruta_registro: Optional[str] = None,
+        libro: Optional[str] = str(LIBRO_20X20),
+        metricas: Optional[str] = None,
+        perfil: Optional[str] = None,
+        memoria: bool = False,
+        ponder: bool = True,
+        n_filas: int = 20,
+        n_columnas: int = 20,
+    ):
         """
         Inicializa el juego, crea tablero y jugadores.
+
+        Args:
+            workers_ia: Procesos por jugador IA, limitados a `os.cpu_count()`;
+                1 busca en el proceso actual.
+            motor_ia: "minimax" (alfa-beta) o "mcts" (Monte Carlo Tree Search).
+            grabar: Si se anotan las jugadas en `registro`.
+            ruta_registro: Archivo donde guardar el registro al terminar
+                (`.txt` para la notación de texto, binario en otro caso).
+            libro: Libro de aperturas (`src/ai/book.py`); None o un archivo
+                inexistente desactiva el libro.
+            metricas: Archivo JSON lines de métricas por turno; None (por
+                defecto) deja la instrumentación apagada.
+            perfil: Con `metricas`, archivo donde guardar el perfil `cProfile`
+                de los turnos.
+            memoria: Con `metricas`, mide la memoria de cada turno con `tracemalloc`.
+            ponder: Si la IA minimax busca durante el turno del rival humano.
+            n_filas: Filas del tablero (hasta `TAMANO_MAXIMO`; desde la 27 las
+                etiquetas son AA, AB, ...).
+            n_columnas: Columnas del tablero.
+
+        Raises:
+            ValueError: Si el motor o el tamaño del tablero no son válidos.
         """
+        if motor_ia not in ("minimax", "mcts"):
+            raise ValueError(f"Motor de IA desconocido: {motor_ia}")
+        self.etiquetas = etiquetas_tablero(n_filas, n_columnas)
+        self.workers_ia = workers_ia
+        self.motor_ia = motor_ia
+        self.partida: Optional[Partida] = None
         self.tablero: Optional[Tablero] = None
         self.jugadores: list[Jugador] = []
-        self.turn_index: int = 0
+        self.solvers: dict = {}
+        self.grabar = grabar
+        self.ruta_registro = ruta_registro
+        self.registro: Optional[RegistroPartida] = None
+        self.ruta_libro = libro
+        self.libro: Optional[LibroAperturas] = None
+        self.metricas = metricas
+        self.perfil = perfil
+        self.memoria = memoria
+        self.ponder = ponder
 
     def _ask_input(self, prompt: str) -> str:
         """Lee una entrada de consola no vacía.
@@ -74,7 +147,7 @@ class Juego:
         """Muestra el menú de acciones del turno y devuelve la selección.
 
         Returns:
-            Uno de los literales: "ficha", "muralla" o "pasar".
+            Uno de los literales: "ficha", "muralla", "pasar" o "deshacer".
 
         Efectos:
             Interactúa con la consola.
@@ -83,14 +156,17 @@ class Juego:
         print("  1) Colocar ficha")
         print("  2) Colocar muralla")
         print("  3) Pasar")
+        print("  4) Deshacer la última ronda")
         while True:
-            choice = input("Opción (1-3): ").strip()
+            choice = input("Opción (1-4): ").strip()
             if choice == "1":
                 return "ficha"
             if choice == "2":
                 return "muralla"
             if choice == "3":
                 return "pasar"
+            if choice == "4":
+                return "deshacer"
             print("Opción inválida. Intenta nuevamente.")
 
     def _ask_letter(self, prompt: str) -> str:
@@ -111,7 +187,8 @@ class Juego:
             value = input(prompt).strip().upper()
             if value in valid_letters:
                 return value
-            print(f"Fila inválida. Debe ser una de: {sorted(valid_letters)}")
+            filas = self.tablero.filas
+            print(f"Fila inválida. Debe estar entre {filas[0]} y {filas[-1]}")
 
     def _ask_int(self, prompt: str) -> int:
         """Solicita un entero de columna válido según el tablero actual.
@@ -133,7 +210,22 @@ class Juego:
                 value = int(raw)
                 if value in valid_columns:
                     return value
-            print(f"Columna inválida. Debe ser una de: {sorted(valid_columns)}")
+            columnas = self.tablero.columnas
+            print(f"Columna inválida. Debe estar entre {columnas[0]} y {columnas[-1]}")
+
+    def _informar_rechazo(self, jugador: Jugador) -> None:
+        """Muestra el motivo por el que el tablero rechazó la última pieza.
+
+        Args:
+            jugador: Jugador que intentó colocar la pieza.
+
+        Efectos:
+            Interactúa con la consola.
+        """
+        assert self.partida is not None, "El tablero no está inicializado"
+        mensaje = self.partida.mensaje_rechazo(jugador)
+        if mensaje is not None:
+            print(mensaje)
 
     def _list_player_pieces(self, jugador: Jugador) -> None:
         """Muestra las fichas del jugador con índice y coordenadas.
@@ -208,39 +300,86 @@ class Juego:
         """
         print("\nBienvenido a TWIXT\n")
 
-        filas = list(string.ascii_uppercase[:20])
-        columnas = list(range(1, 21))
-        self.tablero = Tablero(filas, columnas)
-
         nombre_a = input("Nombre del Jugador A (enter para 'Jugador A'): ").strip() or "Jugador A"
         nombre_b = input("Nombre del Jugador B (enter para 'Jugador B'): ").strip() or "Jugador B"
-        jugador_a = Jugador(nombre_a, "A")
-        jugador_b = Jugador(nombre_b, "B")
-        self.jugadores = [jugador_a, jugador_b]
-        self.turn_index = 0
+        ia_a = self._ask_yes_no(f"¿{nombre_a} (vertical) será controlado por la IA?")
+        ia_b = self._ask_yes_no(f"¿{nombre_b} (horizontal) será controlado por la IA?")
+        self.partida = Partida(nombre_a, nombre_b, ia_a, ia_b, self.grabar, *self.etiquetas)
+        self.tablero = self.partida.tablero
+        self.jugadores = self.partida.jugadores
+        self.registro = self.partida.registro
+        self.solvers = {
+            jugador.player_id: self._crear_solver() for jugador in self.jugadores if jugador.is_ai
+        }
 
         assert self.tablero is not None
-        while not self.tablero.winner["is_winner"]:
-            jugador_actual = self.jugadores[self.turn_index]
-            print(
-                f"\nTurno de {jugador_actual.nombre} (Jugador {jugador_actual.player_id.value})"
-            )
-            self.turno_jugador(jugador_actual)
-            self.verificar_ganador()
-            if self.tablero.winner["is_winner"]:
-                break
-            self.turn_index = 1 - self.turn_index
-
-        if self.tablero is not None:
-            self.tablero.mostrar_tablero()
+        if self.metricas:
+            instrumentacion.activar(self.metricas, self.perfil, self.memoria)
+        try:
+            while not self.partida.terminada:
+                jugador_actual = self.partida.jugador_actual
+                print(
+                    f"\nTurno de {jugador_actual.nombre} (Jugador {jugador_actual.player_id.value})"
+                )
+                self.turno_jugador(jugador_actual)
+                if self.verificar_ganador():
+                    break
 
+            if self.tablero is not None:
+                self.tablero.mostrar_tablero()
+        finally:
+            if self.metricas:
+                instrumentacion.desactivar()
+            self._cerrar_solvers()
+            if self.tablero is not None:
+                self.tablero.renderizador.cerrar()
+            if self.registro is not None and self.ruta_registro:
+                self.registro.guardar(self.ruta_registro)
+
+    def _crear_solver(self):
+        """Crea el buscador de un jugador IA según `motor_ia` y `workers_ia`, con el libro si hay."""
+        if self.motor_ia == "mcts":
+            motor = MCTSSolver(max_time_s=1.0)
+        elif min(self.workers_ia, os.cpu_count() or 1) > 1:
+            # Con más procesos que núcleos la búsqueda paralela es más lenta
+            motor = ParallelSolver(
+                n_workers=min(self.workers_ia, os.cpu_count()), max_time_s=1.0, max_depth=4
+            )
+        else:
+            motor = Solver(max_time_s=1.0, max_depth=4)
+            if self.ponder:
+                motor = SolverConPonder(motor)
+        if self.libro is None and self.ruta_libro and os.path.exists(self.ruta_libro):
+            self.libro = LibroAperturas(self.ruta_libro)
+        if self.libro is not None:
+            return SolverConLibro(self.libro, motor)
+        return motor
+
+    def _cerrar_solvers(self) -> None:
+        """Libera los procesos de los buscadores paralelos y el libro, si los hay."""
+        for solver in self.solvers.values():
+            motor = solver.motor if isinstance(solver, SolverConLibro) else solver
+            if isinstance(motor, ParallelSolver):
+                motor.cerrar()
+            elif isinstance(motor, SolverConPonder):
+                motor.detener()
+                turnos = motor.aciertos + motor.aciertos_ficha + motor.fallos
+                if turnos:
+                    print(
+                        f"Ponder: {motor.aciertos}/{turnos} turnos del rival acertados "
+                        f"({motor.tasa_aciertos:.0%}), {motor.aciertos_ficha} más solo con la ficha."
+                    )
+        self.solvers = {}
+        if self.libro is not None:
+            self.libro.cerrar()
+            self.libro = None
 
     def turno_jugador(self, jugador: Jugador) -> None:
         """Ejecuta el turno de un jugador.
 
         Detalles:
         - Muestra el tablero.
-        - Permite elegir: colocar ficha, colocar muralla o pasar.
+        - Permite elegir: colocar ficha, colocar muralla, pasar o deshacer la última ronda.
         - Si coloca ficha y la función utilizada lo permite, ofrece construir una muralla.
 
         Args:
@@ -250,31 +389,38 @@ class Juego:
             Interactúa con la consola y modifica `jugador.fichas`, `jugador.murallas`
             y el estado del `Tablero`.
         """
+        medidor = instrumentacion.actual
+        if medidor is None:
+            self._jugar_turno(jugador)
+            return
+        medidor.iniciar_turno(jugador=jugador.player_id.value, ia=jugador.is_ai)
+        try:
+            self._jugar_turno(jugador)
+        finally:
+            medidor.terminar_turno()
+
+    def _jugar_turno(self, jugador: Jugador) -> None:
+        """Cuerpo de `turno_jugador` (sin la medición del turno)."""
         assert self.tablero is not None, "El tablero no está inicializado"
         self.tablero.mostrar_tablero()
 
+        if jugador.is_ai:
+            self.turno_ia(jugador)
+            return
+
         while True:
             action = self._ask_action()
 
             if action == "ficha":
-                self.tablero.conocer_movimientos_posibles(jugador)
+                print(self.tablero.conocer_movimientos_posibles(jugador))
                 x = self._ask_letter("Fila (letra): ")
                 y = self._ask_int("Columna (número): ")
-                ficha = Ficha(
-                    x,
-                    y,
-                    self.tablero,
-                    jugador.symbol,
-                    jugador.is_vertical_player,
-                )
-
-                result = ficha.anadir_ficha()
-                ok = bool(result)
-                if not ok:
+                ficha = self.partida.colocar_ficha(jugador, x, y)
+                if ficha is None:
+                    self._informar_rechazo(jugador)
                     print("No se pudo colocar la ficha. Intenta nuevamente.")
                     continue
 
-                jugador.add_piece(ficha)
                 self.tablero.mostrar_tablero()
 
                 if len(jugador.pieces) >= 2:
@@ -282,57 +428,104 @@ class Juego:
                         f1, f2 = self._choose_two_fichas_for_wall(
                             jugador, prefer_include=ficha
                         )
-                        muralla = Muralla(
-                            self.tablero, f1, f2, horizontal_player=jugador.is_vertical_player
-                        )
-                        try:
-                            if muralla.anadir_muralla():
-                                jugador.add_wall(muralla)
-                                self.tablero.mostrar_tablero()
-                            else:
-                                print("Muralla inválida. No se añadió.")
-                        except AttributeError:
+                        if self.partida.colocar_muralla(jugador, f1, f2):
+                            self.tablero.mostrar_tablero()
+                        else:
+                            self._informar_rechazo(jugador)
                             print("Muralla inválida. No se añadió.")
                 return
 
+            if action == "deshacer":
+                if self.partida.deshacer_ronda(jugador):
+                    self.tablero.mostrar_tablero()
+                else:
+                    print("No hay jugadas tuyas que deshacer.")
+                continue
+
             if action == "muralla":
                 if len(jugador.pieces) < 2:
                     print("Necesitas al menos dos fichas para construir una muralla.")
                     continue
                 f1, f2 = self._choose_two_fichas_for_wall(jugador)
-                muralla = Muralla(
-                    self.tablero, f1, f2, horizontal_player=jugador.is_vertical_player
-                )
-                try:
-                    if muralla.anadir_muralla():
-                        jugador.add_wall(muralla)
-                        self.tablero.mostrar_tablero()
-                        return
-                    else:
-                        print("Muralla inválida. Intenta nuevamente.")
-                        continue
-                except AttributeError:
-                    print("Muralla inválida. Intenta nuevamente.")
-                    continue
+                if self.partida.colocar_muralla(jugador, f1, f2):
+                    self.tablero.mostrar_tablero()
+                    return
+                self._informar_rechazo(jugador)
+                print("Muralla inválida. Intenta nuevamente.")
+                continue
 
             return
 
-    def verificar_ganador(self) -> None:
-        """Verifica condición de victoria y anuncia al ganador.
+    def turno_ia(self, jugador: Jugador) -> None:
+        """Ejecuta el turno de un jugador controlado por la IA.
+
+        Busca la mejor jugada con el buscador del jugador. Si la jugada es una
+        ficha, además intenta añadir la muralla más útil que la incluya.
+
+        Args:
+            jugador: Jugador IA en turno.
+
+        Efectos:
+            Modifica el `Tablero` y las fichas/murallas del jugador; informa por consola.
+        """
+        assert self.partida is not None, "El tablero no está inicializado"
+        if jugador.player_id not in self.solvers:
+            self.solvers[jugador.player_id] = self._crear_solver()
+        solver = self.solvers[jugador.player_id]
+        medidor = instrumentacion.actual
+        inicio = time.perf_counter()
+        resultado = solver.solve(self.partida.estado(jugador))
+        if medidor is not None:
+            medidor.fase("ia.busqueda", time.perf_counter() - inicio)
+        if resultado.move is None:
+            print(f"{jugador.nombre} (IA) no encontró jugadas y pasa el turno.")
+            return
+
+        detalle = f"(profundidad {resultado.depth}, {resultado.nodes} nodos, {resultado.elapsed:.2f}s)"
+        if resultado.depth == 0 and resultado.nodes == 0:
+            detalle = f"(libro de aperturas, {resultado.elapsed * 1000:.1f} ms)"
+        inicio = time.perf_counter()
+        marca = medidor.marca() if medidor is not None else 0.0
+        colocadas = self.partida.aplicar_jugada_ia(jugador, resultado.move)
+        if medidor is not None:
+            medidor.fase("ia.aplicar", time.perf_counter() - inicio, marca)
+        if not colocadas:
+            print(f"{jugador.nombre} (IA) no pudo colocar su pieza y pasa el turno.")
+            return
+        for pieza in colocadas:
+            if len(pieza) == 1:
+                print(f"{jugador.nombre} (IA) colocó una ficha en {self.partida.etiqueta(pieza[0])} {detalle}")
+            elif pieza is colocadas[0]:
+                print(f"{jugador.nombre} (IA) construyó una muralla {detalle}")
+            else:
+                print(f"{jugador.nombre} (IA) añadió una muralla desde {self.partida.etiqueta(colocadas[0][0])}")
+        self.tablero.mostrar_tablero()
+        self._ponder(jugador, solver)
+
+    def _ponder(self, jugador: Jugador, solver) -> None:
+        """Si el rival es humano, busca en segundo plano tras su turno esperado (ficha y muralla)."""
+        motor = solver.motor if isinstance(solver, SolverConLibro) else solver
+        rival = self.jugadores[1 - self.jugadores.index(jugador)]
+        if not isinstance(motor, SolverConPonder) or rival.is_ai:
+            return
+        motor.ponder(self.partida.estado(rival))
+
+    def verificar_ganador(self) -> bool:
+        """Cierra el turno: anuncia al ganador si lo hay o pasa el turno al rival.
+
+        Returns:
+            True si la partida terminó.
 
         Efectos:
             Si `tablero.is_winner` es verdadero, marca `jugador.is_winner = True`
             para el jugador que realizó la última acción y muestra un mensaje.
         """
-        if self.tablero is None:
-            return
-        if self.tablero.winner["is_winner"]:
-            winner_id = str(self.tablero.winner.get("player", "")).upper()
-            ganador = next(
-                (j for j in self.jugadores if j.player_id.value == winner_id),
-                self.jugadores[self.turn_index],
-            )
-            ganador.mark_as_winner()
-            print(
-                f"\n¡{ganador.nombre} (Jugador {ganador.player_id.value}) ha ganado!"
-            )
+        if self.partida is None:
+            return False
+        ganador = self.partida.terminar_turno()
+        if ganador is None:
+            return False
+        print(
+            f"\n¡{ganador.nombre} (Jugador {ganador.player_id.value}) ha ganado!"
+        )
+        return True
@@ -1,11 +1,22 @@
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 from src.Ficha import Ficha
 from src.Muralla import Muralla
 from src.Tablero import Tablero
 
 
+def _quitar(lista: list, elemento) -> None:
+    # Quita `elemento` por identidad; si es el último (deshacer), en O(1)
+    if lista and lista[-1] is elemento:
+        lista.pop()
+        return
+    for i in range(len(lista) - 1, -1, -1):
+        if lista[i] is elemento:
+            del lista[i]
+            return
+
+
 class PlayerID(Enum):
     """Identifica el tipo de jugador en el juego TWIXT."""
 
@@ -21,25 +32,34 @@ class Jugador:
     - Jugador A (vertical): Conectar la fila superior con la fila inferior
     - Jugador B (horizontal): Conectar la columna izquierda con la columna derecha
 
+    Las fichas se indexan por celda (y las murallas por sus extremos), así
+    las consultas por posición y la detección de duplicados no recorren las
+    listas; los índices por fila y columna hacen que `get_pieces_by_*`
+    cueste O(k) en las fichas de esa fila o columna. `pieces` y `walls` se
+    modifican solo con `add_*`, `remove_*` y `clear_all_pieces`, que
+    mantienen los índices.
+
     Attributes:
         nombre: Nombre del jugador.
         player_id: Identificador del jugador (A o B).
-        pieces: Lista de fichas colocadas por el jugador.
-        walls: Lista de murallas construidas por el jugador.
+        pieces: Lista de fichas colocadas por el jugador, en orden.
+        walls: Lista de murallas construidas por el jugador, en orden.
         is_winner: Indica si el jugador ha ganado.
         is_vertical_player: True si es jugador vertical (A), False si es horizontal (B).
         symbol: Símbolo usado para representar al jugador en el tablero.
+        is_ai: True si el jugador es controlado por la IA.
     """
 
     MIN_PIECES_FOR_WALL = 2  # Mínimo de fichas necesarias para construir muralla
 
-    def __init__(self, nombre: str, jugador_id: str):
+    def __init__(self, nombre: str, jugador_id: str, is_ai: bool = False):
         """
         Inicializa un jugador del juego TWIXT.
 
         Args:
             nombre: Nombre del jugador.
             jugador_id: ID del jugador ('A' o 'B').
+            is_ai: True si las jugadas las decide la IA.
 
         Raises:
             ValueError: Si jugador_id no es 'A' o 'B'.
@@ -52,11 +72,17 @@ class Jugador:
         self.player_id = PlayerID(player_id_upper)
         self.pieces: list[Ficha] = []
         self.walls: list[Muralla] = []
+        # Índices de `pieces` (celda -> ficha, fila -> fichas, columna -> fichas) y de `walls`
+        self._fichas_por_celda: dict[int, Ficha] = {}
+        self._fichas_por_fila: dict[str, list[Ficha]] = {}
+        self._fichas_por_columna: dict[int, list[Ficha]] = {}
+        self._murallas_por_extremos: dict[tuple, Muralla] = {}
         self.is_winner: bool = False
         self.is_first_play:bool = len(self.pieces) == 0 
         # print(self.pieces)
         self.is_vertical_player: bool = self.player_id == PlayerID.A
         self.symbol: str = f"{self.player_id.value} "
+        self.is_ai: bool = is_ai
 
     def add_piece(self, ficha: Ficha) -> bool:
         """
@@ -66,13 +92,39 @@ class Jugador:
             ficha: Ficha a añadir.
 
         Returns:
-            True si la ficha se añadió correctamente, False si ya existe.
+            True si la ficha se añadió correctamente, False si ya hay una
+            ficha del jugador en esa celda.
+        """
+        if ficha.celda in self._fichas_por_celda:
+            return False
+        self.pieces.append(ficha)
+        self._fichas_por_celda[ficha.celda] = ficha
+        self._fichas_por_fila.setdefault(ficha.x, []).append(ficha)
+        self._fichas_por_columna.setdefault(ficha.y, []).append(ficha)
+        return True
+
+    def remove_piece(self, ficha: Ficha) -> bool:
         """
+        Quita una ficha de la colección del jugador (p. ej. al deshacer).
 
-        if ficha not in self.pieces:
-            self.pieces.append(ficha)
-            return True
-        return False
+        Quitar la última ficha añadida cuesta O(1).
+
+        Args:
+            ficha: Ficha a quitar.
+
+        Returns:
+            True si se quitó, False si no era del jugador.
+        """
+        if self._fichas_por_celda.get(ficha.celda) is not ficha:
+            return False
+        del self._fichas_por_celda[ficha.celda]
+        _quitar(self.pieces, ficha)
+        for indice, clave in ((self._fichas_por_fila, ficha.x), (self._fichas_por_columna, ficha.y)):
+            fichas = indice[clave]
+            _quitar(fichas, ficha)
+            if not fichas:
+                del indice[clave]
+        return True
 
     def add_wall(self, muralla: Muralla) -> bool:
         """
@@ -82,12 +134,32 @@ class Jugador:
             muralla: Muralla a añadir.
 
         Returns:
-            True si la muralla se añadió correctamente, False si ya existe.
+            True si la muralla se añadió correctamente, False si el jugador
+            ya tiene una muralla entre esas dos celdas.
+        """
+        clave = tuple(sorted(muralla.celdas_extremos))
+        if clave in self._murallas_por_extremos:
+            return False
+        self.walls.append(muralla)
+        self._murallas_por_extremos[clave] = muralla
+        return True
+
+    def remove_wall(self, muralla: Muralla) -> bool:
+        """
+        Quita una muralla de la colección del jugador (p. ej. al deshacer).
+
+        Args:
+            muralla: Muralla a quitar.
+
+        Returns:
+            True si se quitó, False si no era del jugador.
         """
-        if muralla not in self.walls:
-            self.walls.append(muralla)
-            return True
-        return False
+        clave = tuple(sorted(muralla.celdas_extremos))
+        if self._murallas_por_extremos.get(clave) is not muralla:
+            return False
+        del self._murallas_por_extremos[clave]
+        _quitar(self.walls, muralla)
+        return True
 
     def can_place_piece_on_border(self, x: str, y: int, tablero: Tablero) -> bool:
         """
@@ -105,12 +177,11 @@ class Jugador:
         Returns:
             True si puede colocar la ficha en esa posición.
         """
-        if x not in tablero.filas or y not in tablero.columnas:
+        fila_idx = tablero.indice_fila.get(x)
+        col_idx = tablero.indice_columna.get(y)
+        if fila_idx is None or col_idx is None:
             return False
 
-        fila_idx = tablero.filas.index(x)
-        col_idx = tablero.columnas.index(y)
-
         # Jugador vertical (A) no puede colocar en los límites horizontales
         if self.is_vertical_player:
             if col_idx == 0 or col_idx == len(tablero.columnas) - 1:
@@ -131,6 +202,27 @@ class Jugador:
         """
         return len(self.pieces) >= self.MIN_PIECES_FOR_WALL
 
+    def get_piece_by_cell(self, celda: int) -> Optional[Ficha]:
+        """
+        Obtiene la ficha del jugador en una celda, en O(1).
+
+        Args:
+            celda: Id plano de la celda (ver `Tablero.celda_de`).
+
+        Returns:
+            La ficha, o None si el jugador no tiene ficha ahí.
+        """
+        return self._fichas_por_celda.get(celda)
+
+    def get_wall_between(self, celda_a: int, celda_b: int) -> Optional[Muralla]:
+        """
+        Obtiene la muralla del jugador que une dos celdas, en O(1).
+
+        Returns:
+            La muralla, o None si no existe.
+        """
+        return self._murallas_por_extremos.get((min(celda_a, celda_b), max(celda_a, celda_b)))
+
     def get_pieces_by_position(self, x: str, y: int) -> list[Ficha]:
         """
         Obtiene todas las fichas del jugador en una posición específica.
@@ -142,7 +234,14 @@ class Jugador:
         Returns:
             Lista de fichas en esa posición.
         """
-        return [piece for piece in self.pieces if piece.x == x and piece.y == y]
+        fichas = self._fichas_por_fila.get(x)
+        if not fichas:
+            return []
+        # Se busca en la fila o en la columna, la que tenga menos fichas
+        columna = self._fichas_por_columna.get(y, [])
+        if len(columna) < len(fichas):
+            fichas = columna
+        return [piece for piece in fichas if piece.x == x and piece.y == y]
 
     def get_pieces_by_row(self, fila: str) -> list[Ficha]:
         """
@@ -154,7 +253,7 @@ class Jugador:
         Returns:
             Lista de fichas en esa fila.
         """
-        return [piece for piece in self.pieces if piece.x == fila]
+        return list(self._fichas_por_fila.get(fila, ()))
 
     def get_pieces_by_column(self, columna: int) -> list[Ficha]:
         """
@@ -166,7 +265,7 @@ class Jugador:
         Returns:
             Lista de fichas en esa columna.
         """
-        return [piece for piece in self.pieces if piece.y == columna]
+        return list(self._fichas_por_columna.get(columna, ()))
 
     def count_pieces(self) -> int:
         """
@@ -194,6 +293,10 @@ class Jugador:
         """
         self.pieces.clear()
         self.walls.clear()
+        self._fichas_por_celda.clear()
+        self._fichas_por_fila.clear()
+        self._fichas_por_columna.clear()
+        self._murallas_por_extremos.clear()
 
     def mark_as_winner(self) -> None:
         """Marca al jugador como ganador de la partida."""
@@ -221,6 +324,7 @@ class Jugador:
             - pieces: Número de fichas
             - walls: Número de murallas
             - is_winner: Si es ganador
+            - is_ai: Si es controlado por la IA
         """
         return {
             "nombre": self.nombre,
@@ -230,6 +334,7 @@ class Jugador:
             "pieces": len(self.pieces),
             "walls": len(self.walls),
             "is_winner": self.is_winner,
+            "is_ai": self.is_ai,
         }
 
     def __str__(self) -> str:
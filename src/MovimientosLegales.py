@@ -0,0 +1,134 @@
+# movimientos_legales.py
+from src.TablaCruces import murallas_por_celda, murallas_por_centro, tabla_extremos
+
+
+class MovimientosLegales:
+    """
+    Jugadas candidatas de cada jugador, mantenidas de forma incremental.
+
+    Por jugador se guardan dos conjuntos:
+    - `fichas`: celdas válidas a un salto diagonal de alguna ficha propia.
+    - `murallas`: ids de murallas construibles entre dos fichas propias.
+
+    `Tablero.recibir_pieza` notifica cada pieza colocada y solo se revisan las
+    celdas y murallas que esa pieza puede afectar (a lo sumo cuatro saltos, dos
+    murallas por celda central y la lista fija de cruces), así que el costo por
+    jugada no depende de cuántas piezas haya en el tablero.
+
+    Cada alta o baja efectiva se anota en `cambios`, agrupadas por pieza y
+    conjunto, así `deshacer_hasta` revierte una pieza en el mismo costo
+    acotado con que se aplicó.
+
+    Attributes:
+        bits: Núcleo `TableroBits` del tablero, ya actualizado con la pieza.
+        fichas: Conjuntos de celdas candidatas por jugador.
+        murallas: Conjuntos de ids de murallas candidatas por jugador.
+        cambios: Pila de pares (método que revierte el cambio, argumento),
+            p. ej. `(fichas.difference_update, nuevas)` tras agregar `nuevas`.
+    """
+
+    def __init__(self, bits):
+        """
+        Crea los conjuntos vacíos para el tablero de `bits`.
+
+        Args:
+            bits: `TableroBits` del tablero.
+        """
+        self.bits = bits
+        self._saltos = murallas_por_celda(bits.n_filas, bits.n_columnas)
+        self._por_centro = murallas_por_centro(bits.n_filas, bits.n_columnas)
+        self._extremos = tabla_extremos(bits.n_filas, bits.n_columnas)
+        self.fichas: list[set[int]] = [set(), set()]
+        self.murallas: list[set[int]] = [set(), set()]
+        self.cambios: list = []
+
+    def _ocupar(self, celda: int) -> None:
+        # La celda deja de estar libre para ambos jugadores, y ninguna muralla puede pasar por ella
+        cambios = self.cambios
+        for fichas in self.fichas:
+            if celda in fichas:
+                fichas.remove(celda)
+                cambios.append((fichas.add, celda))
+        por_centro = self._por_centro[celda]
+        if por_centro:
+            for murallas in self.murallas:
+                if murallas:
+                    quitadas = murallas.intersection(por_centro)
+                    if quitadas:
+                        murallas -= quitadas
+                        cambios.append((murallas.update, quitadas))
+
+    def ficha_colocada(self, jugador: int, celda: int) -> None:
+        """
+        Actualiza los conjuntos tras colocar una ficha.
+
+        Args:
+            jugador: Índice del dueño de la ficha.
+            celda: Celda de la ficha.
+        """
+        bits = self.bits
+        self._ocupar(celda)
+        fichas_propias = bits.fichas[jugador]
+        ocupadas = bits.ocupadas
+        murallas = self.murallas[jugador]
+        fichas = self.fichas[jugador]
+        nuevas_murallas = []
+        nuevas_fichas = []
+        for id_muralla, otra, centro in self._saltos[celda]:
+            if (fichas_propias >> otra) & 1:
+                if (
+                    id_muralla not in murallas
+                    and not (ocupadas >> centro) & 1
+                    and not bits.cruza_muralla(id_muralla)
+                ):
+                    murallas.add(id_muralla)
+                    nuevas_murallas.append(id_muralla)
+            elif otra not in fichas and bits.puede_colocar_ficha(jugador, otra):
+                # Incluye las celdas del extremo ganador que esta ficha acaba de apoyar
+                fichas.add(otra)
+                nuevas_fichas.append(otra)
+        if nuevas_murallas:
+            self.cambios.append((murallas.difference_update, nuevas_murallas))
+        if nuevas_fichas:
+            self.cambios.append((fichas.difference_update, nuevas_fichas))
+
+    def muralla_colocada(self, jugador: int, id_muralla: int) -> None:
+        """
+        Actualiza los conjuntos tras construir una muralla.
+
+        Args:
+            jugador: Índice del dueño de la muralla.
+            id_muralla: Id de la muralla (ver `TablaCruces.id_muralla`).
+        """
+        self._ocupar(self._extremos[id_muralla][2])
+        cruces = self.bits.cruces[id_muralla]
+        for murallas in self.murallas:
+            if murallas:
+                quitadas = murallas.intersection(cruces)
+                if quitadas:
+                    murallas -= quitadas
+                    self.cambios.append((murallas.update, quitadas))
+
+    def deshacer_hasta(self, marca: int) -> None:
+        """
+        Revierte los cambios posteriores a `marca` (un `len(cambios)` anterior).
+
+        Args:
+            marca: Longitud de `cambios` antes de la pieza que se deshace.
+        """
+        cambios = self.cambios
+        while len(cambios) > marca:
+            revertir, argumento = cambios.pop()
+            revertir(argumento)
+
+    def extremos_murallas(self, jugador: int) -> list:
+        """Pares (celda_a, celda_b) de las murallas candidatas del jugador."""
+        extremos = self._extremos
+        return [extremos[id_muralla][:2] for id_muralla in self.murallas[jugador]]
+
+    def limpiar(self) -> None:
+        """Vacía los conjuntos de ambos jugadores."""
+        for jugador in (0, 1):
+            self.fichas[jugador].clear()
+            self.murallas[jugador].clear()
+        self.cambios.clear()
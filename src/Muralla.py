@@ -1,4 +1,7 @@
 # muralla.py
+import time
+
+import src.Instrumentacion as instrumentacion
 from src.Tablero import Tablero
 from src.Ficha import Ficha
 
@@ -16,16 +19,21 @@ class Muralla:
         - parametro ficha2: Objeto Ficha 2.
         """
         x, y, apuntando_derecha = self.anadir_muralla_usando_fichas(ficha1, ficha2)
+        self.tablero = tablero
+        self.horizontal_player= horizontal_player
+        self.celdas_extremos = (ficha1.celda, ficha2.celda)
         if x == None:
-            print(f"La muralla {ficha1.x}{ficha1.y} con {ficha2.x}{ficha2.y} puede ponerse porque las murallas no estan alineadas diagonalmente dejando un espacio de un punto")
-            return None
-        # print(y)
+            # Fichas no alineadas a un salto diagonal: el tablero la rechaza con
+            # MotivoValidacion.NO_ES_SALTO_DIAGONAL al intentar añadirla
+            self.simbolo = None
+            self.x = self.y = -1
+            self.celda = None
+            return
 
-        self.tablero = tablero
         self.simbolo = "↘ " if apuntando_derecha  else "↙ "  
         self.x = tablero.filas[y] if y < len(tablero.filas) else -1
         self.y =  tablero.columnas[x] if x < len(tablero.columnas) else -1
-        self.horizontal_player= horizontal_player
+        self.celda = y * len(tablero.columnas) + x if self.x != -1 and self.y != -1 else None
         # self.anadir_muralla()
 
     def anadir_muralla_usando_fichas(self, ficha1:Ficha, ficha2:Ficha):
@@ -62,13 +70,21 @@ class Muralla:
         
 
 
-    def anadir_muralla(self) -> bool:
+    def anadir_muralla(self, propietario=None) -> bool:
         """
         Añade la muralla al tablero validando la posición con el tablero.
         Define la dirección ("/" o "\\") según la posición de las fichas.
+        - parametro propietario: Jugador al que se agrega la muralla si es válida (opcional).
         - devuelve: True si la muralla se añadió correctamente, False si no.
         """
-        resultado = self.tablero.recibir_pieza(self, False, self.horizontal_player)
+        medidor = instrumentacion.actual
+        if medidor is not None:
+            inicio = time.perf_counter()
+            marca = medidor.marca()
+        resultado = self.tablero.recibir_pieza(self, False, self.horizontal_player, "", propietario)
+        if medidor is not None:
+            # Sin contar tablero.validar ni tablero.aplicar, que informa recibir_pieza
+            medidor.fase("muralla.anadir", time.perf_counter() - inicio, marca)
         
         if resultado:
             return resultado
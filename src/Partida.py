@@ -0,0 +1,262 @@
+# partida.py
+import string
+from typing import Optional
+
+from src.Ficha import Ficha
+from src.Jugador import Jugador
+from src.Muralla import Muralla
+from src.RegistroPartida import RegistroPartida
+from src.TablaCruces import tabla_extremos
+from src.Tablero import MotivoValidacion, Tablero, etiquetas_filas
+from src.TableroBits import indice_jugador
+from src.ai.heuristics import mejor_muralla
+from src.ai.state import TwixtState
+
+# Tamaño máximo de tablero admitido (filas o columnas)
+TAMANO_MAXIMO = 200
+
+# Mensajes para los motivos de rechazo del Tablero. Campos: {casilla} ("C5" o
+# "C5-E7"), {muralla} (prefijo si es muralla), {rival} (tipo de jugador que sí
+# puede usar ese límite), {fila_apoyo} y {columna_apoyo} (línea N-3).
+MENSAJES_VALIDACION = {
+    MotivoValidacion.FILA_INEXISTENTE: "{casilla}: La fila no existe en el tablero",
+    MotivoValidacion.COLUMNA_INEXISTENTE: "{casilla}: La columna no existe en el tablero",
+    MotivoValidacion.CASILLA_OCUPADA: "{casilla}:{muralla} La casilla ya esta ocupada",
+    MotivoValidacion.LIMITE_RIVAL: (
+        "{casilla}:{muralla} Usted no es un {rival}, no puede añadir una ficha en ese limite "
+        "a menos de que este proximo a ganar"
+    ),
+    MotivoValidacion.NO_ES_SALTO_DIAGONAL: (
+        "{casilla}: No se puede añadir una muralla: las fichas no estan a un salto diagonal"
+    ),
+    MotivoValidacion.FICHAS_AJENAS: (
+        "{casilla}: No se puede añadir una muralla: ambas fichas deben ser del jugador y estar en el tablero"
+    ),
+    MotivoValidacion.CRUZA_MURALLA: "{casilla}: No se puede añadir una muralla: cruza otra muralla",
+}
+MENSAJES_SIN_APOYO = (
+    "{casilla}: La ficha que intento poner en la fila ante penultima no se puede añadir ya que no hay "
+    "ninguna ficha ni a derecha ni a izquierda en la fila {fila_apoyo}",
+    "{casilla}: La ficha que intento poner en la ultima columna no se puede añadir ya que no hay "
+    "ninguna ficha ni arriba ni abajo en la columna {columna_apoyo}",
+)
+
+
+def etiquetas_tablero(n_filas: int = 20, n_columnas: int = 20) -> tuple:
+    """
+    Etiquetas de fila (A..Z, AA..) y de columna (1..n) de un tablero de ese tamaño.
+
+    Raises:
+        ValueError: Si alguna dimensión no está entre 5 y `TAMANO_MAXIMO`.
+    """
+    for n in (n_filas, n_columnas):
+        if not 5 <= n <= TAMANO_MAXIMO:
+            raise ValueError(f"Tamaño de tablero inválido: {n} (debe estar entre 5 y {TAMANO_MAXIMO})")
+    return etiquetas_filas(n_filas), list(range(1, n_columnas + 1))
+
+
+class Partida:
+    """
+    Estado y reglas de una partida de TWIXT, sin entrada ni salida de consola.
+
+    Agrupa el `Tablero`, los dos `Jugador`, el turno y el registro, y expone
+    las acciones de un turno (ficha, muralla, deshacer, jugada de la IA) como
+    métodos que devuelven su resultado en lugar de preguntar o imprimir. La
+    usan `Juego` (consola) y `Servidor` (muchas partidas por conexión TCP).
+
+    Attributes:
+        tablero: Tablero de la partida.
+        jugadores: Jugador A (vertical, índice 0) y B (horizontal, índice 1).
+        turn_index: Índice del jugador en turno.
+        registro: `RegistroPartida` donde se anotan las piezas, o None.
+    """
+
+    def __init__(
+        self,
+        nombre_a: str = "Jugador A",
+        nombre_b: str = "Jugador B",
+        ia_a: bool = False,
+        ia_b: bool = False,
+        grabar: bool = True,
+        filas=None,
+        columnas=None,
+    ):
+        """
+        Crea el tablero (20x20 por defecto) y los jugadores.
+
+        Args:
+            nombre_a: Nombre del jugador vertical.
+            nombre_b: Nombre del jugador horizontal.
+            ia_a: Si A lo controla la IA.
+            ia_b: Si B lo controla la IA.
+            grabar: Si se anotan las piezas en `registro`.
+            filas: Etiquetas de fila; por defecto A..T (ver `etiquetas_tablero`).
+            columnas: Etiquetas de columna; por defecto 1..20.
+        """
+        filas = filas or etiquetas_filas(20)
+        columnas = columnas or list(range(1, 21))
+        self.tablero = Tablero(filas, columnas)
+        self.registro: Optional[RegistroPartida] = None
+        if grabar:
+            self.registro = RegistroPartida(len(filas), len(columnas))
+            self.tablero.registro = self.registro
+        self.jugadores = [Jugador(nombre_a, "A", is_ai=ia_a), Jugador(nombre_b, "B", is_ai=ia_b)]
+        self.turn_index = 0
+
+    @property
+    def jugador_actual(self) -> Jugador:
+        """Jugador en turno."""
+        return self.jugadores[self.turn_index]
+
+    @property
+    def terminada(self) -> bool:
+        """True si algún jugador ya conectó sus bordes."""
+        return self.tablero.winner["is_winner"]
+
+    def estado(self, jugador: Optional[Jugador] = None) -> TwixtState:
+        """`TwixtState` de la posición con `jugador` (por defecto el actual) en turno."""
+        return TwixtState.from_tablero(
+            self.tablero, self.jugadores[0], self.jugadores[1], jugador or self.jugador_actual
+        )
+
+    def etiqueta(self, celda: int) -> str:
+        """Coordenada de una celda en texto ("C5")."""
+        x, y = self.tablero.coordenadas_de(celda)
+        return f"{x}{y}"
+
+    def celda_de_texto(self, texto: str) -> Optional[int]:
+        """Id de celda de una coordenada en texto ("C5"), o None si no existe."""
+        texto = texto.strip().upper()
+        corte = len(texto.rstrip(string.digits))
+        if not corte or corte == len(texto):
+            return None
+        return self.tablero.celda_de(texto[:corte], int(texto[corte:]))
+
+    def colocar_ficha(self, jugador: Jugador, x: str, y: int) -> Optional[Ficha]:
+        """
+        Coloca una ficha del jugador en (x, y).
+
+        Returns:
+            La ficha colocada, o None si el tablero la rechazó (ver `mensaje_rechazo`).
+        """
+        if self.tablero.celda_de(x, y) is None:
+            motivo = self.tablero.motivo_posicion(x, y, False, jugador.is_vertical_player)
+            self.tablero.ultimo_rechazo = (motivo, f"{x}{y}", False)
+            return None
+        ficha = Ficha(x, y, self.tablero, jugador.symbol, jugador.is_vertical_player)
+        if not ficha.anadir_ficha(jugador):
+            return None
+        return ficha
+
+    def colocar_muralla(self, jugador: Jugador, ficha_1: Ficha, ficha_2: Ficha) -> bool:
+        """
+        Construye una muralla del jugador entre dos de sus fichas.
+
+        Returns:
+            True si se añadió; si no, el motivo queda para `mensaje_rechazo`.
+        """
+        muralla = Muralla(self.tablero, ficha_1, ficha_2, horizontal_player=jugador.is_vertical_player)
+        return bool(muralla.anadir_muralla(jugador))
+
+    def muralla_entre(self, jugador: Jugador, celda_a: int, celda_b: int) -> bool:
+        """Construye la muralla entre las fichas del jugador en `celda_a` y `celda_b`."""
+        f1 = jugador.get_piece_by_cell(celda_a)
+        f2 = jugador.get_piece_by_cell(celda_b)
+        if f1 is None or f2 is None:
+            etiqueta = f"{self.etiqueta(celda_a)}-{self.etiqueta(celda_b)}"
+            self.tablero.ultimo_rechazo = (MotivoValidacion.FICHAS_AJENAS, etiqueta, True)
+            return False
+        return self.colocar_muralla(jugador, f1, f2)
+
+    def mensaje_rechazo(self, jugador: Jugador) -> Optional[str]:
+        """Mensaje del motivo por el que el tablero rechazó la última pieza, si hay."""
+        if self.tablero.ultimo_rechazo is None:
+            return None
+        motivo, casilla, es_muralla = self.tablero.ultimo_rechazo
+        if motivo is MotivoValidacion.SIN_APOYO_EXTREMO:
+            plantilla = MENSAJES_SIN_APOYO[0 if jugador.is_vertical_player else 1]
+        else:
+            plantilla = MENSAJES_VALIDACION[motivo]
+        return plantilla.format(
+            casilla=casilla,
+            muralla=" No se puede añadir una muralla:" if es_muralla else "",
+            rival="jugador horizontal" if jugador.is_vertical_player else "jugador vertical",
+            fila_apoyo=self.tablero.filas[-3],
+            columna_apoyo=self.tablero.columnas[-3],
+        )
+
+    def deshacer_ronda(self, jugador: Jugador) -> bool:
+        """Deshace las piezas del rival desde el último turno del jugador y las de ese turno.
+
+        El turno sigue siendo del jugador, que vuelve a jugar su turno anterior.
+
+        Args:
+            jugador: Jugador que pide deshacer.
+
+        Returns:
+            True si se deshizo al menos una pieza propia.
+        """
+        acciones = self.tablero.acciones
+        propio = indice_jugador(jugador.is_vertical_player)
+        if propio not in (accion.jugador for accion in acciones):
+            return False
+        while acciones and acciones[-1].jugador != propio:
+            self.tablero.deshacer()
+        while acciones and acciones[-1].jugador == propio:
+            self.tablero.deshacer()
+        return True
+
+    def aplicar_jugada_ia(self, jugador: Jugador, jugada: int) -> list:
+        """
+        Aplica una jugada codificada como en `TwixtState` (ficha o muralla).
+
+        Si es una ficha, además añade la muralla más útil que la incluya.
+
+        Returns:
+            Piezas colocadas como `(celda,)` o `(celda_a, celda_b)`; vacía si
+            la jugada no se pudo aplicar.
+        """
+        n_filas, n_columnas = len(self.tablero.filas), len(self.tablero.columnas)
+        n_celdas = n_filas * n_columnas
+        if jugada >= n_celdas:
+            a, b, _ = tabla_extremos(n_filas, n_columnas)[jugada - n_celdas]
+            return [(a, b)] if self.muralla_entre(jugador, a, b) else []
+        x, y = self.tablero.coordenadas_de(jugada)
+        ficha = self.colocar_ficha(jugador, x, y)
+        if ficha is None:
+            return []
+        colocadas = [(ficha.celda,)]
+        muralla = self.muralla_util(jugador, ficha)
+        if muralla is not None and self.muralla_entre(jugador, *muralla):
+            colocadas.append(muralla)
+        return colocadas
+
+    def muralla_util(self, jugador: Jugador, ficha: Ficha) -> Optional[tuple]:
+        """Extremos de la muralla desde `ficha` que mejor evalúa la heurística, o None."""
+        state = self.estado(jugador)
+        id_muralla = mejor_muralla(state, ficha.celda)
+        return None if id_muralla is None else state.wall_ends(id_muralla)[:2]
+
+    def ganador(self) -> Optional[Jugador]:
+        """Jugador que conectó sus bordes, o None si la partida sigue."""
+        if not self.terminada:
+            return None
+        winner_id = str(self.tablero.winner.get("player", "")).upper()
+        return next(
+            (j for j in self.jugadores if j.player_id.value == winner_id),
+            self.jugador_actual,
+        )
+
+    def terminar_turno(self) -> Optional[Jugador]:
+        """
+        Cierra el turno actual: marca al ganador si lo hay o pasa el turno al rival.
+
+        Returns:
+            El ganador si la partida terminó, None en otro caso.
+        """
+        ganador = self.ganador()
+        if ganador is not None:
+            ganador.mark_as_winner()
+            return ganador
+        self.turn_index = 1 - self.turn_index
+        return None
@@ -0,0 +1,402 @@
+# registro_partida.py
+from functools import lru_cache
+
+from src.TablaCruces import MAX_CELDAS_TABLAS, TablaPerezosa, id_muralla, tabla_cruces, tabla_extremos
+from src.TableroBits import JUGADOR_HORIZONTAL, JUGADOR_VERTICAL, TableroBits
+
+MAGIA = b"TWX1"
+NOMBRES_JUGADOR = ("A", "B")
+
+
+def _escribir_varint(salida: bytearray, valor: int) -> None:
+    while valor >= 0x80:
+        salida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    salida.append(valor)
+
+
+def _leer_varint(datos: bytes, i: int) -> tuple:
+    valor = 0
+    desplazamiento = 0
+    while True:
+        byte = datos[i]
+        i += 1
+        valor |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            return valor, i
+        desplazamiento += 7
+
+
+class RegistroPartida:
+    """
+    Registro compacto de las acciones de una partida.
+
+    Cada acción es un entero `2 * jugada + jugador`, donde `jugada` usa la
+    misma codificación que `TwixtState` (`celda` para una ficha y
+    `n_celdas + id_muralla` para una muralla) y `jugador` es 0 (A) o 1 (B).
+    Así un turno con ficha y muralla queda como dos acciones del mismo jugador.
+
+    Formatos:
+    - Binario: `TWX1`, filas y columnas en varint y una varint por acción
+      (una o dos bytes por acción en tableros de hasta 40x40).
+    - Texto: cabecera `TWIXT <filas>x<columnas>` y una línea por acción con el
+      jugador y la coordenada, p. ej. `A C5` o `A C5-E7` para una muralla.
+
+    Attributes:
+        n_filas: Filas del tablero.
+        n_columnas: Columnas del tablero.
+        acciones: Acciones codificadas en orden.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int, acciones=None):
+        """
+        Crea un registro vacío (o con `acciones` ya codificadas).
+
+        Args:
+            n_filas: Filas del tablero.
+            n_columnas: Columnas del tablero.
+            acciones: Lista opcional de acciones codificadas.
+        """
+        self.n_filas = n_filas
+        self.n_columnas = n_columnas
+        self.n_celdas = n_filas * n_columnas
+        self.acciones: list[int] = list(acciones) if acciones is not None else []
+
+    def anotar_ficha(self, jugador: int, celda: int) -> None:
+        """Agrega la colocación de una ficha del jugador (0 = A, 1 = B)."""
+        self.acciones.append(2 * celda + jugador)
+
+    def anotar_muralla(self, jugador: int, extremo_a: int, extremo_b: int) -> None:
+        """Agrega una muralla del jugador entre las celdas `extremo_a` y `extremo_b`."""
+        id_m = id_muralla(extremo_a, extremo_b, self.n_columnas)
+        self.acciones.append(2 * (self.n_celdas + id_m) + jugador)
+
+    def a_bytes(self) -> bytes:
+        """Serializa el registro en el formato binario de varints."""
+        salida = bytearray(MAGIA)
+        _escribir_varint(salida, self.n_filas)
+        _escribir_varint(salida, self.n_columnas)
+        for accion in self.acciones:
+            while accion >= 0x80:
+                salida.append((accion & 0x7F) | 0x80)
+                accion >>= 7
+            salida.append(accion)
+        return bytes(salida)
+
+    @classmethod
+    def desde_bytes(cls, datos: bytes) -> "RegistroPartida":
+        """
+        Lee un registro binario.
+
+        Raises:
+            ValueError: Si los datos no empiezan con la cabecera `TWX1`.
+        """
+        if datos[:4] != MAGIA:
+            raise ValueError("El registro no tiene la cabecera TWX1")
+        n_filas, i = _leer_varint(datos, 4)
+        n_columnas, i = _leer_varint(datos, i)
+        acciones = []
+        n = len(datos)
+        while i < n:
+            accion, i = _leer_varint(datos, i)
+            acciones.append(accion)
+        return cls(n_filas, n_columnas, acciones)
+
+    def a_texto(self, filas=None, columnas=None) -> str:
+        """
+        Convierte el registro a la notación de texto.
+
+        Args:
+            filas: Etiquetas de fila; por defecto A, B, ... (ver `etiquetas_filas`).
+            columnas: Etiquetas de columna; por defecto 1..n.
+        """
+        from src.Tablero import etiquetas_filas
+
+        filas = filas or etiquetas_filas(self.n_filas)
+        columnas = columnas or list(range(1, self.n_columnas + 1))
+        extremos = tabla_extremos(self.n_filas, self.n_columnas)
+
+        def etiqueta(celda: int) -> str:
+            fila, col = divmod(celda, self.n_columnas)
+            return f"{filas[fila]}{columnas[col]}"
+
+        lineas = [f"TWIXT {self.n_filas}x{self.n_columnas}"]
+        for accion in self.acciones:
+            jugada, jugador = divmod(accion, 2)
+            if jugada < self.n_celdas:
+                texto = etiqueta(jugada)
+            else:
+                a, b, _ = extremos[jugada - self.n_celdas]
+                texto = f"{etiqueta(a)}-{etiqueta(b)}"
+            lineas.append(f"{NOMBRES_JUGADOR[jugador]} {texto}")
+        return "\n".join(lineas) + "\n"
+
+    @classmethod
+    def desde_texto(cls, texto: str, filas=None, columnas=None) -> "RegistroPartida":
+        """
+        Lee la notación de texto generada por `a_texto`.
+
+        Raises:
+            ValueError: Si la cabecera, un jugador o una coordenada no son válidos.
+        """
+        from src.Tablero import etiquetas_filas
+
+        lineas = [linea.strip() for linea in texto.splitlines() if linea.strip()]
+        if not lineas or not lineas[0].startswith("TWIXT "):
+            raise ValueError("Falta la cabecera 'TWIXT <filas>x<columnas>'")
+        n_filas, n_columnas = (int(v) for v in lineas[0].split()[1].lower().split("x"))
+        filas = filas or etiquetas_filas(n_filas)
+        columnas = columnas or list(range(1, n_columnas + 1))
+        indice_fila = {str(f).upper(): i for i, f in enumerate(filas)}
+        indice_columna = {str(c): j for j, c in enumerate(columnas)}
+
+        def celda(coordenada: str) -> int:
+            # La fila son las letras iniciales y la columna el resto
+            corte = len(coordenada.rstrip("0123456789"))
+            fila = indice_fila.get(coordenada[:corte].upper())
+            col = indice_columna.get(coordenada[corte:])
+            if fila is None or col is None:
+                raise ValueError(f"Coordenada inválida: {coordenada}")
+            return fila * n_columnas + col
+
+        registro = cls(n_filas, n_columnas)
+        for linea in lineas[1:]:
+            nombre, coordenadas = linea.split()
+            if nombre.upper() not in NOMBRES_JUGADOR:
+                raise ValueError(f"Jugador inválido: {nombre}")
+            jugador = NOMBRES_JUGADOR.index(nombre.upper())
+            if "-" in coordenadas:
+                a, b = coordenadas.split("-")
+                registro.anotar_muralla(jugador, celda(a), celda(b))
+            else:
+                registro.anotar_ficha(jugador, celda(coordenadas))
+        return registro
+
+    def guardar(self, ruta: str) -> None:
+        """Guarda el registro: texto si la ruta termina en `.txt`, binario en otro caso."""
+        if str(ruta).endswith(".txt"):
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                archivo.write(self.a_texto())
+        else:
+            with open(ruta, "wb") as archivo:
+                archivo.write(self.a_bytes())
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "RegistroPartida":
+        """Carga un registro guardado con `guardar`."""
+        if str(ruta).endswith(".txt"):
+            with open(ruta, encoding="utf-8") as archivo:
+                return cls.desde_texto(archivo.read())
+        with open(ruta, "rb") as archivo:
+            return cls.desde_bytes(archivo.read())
+
+    def __len__(self) -> int:
+        return len(self.acciones)
+
+
+PERMITIDA = 1
+EN_INICIO = 2
+EN_FIN = 4
+CON_APOYO = 8
+
+
+@lru_cache(maxsize=None)
+def _tablas_reproduccion(n_filas: int, n_columnas: int) -> tuple:
+    """
+    Tablas indexadas directamente por la acción de ficha `2 * celda + jugador`
+    o por el identificador de muralla.
+
+    Returns:
+        (banderas, apoyo, murallas, identidad): `banderas[accion]` combina PERMITIDA,
+        EN_INICIO, EN_FIN y CON_APOYO; `apoyo[accion]` da las celdas de apoyo
+        del extremo ganador (solo para las acciones con CON_APOYO);
+        `murallas[id]` es `(a, b, centro, cruces)` o None si no existe
+        (perezosa en tableros grandes, como las tablas de `TablaCruces`);
+        `identidad` es `list(range(celdas))`, que se copia como union-find vacío.
+    """
+    bits = TableroBits(n_filas, n_columnas)
+    banderas = bytearray(2 * n_filas * n_columnas)
+    apoyo = {}
+    for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+        for celda in range(n_filas * n_columnas):
+            bandera = 0
+            if not (bits.prohibidas[jugador] >> celda) & 1:
+                bandera |= PERMITIDA
+            if (bits.borde_inicio[jugador] >> celda) & 1:
+                bandera |= EN_INICIO
+            if (bits.borde_fin[jugador] >> celda) & 1:
+                bandera |= EN_FIN
+            banderas[2 * celda + jugador] = bandera
+        for celda, mascara in bits.apoyo[jugador].items():
+            banderas[2 * celda + jugador] |= CON_APOYO
+            celdas = []
+            while mascara:
+                bajo = mascara & -mascara
+                celdas.append(bajo.bit_length() - 1)
+                mascara ^= bajo
+            apoyo[2 * celda + jugador] = tuple(celdas)
+    extremos = tabla_extremos(n_filas, n_columnas)
+    cruces = tabla_cruces(n_filas, n_columnas)
+
+    def muralla(id_m: int):
+        extremo = extremos[id_m]
+        return None if extremo is None else (*extremo, cruces[id_m])
+
+    if n_filas * n_columnas <= MAX_CELDAS_TABLAS:
+        murallas = [muralla(id_m) for id_m in range(len(extremos))]
+    else:
+        murallas = TablaPerezosa(muralla, len(extremos))
+    return bytes(banderas), apoyo, murallas, list(range(n_filas * n_columnas))
+
+
+class ResultadoReproduccion:
+    """Resultado de `reproducir`."""
+
+    __slots__ = ("ganador", "acciones", "invalida")
+
+    def __init__(self, ganador, acciones: int, invalida):
+        self.ganador = ganador
+        self.acciones = acciones
+        self.invalida = invalida
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultadoReproduccion(ganador={self.ganador}, acciones={self.acciones}, "
+            f"invalida={self.invalida})"
+        )
+
+
+def _raiz(padres: list, nodo: int) -> int:
+    while padres[nodo] != nodo:
+        padres[nodo] = padres[padres[nodo]]
+        nodo = padres[nodo]
+    return nodo
+
+
+def reproducir(registro) -> ResultadoReproduccion:
+    """
+    Aplica y verifica un registro sobre un tablero vacío, sin la capa interactiva.
+
+    Usa arreglos planos (dueño por celda y union-find con compresión de caminos,
+    con los bordes meta que toca cada grupo anotados en su raíz) y decodifica
+    las varints en el mismo bucle, así que no crea objetos por acción. Comprueba las mismas reglas que `Tablero.motivo_celda` y
+    `Tablero.motivo_muralla` y se detiene en la primera acción inválida.
+
+    Args:
+        registro: `RegistroPartida` o sus bytes.
+
+    Returns:
+        `ResultadoReproduccion` con el ganador ("A", "B" o None), las acciones
+        aplicadas y el índice de la primera acción inválida (o None).
+    """
+    datos = registro.a_bytes() if isinstance(registro, RegistroPartida) else registro
+    if datos[:4] != MAGIA:
+        raise ValueError("El registro no tiene la cabecera TWX1")
+    n_filas, i = _leer_varint(datos, 4)
+    n_columnas, i = _leer_varint(datos, i)
+    n_celdas = n_filas * n_columnas
+    banderas, apoyo, murallas, identidad = _tablas_reproduccion(n_filas, n_columnas)
+    limite_fichas = 2 * n_celdas
+    limite_murallas = 2 * (n_celdas + len(murallas))
+
+    duenos = bytearray(n_celdas)  # 0 libre, 1 ficha A, 2 ficha B, 3 muralla
+    padres = (identidad.copy(), identidad.copy())
+    # Bordes meta (EN_INICIO | EN_FIN) que toca cada grupo, anotados en su raíz
+    bordes = (bytearray(n_celdas), bytearray(n_celdas))
+    puentes = set()
+    aplicadas = 0
+    bytes_acciones = iter(datos[i:])
+    for accion in bytes_acciones:
+        # Varint decodificada en el mismo bucle: un byte no necesita más trabajo
+        if accion >= 0x80:
+            accion &= 0x7F
+            desplazamiento = 7
+            for byte in bytes_acciones:
+                accion |= (byte & 0x7F) << desplazamiento
+                if byte < 0x80:
+                    break
+                desplazamiento += 7
+            else:
+                raise ValueError("El registro termina a mitad de una acción")
+        if accion < limite_fichas:
+            celda = accion >> 1
+            if duenos[celda]:
+                break
+            bandera = banderas[accion]
+            # Casi todas las fichas caen en celdas permitidas del interior
+            if bandera != PERMITIDA:
+                if not bandera & PERMITIDA:
+                    break
+                if bandera & CON_APOYO:
+                    marca = (accion & 1) + 1
+                    for c in apoyo[accion]:
+                        if duenos[c] == marca:
+                            break
+                    else:
+                        break
+                # Una ficha nueva está aislada: es su propia raíz y solo toca su borde
+                bordes[accion & 1][celda] = bandera & (EN_INICIO | EN_FIN)
+            duenos[celda] = (accion & 1) + 1
+            aplicadas += 1
+            continue
+        if accion >= limite_murallas:
+            break
+        id_m = (accion >> 1) - n_celdas
+        muralla = murallas[id_m]
+        if muralla is None:
+            break
+        a, b, centro, cruces = muralla
+        jugador = accion & 1
+        if duenos[a] != jugador + 1 or duenos[b] != jugador + 1 or duenos[centro]:
+            break
+        if not puentes.isdisjoint(cruces):
+            break
+        duenos[centro] = 3
+        puentes.add(id_m)
+        aplicadas += 1
+        padres_j = padres[jugador]
+        # Raíces con camino rápido: tras la compresión casi todo nodo apunta a su raíz
+        raiz_a = padres_j[a]
+        if padres_j[raiz_a] != raiz_a:
+            raiz_a = _raiz(padres_j, a)
+        raiz_b = padres_j[b]
+        if padres_j[raiz_b] != raiz_b:
+            raiz_b = _raiz(padres_j, b)
+        if raiz_a == raiz_b:
+            continue
+        padres_j[raiz_b] = raiz_a
+        bordes_j = bordes[jugador]
+        union = bordes_j[raiz_a] | bordes_j[raiz_b]
+        if union == EN_INICIO | EN_FIN:
+            return ResultadoReproduccion(NOMBRES_JUGADOR[jugador], aplicadas, None)
+        bordes_j[raiz_a] = union
+    else:
+        return ResultadoReproduccion(None, aplicadas, None)
+    # Se salió del bucle por una acción inválida
+    return ResultadoReproduccion(None, aplicadas, aplicadas)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Verifica y convierte registros de partidas TWIXT.")
+    parser.add_argument("archivos", nargs="+", help="Registros binarios o de texto (.txt)")
+    parser.add_argument("--texto", action="store_true", help="Muestra cada registro en notación de texto")
+    args = parser.parse_args()
+
+    total = 0
+    segundos = 0.0
+    for ruta in args.archivos:
+        registro = RegistroPartida.cargar(ruta)
+        datos = registro.a_bytes()
+        inicio = time.perf_counter()
+        resultado = reproducir(datos)
+        segundos += time.perf_counter() - inicio
+        total += len(registro)
+        estado = "válido" if resultado.invalida is None else f"acción {resultado.invalida} inválida"
+        print(f"{ruta}: {len(registro)} acciones, ganador {resultado.ganador or '-'}, {estado}")
+        if args.texto:
+            print(registro.a_texto(), end="")
+    if segundos:
+        print(f"{total / segundos:,.0f} acciones/s")
@@ -0,0 +1,186 @@
+# renderizador.py
+import shutil
+import sys
+
+# Secuencias ANSI usadas por el renderizador
+BORRAR_PANTALLA = "\x1b[H\x1b[2J"
+GUARDAR_CURSOR = "\x1b7"
+RESTAURAR_CURSOR = "\x1b8"
+REINICIAR_REGION = "\x1b[r"
+
+# Filas y columnas máximas que se escriben fuera de una terminal; los tableros
+# más grandes se muestran en una ventana alrededor de la última jugada
+VENTANA_TEXTO = (40, 40)
+# Ventana mínima para fijar el tablero en la terminal
+VENTANA_MINIMA = 5
+
+
+class Renderizador:
+    """
+    Dibuja un `Tablero` en la terminal redibujando solo las celdas que cambiaron.
+
+    - La primera vez, o si cambia el tamaño de la terminal, se limpia la
+      pantalla y se dibuja el tablero completo en las primeras líneas. Debajo
+      se fija una región de desplazamiento (DECSTBM) para que los mensajes y
+      preguntas de `Juego` no muevan el tablero.
+    - Después solo se reescriben las celdas marcadas con `marcar`, moviendo el
+      cursor a cada una y devolviéndolo a donde estaba.
+    - Cada cuadro se escribe con un único `write` y un `flush`.
+    - Si el tablero no cabe, solo se dibuja una ventana centrada en la última
+      celda marcada (`foco`), con una línea que indica qué filas y columnas
+      muestra. Una celda marcada fuera de la ventana la vuelve a centrar con
+      un dibujo completo.
+
+    Si la salida no es una terminal se escribe la ventana (todo el tablero si
+    no pasa de `VENTANA_TEXTO`) en texto plano, sin secuencias ANSI; lo mismo
+    si la terminal es demasiado chica para fijarla.
+
+    Attributes:
+        tablero: Tablero a dibujar (se leen `filas`, `columnas` y `glifo`).
+        salida: Flujo de texto; por defecto `sys.stdout`.
+        sucias: Ids de las celdas que cambiaron desde el último cuadro.
+        foco: Id de la última celda marcada, o None.
+        ventana: Filas y columnas dibujadas en el último cuadro completo,
+            como (fila_desde, fila_hasta, columna_desde, columna_hasta).
+    """
+
+    def __init__(self, tablero, salida=None):
+        """
+        Crea el renderizador de `tablero`.
+
+        Args:
+            tablero: Tablero a dibujar.
+            salida: Flujo de texto opcional; por defecto `sys.stdout`.
+        """
+        self.tablero = tablero
+        self.salida = salida
+        self.sucias: set[int] = set()
+        self.foco = None
+        self.ventana = None
+        self._tamano = None  # Tamaño de la terminal del último dibujo completo
+
+    def marcar(self, celda: int) -> None:
+        """Marca la celda (id plano) para redibujarla en el próximo cuadro."""
+        self.sucias.add(celda)
+        self.foco = celda
+
+    def invalidar(self) -> None:
+        """Fuerza un dibujo completo en el próximo cuadro."""
+        self._tamano = None
+
+    def _flujo(self):
+        return self.salida if self.salida is not None else sys.stdout
+
+    def _es_terminal(self) -> bool:
+        flujo = self._flujo()
+        return hasattr(flujo, "isatty") and flujo.isatty()
+
+    def _ventana(self, max_filas: int, max_columnas: int) -> tuple:
+        # Rango de filas y columnas de a lo sumo ese tamaño, centrado en el foco
+        n_filas, n_columnas = len(self.tablero.filas), len(self.tablero.columnas)
+        if self.foco is None:
+            foco_fila, foco_columna = n_filas // 2, n_columnas // 2
+        else:
+            foco_fila, foco_columna = divmod(self.foco, n_columnas)
+        filas = min(n_filas, max_filas)
+        columnas = min(n_columnas, max_columnas)
+        fila = min(max(foco_fila - filas // 2, 0), n_filas - filas)
+        columna = min(max(foco_columna - columnas // 2, 0), n_columnas - columnas)
+        return fila, fila + filas, columna, columna + columnas
+
+    def _es_parcial(self, ventana) -> bool:
+        return ventana != (0, len(self.tablero.filas), 0, len(self.tablero.columnas))
+
+    def _texto(self, ventana) -> str:
+        tablero = self.tablero
+        fila_desde, fila_hasta, columna_desde, columna_hasta = ventana
+        ancho = tablero.ancho_celda
+        columnas = tablero.columnas[columna_desde:columna_hasta]
+        lineas = [" " * (tablero.ancho_fila + 1) + " ".join(f"{c:>{ancho}}" for c in columnas)]
+        lineas.extend(
+            tablero._mostrar_fila(tablero.filas[i], i, columna_desde, columna_hasta)
+            for i in range(fila_desde, fila_hasta)
+        )
+        if self._es_parcial(ventana):
+            lineas.append(
+                f"(filas {tablero.filas[fila_desde]}-{tablero.filas[fila_hasta - 1]} de {len(tablero.filas)}, "
+                f"columnas {columnas[0]}-{columnas[-1]} de {len(tablero.columnas)})"
+            )
+        return "\n".join(lineas) + "\n"
+
+    def _ventana_terminal(self, tamano):
+        # Encabezado + filas + al menos tres líneas para mensajes
+        max_filas = tamano.lines - 4
+        max_columnas = (tamano.columns - self.tablero.ancho_fila - 1) // (self.tablero.ancho_celda + 1)
+        if max_filas < len(self.tablero.filas) or max_columnas < len(self.tablero.columnas):
+            max_filas -= 1  # Línea que indica la ventana
+        if min(max_filas, max_columnas) < VENTANA_MINIMA:
+            return None
+        return self._ventana(max_filas, max_columnas)
+
+    def _en_ventana(self, fila_idx: int, col_idx: int) -> bool:
+        fila_desde, fila_hasta, columna_desde, columna_hasta = self.ventana
+        return fila_desde <= fila_idx < fila_hasta and columna_desde <= col_idx < columna_hasta
+
+    def dibujar(self) -> None:
+        """Escribe un cuadro: completo si hace falta, si no solo las celdas sucias."""
+        flujo = self._flujo()
+        if not self._es_terminal():
+            self.sucias.clear()
+            self.ventana = self._ventana(*VENTANA_TEXTO)
+            flujo.write(self._texto(self.ventana))
+            flujo.flush()
+            return
+
+        tamano = shutil.get_terminal_size()
+        ventana = self._ventana_terminal(tamano)
+        if ventana is None:
+            # Sin espacio para fijar el tablero: se imprime en el flujo normal
+            self._tamano = None
+            self.sucias.clear()
+            self.ventana = self._ventana(*VENTANA_TEXTO)
+            flujo.write(REINICIAR_REGION + self._texto(self.ventana))
+            flujo.flush()
+            return
+
+        n_columnas = len(self.tablero.columnas)
+        fuera = (
+            any(not self._en_ventana(*divmod(celda, n_columnas)) for celda in self.sucias)
+            if self.ventana
+            else True
+        )
+        if tamano != self._tamano or fuera:
+            self._tamano = tamano
+            self.ventana = ventana
+            self.sucias.clear()
+            alto = ventana[1] - ventana[0] + 1 + self._es_parcial(ventana)
+            partes = [BORRAR_PANTALLA, self._texto(ventana)]
+            # Región de desplazamiento bajo el tablero y cursor al inicio de ella
+            partes.append(f"\x1b[{alto + 2};{tamano.lines}r\x1b[{alto + 2};1H")
+            flujo.write("".join(partes))
+            flujo.flush()
+            return
+
+        if not self.sucias:
+            return
+        tablero = self.tablero
+        fila_desde, _, columna_desde, _ = self.ventana
+        ancho = tablero.ancho_celda
+        partes = [GUARDAR_CURSOR]
+        for fila_idx, col_idx in (divmod(celda, n_columnas) for celda in sorted(self.sucias)):
+            # Línea 1: encabezado; columna: etiqueta + 1, más `ancho + 1` por celda (1-indexado)
+            linea = fila_idx - fila_desde + 2
+            columna = tablero.ancho_fila + 2 + (ancho + 1) * (col_idx - columna_desde)
+            partes.append(f"\x1b[{linea};{columna}H{tablero.glifo(fila_idx, col_idx):<{ancho}}")
+        partes.append(RESTAURAR_CURSOR)
+        self.sucias.clear()
+        flujo.write("".join(partes))
+        flujo.flush()
+
+    def cerrar(self) -> None:
+        """Quita la región de desplazamiento y deja el cursor bajo todo lo escrito."""
+        if self._tamano is not None and self._es_terminal():
+            flujo = self._flujo()
+            flujo.write(f"{REINICIAR_REGION}\x1b[{self._tamano.lines};1H\n")
+            flujo.flush()
+        self._tamano = None
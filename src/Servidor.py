@@ -0,0 +1,567 @@
+# servidor.py
+import asyncio
+import itertools
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import StringIO
+from typing import Optional
+
+from src.Instantanea import FormatoInstantanea
+from src.Partida import Partida, etiquetas_tablero
+from src.Renderizador import Renderizador
+from src.ai.selfplay import crear_politica
+
+# Política de los asientos controlados por la IA (ver `crear_politica`)
+POLITICA_IA = "minimax:depth=2,time=0.5"
+# Pases seguidos (uno por jugador) que terminan la partida en empate
+PASES_EMPATE = 2
+
+# Políticas de cada proceso o hilo del ejecutor, conservadas entre jugadas
+_trabajador = threading.local()
+
+
+def _jugada_ia(especificacion: str, instantanea: bytes, n_filas: int, n_columnas: int) -> Optional[int]:
+    # Se ejecuta en el ejecutor: reconstruye la posición y consulta la política
+    politicas = getattr(_trabajador, "politicas", None)
+    if politicas is None:
+        politicas = _trabajador.politicas = {}
+    politica = politicas.get(especificacion)
+    if politica is None:
+        semilla = os.getpid() ^ threading.get_ident()
+        politica = politicas[especificacion] = crear_politica(especificacion, semilla)
+    return politica.elegir(FormatoInstantanea(n_filas, n_columnas).a_estado(instantanea))
+
+
+class Conexion:
+    """
+    Cliente conectado al servidor.
+
+    Attributes:
+        escritor: `asyncio.StreamWriter` del socket.
+        sesion: `SesionPartida` que sigue el cliente, o None.
+    """
+
+    def __init__(self, escritor: asyncio.StreamWriter):
+        self.escritor = escritor
+        self.sesion: Optional["SesionPartida"] = None
+
+    def enviar(self, linea: str) -> None:
+        """Encola una línea de respuesta (se vacía con `drain` al terminar el comando)."""
+        if not self.escritor.is_closing():
+            self.escritor.write(linea.encode() + b"\n")
+
+
+class SesionPartida:
+    """
+    Partida alojada en el servidor junto con sus conexiones y asientos.
+
+    Attributes:
+        id: Identificador de la partida en el servidor.
+        partida: `Partida` con el tablero y las reglas.
+        asientos: Conexión que controla a A y a B (None para la IA o un asiento libre).
+        conexiones: Clientes que reciben los eventos de la partida.
+        pases: Pases seguidos; con `PASES_EMPATE` la partida termina en empate.
+        empate: True si terminó sin ganador.
+        tarea: Tarea que juega los turnos de la IA, si hay una en curso.
+    """
+
+    def __init__(self, id_partida: int, partida: Partida):
+        self.id = id_partida
+        self.partida = partida
+        self.asientos: list[Optional[Conexion]] = [None, None]
+        self.conexiones: set[Conexion] = set()
+        self.pases = 0
+        self.empate = False
+        self.tarea: Optional[asyncio.Task] = None
+
+    @property
+    def terminada(self) -> bool:
+        """True si hay ganador o empate."""
+        return self.empate or self.partida.terminada
+
+    def difundir(self, linea: str) -> None:
+        """Envía un evento a todas las conexiones de la partida."""
+        for conexion in self.conexiones:
+            conexion.enviar(linea)
+
+
+class ServidorTwixt:
+    """
+    Servidor asyncio que aloja muchas partidas de TWIXT a la vez.
+
+    Cada cliente habla un protocolo de texto por líneas sobre TCP: envía un
+    comando por línea y recibe respuestas `OK ...` / `ERR ...` y eventos de
+    la partida que sigue. Las partidas se juegan con `Partida`, sin consola.
+
+    Comandos:
+        NUEVA [A|B|AB] [N] Crea una partida; las letras son los asientos de la
+                         IA y N el lado del tablero (20 por defecto, hasta 200).
+                         El creador controla los demás asientos.
+        UNIRSE <id>      Toma el asiento B (humano) de otra partida.
+        FICHA <C5> [E7]  Coloca una ficha y, opcionalmente, una muralla desde ella.
+        MURALLA <C5> <E7> Construye una muralla entre dos fichas propias.
+        PASAR            Pasa el turno.
+        DESHACER         Deshace la última ronda propia (ver `Partida.deshacer_ronda`).
+        TABLERO          `OK TABLERO <n>` seguido de n líneas con el tablero.
+        ESTADO           Turno, ganador y piezas de la partida.
+        INFO             Partidas, conexiones y jugadas de la IA del servidor.
+        PING             Responde `OK PONG` (mide la latencia del bucle).
+        SALIR            Cierra la conexión.
+
+    Eventos: `JUGADA <A|B> <C5|C5-E7>`, `PASA <A|B>`, `DESHACE <A|B>`,
+    `TURNO <A|B>`, `GANA <A|B>` y `EMPATE`.
+
+    Los turnos de la IA se calculan en un ejecutor (procesos por defecto)
+    para que un motor lento nunca detenga el bucle de eventos: el bucle solo
+    envía la instantánea de la posición (`FormatoInstantanea`) y recibe la
+    jugada.
+
+    Attributes:
+        politica: Especificación de la política de la IA.
+        partidas: Partidas activas por id.
+        conexiones: Clientes conectados.
+        jugadas_ia: Jugadas de la IA calculadas desde el arranque.
+    """
+
+    def __init__(
+        self,
+        politica: str = POLITICA_IA,
+        workers: Optional[int] = None,
+        hilos: bool = False,
+        grabar: bool = False,
+    ):
+        """
+        Configura el servidor.
+
+        Args:
+            politica: Política de la IA (ver `crear_politica`).
+            workers: Trabajadores del ejecutor; por defecto los de la máquina.
+            hilos: Usa hilos en lugar de procesos (menos memoria, pero la IA
+                compite con el bucle por el GIL).
+            grabar: Si cada partida anota sus piezas en un `RegistroPartida`.
+        """
+        self.politica = politica
+        self.grabar = grabar
+        self.ejecutor = ThreadPoolExecutor(workers) if hilos else ProcessPoolExecutor(workers)
+        self.partidas: dict[int, SesionPartida] = {}
+        self.conexiones: set[Conexion] = set()
+        self.jugadas_ia = 0
+        self._ids = itertools.count(1)
+        self._servidor: Optional[asyncio.Server] = None
+        self._atenciones: set[asyncio.Task] = set()
+        self._formato = FormatoInstantanea(20, 20)
+        self._comandos = {
+            "NUEVA": self._nueva,
+            "UNIRSE": self._unirse,
+            "FICHA": self._ficha,
+            "MURALLA": self._muralla,
+            "PASAR": self._pasar,
+            "DESHACER": self._deshacer,
+            "TABLERO": self._tablero,
+            "ESTADO": self._estado,
+            "INFO": self._info,
+            "PING": lambda conexion, args: conexion.enviar("OK PONG"),
+        }
+
+    async def iniciar(self, host: str = "127.0.0.1", puerto: int = 0) -> int:
+        """
+        Empieza a aceptar conexiones.
+
+        Returns:
+            Puerto en el que escucha (útil con `puerto=0`).
+        """
+        self._servidor = await asyncio.start_server(self.atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    async def cerrar(self) -> None:
+        """Deja de aceptar conexiones, cancela los turnos de la IA y libera el ejecutor."""
+        if self._servidor is not None:
+            self._servidor.close()
+        for sesion in list(self.partidas.values()):
+            if sesion.tarea is not None:
+                sesion.tarea.cancel()
+        for conexion in list(self.conexiones):
+            conexion.escritor.close()
+        # Cada cliente recibe fin de flujo y su tarea termina sola
+        await asyncio.gather(*self._atenciones, return_exceptions=True)
+        if self._servidor is not None:
+            await self._servidor.wait_closed()
+            self._servidor = None
+        self.partidas.clear()
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Atiende a un cliente: lee comandos línea a línea hasta que se desconecta."""
+        conexion = Conexion(escritor)
+        self.conexiones.add(conexion)
+        tarea = asyncio.current_task()
+        self._atenciones.add(tarea)
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                partes = linea.decode(errors="replace").split()
+                if not partes:
+                    continue
+                comando = partes[0].upper()
+                if comando == "SALIR":
+                    conexion.enviar("OK ADIOS")
+                    break
+                manejador = self._comandos.get(comando)
+                if manejador is None:
+                    conexion.enviar(f"ERR Comando desconocido: {comando}")
+                else:
+                    manejador(conexion, partes[1:])
+                await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._salir_de_sesion(conexion)
+            self.conexiones.discard(conexion)
+            self._atenciones.discard(tarea)
+            escritor.close()
+
+    def _salir_de_sesion(self, conexion: Conexion) -> None:
+        sesion = conexion.sesion
+        if sesion is None:
+            return
+        conexion.sesion = None
+        sesion.conexiones.discard(conexion)
+        sesion.asientos = [None if dueno is conexion else dueno for dueno in sesion.asientos]
+        if not sesion.conexiones:
+            # Nadie la sigue: se descarta para liberar memoria
+            if sesion.tarea is not None:
+                sesion.tarea.cancel()
+            self.partidas.pop(sesion.id, None)
+
+    def _sesion_en_turno(self, conexion: Conexion):
+        # Sesión y jugador si la conexión controla el turno actual; si no, envía el error
+        sesion = conexion.sesion
+        if sesion is None:
+            conexion.enviar("ERR No estás en una partida")
+            return None, None
+        if sesion.terminada:
+            conexion.enviar("ERR La partida terminó")
+            return None, None
+        partida = sesion.partida
+        if sesion.asientos[partida.turn_index] is not conexion:
+            conexion.enviar("ERR No es tu turno")
+            return None, None
+        return sesion, partida.jugador_actual
+
+    def _nueva(self, conexion: Conexion, args: list) -> None:
+        ia = args[0].upper() if args and not args[0].isdigit() else ""
+        if ia.strip("AB"):
+            conexion.enviar("ERR Asientos de IA inválidos (A, B o AB)")
+            return
+        lado = args[-1] if args and args[-1].isdigit() else "20"
+        try:
+            filas, columnas = etiquetas_tablero(int(lado), int(lado))
+        except ValueError as error:
+            conexion.enviar(f"ERR {error}")
+            return
+        self._salir_de_sesion(conexion)
+        partida = Partida(ia_a="A" in ia, ia_b="B" in ia, grabar=self.grabar, filas=filas, columnas=columnas)
+        sesion = SesionPartida(next(self._ids), partida)
+        sesion.asientos = [None if jugador.is_ai else conexion for jugador in partida.jugadores]
+        sesion.conexiones.add(conexion)
+        conexion.sesion = sesion
+        self.partidas[sesion.id] = sesion
+        conexion.enviar(f"OK PARTIDA {sesion.id}")
+        conexion.enviar(f"TURNO {partida.jugador_actual.player_id.value}")
+        self._avanzar(sesion)
+
+    def _unirse(self, conexion: Conexion, args: list) -> None:
+        sesion = self.partidas.get(int(args[0])) if args and args[0].isdigit() else None
+        if sesion is None:
+            conexion.enviar("ERR Partida inexistente")
+            return
+        creador = sesion.asientos[0]
+        if sesion.partida.jugadores[1].is_ai or sesion.asientos[1] is not creador or creador is None:
+            conexion.enviar("ERR El asiento B no está disponible")
+            return
+        self._salir_de_sesion(conexion)
+        sesion.asientos[1] = conexion
+        sesion.conexiones.add(conexion)
+        conexion.sesion = sesion
+        conexion.enviar(f"OK UNIDO {sesion.id} B")
+
+    def _ficha(self, conexion: Conexion, args: list) -> None:
+        sesion, jugador = self._sesion_en_turno(conexion)
+        if sesion is None:
+            return
+        partida = sesion.partida
+        celdas = [partida.celda_de_texto(texto) for texto in args[:2]]
+        if not celdas or None in celdas:
+            conexion.enviar("ERR Uso: FICHA <C5> [E7]")
+            return
+        ficha = partida.colocar_ficha(jugador, *partida.tablero.coordenadas_de(celdas[0]))
+        if ficha is None:
+            conexion.enviar(f"ERR {partida.mensaje_rechazo(jugador)}")
+            return
+        conexion.enviar("OK")
+        nombre = jugador.player_id.value
+        sesion.difundir(f"JUGADA {nombre} {partida.etiqueta(ficha.celda)}")
+        if len(celdas) == 2:
+            # Como en la consola: una muralla inválida no deshace la ficha
+            if partida.muralla_entre(jugador, ficha.celda, celdas[1]):
+                sesion.difundir(f"JUGADA {nombre} {partida.etiqueta(ficha.celda)}-{partida.etiqueta(celdas[1])}")
+            else:
+                conexion.enviar(f"AVISO {partida.mensaje_rechazo(jugador)}")
+        self._cerrar_turno(sesion, paso=False)
+        self._avanzar(sesion)
+
+    def _muralla(self, conexion: Conexion, args: list) -> None:
+        sesion, jugador = self._sesion_en_turno(conexion)
+        if sesion is None:
+            return
+        partida = sesion.partida
+        celdas = [partida.celda_de_texto(texto) for texto in args[:2]]
+        if len(celdas) != 2 or None in celdas:
+            conexion.enviar("ERR Uso: MURALLA <C5> <E7>")
+            return
+        if not partida.muralla_entre(jugador, *celdas):
+            conexion.enviar(f"ERR {partida.mensaje_rechazo(jugador)}")
+            return
+        conexion.enviar("OK")
+        sesion.difundir(
+            f"JUGADA {jugador.player_id.value} {partida.etiqueta(celdas[0])}-{partida.etiqueta(celdas[1])}"
+        )
+        self._cerrar_turno(sesion, paso=False)
+        self._avanzar(sesion)
+
+    def _pasar(self, conexion: Conexion, args: list) -> None:
+        sesion, jugador = self._sesion_en_turno(conexion)
+        if sesion is None:
+            return
+        conexion.enviar("OK")
+        sesion.difundir(f"PASA {jugador.player_id.value}")
+        self._cerrar_turno(sesion, paso=True)
+        self._avanzar(sesion)
+
+    def _deshacer(self, conexion: Conexion, args: list) -> None:
+        sesion, jugador = self._sesion_en_turno(conexion)
+        if sesion is None:
+            return
+        if not sesion.partida.deshacer_ronda(jugador):
+            conexion.enviar("ERR No hay jugadas tuyas que deshacer")
+            return
+        sesion.pases = 0
+        conexion.enviar("OK")
+        sesion.difundir(f"DESHACE {jugador.player_id.value}")
+
+    def _tablero(self, conexion: Conexion, args: list) -> None:
+        if conexion.sesion is None:
+            conexion.enviar("ERR No estás en una partida")
+            return
+        salida = StringIO()
+        Renderizador(conexion.sesion.partida.tablero, salida).dibujar()
+        lineas = salida.getvalue().splitlines()
+        conexion.enviar(f"OK TABLERO {len(lineas)}")
+        for linea in lineas:
+            conexion.enviar(linea)
+
+    def _estado(self, conexion: Conexion, args: list) -> None:
+        sesion = conexion.sesion
+        if sesion is None:
+            conexion.enviar("ERR No estás en una partida")
+            return
+        partida = sesion.partida
+        ganador = partida.ganador()
+        a, b = partida.jugadores
+        conexion.enviar(
+            f"OK ESTADO partida={sesion.id} turno={partida.jugador_actual.player_id.value} "
+            f"ganador={ganador.player_id.value if ganador else '-'} empate={int(sesion.empate)} "
+            f"fichas={len(a.pieces)},{len(b.pieces)} murallas={len(a.walls)},{len(b.walls)}"
+        )
+
+    def _info(self, conexion: Conexion, args: list) -> None:
+        conexion.enviar(
+            f"OK INFO partidas={len(self.partidas)} conexiones={len(self.conexiones)} "
+            f"jugadas_ia={self.jugadas_ia}"
+        )
+
+    def _cerrar_turno(self, sesion: SesionPartida, paso: bool) -> None:
+        # Anuncia ganador o empate; si la partida sigue, pasa el turno al rival
+        sesion.pases = sesion.pases + 1 if paso else 0
+        ganador = sesion.partida.terminar_turno()
+        if ganador is not None:
+            sesion.difundir(f"GANA {ganador.player_id.value}")
+        elif sesion.pases >= PASES_EMPATE:
+            sesion.empate = True
+            sesion.difundir("EMPATE")
+        else:
+            sesion.difundir(f"TURNO {sesion.partida.jugador_actual.player_id.value}")
+
+    def _avanzar(self, sesion: SesionPartida) -> None:
+        # Lanza la tarea de la IA si le toca y no hay una en curso
+        if sesion.terminada or not sesion.partida.jugador_actual.is_ai:
+            return
+        if sesion.tarea is None or sesion.tarea.done():
+            sesion.tarea = asyncio.create_task(self._turnos_ia(sesion))
+
+    async def _turnos_ia(self, sesion: SesionPartida) -> None:
+        """Juega los turnos seguidos de la IA; la búsqueda corre en el ejecutor."""
+        bucle = asyncio.get_running_loop()
+        partida = sesion.partida
+        n_filas, n_columnas = len(partida.tablero.filas), len(partida.tablero.columnas)
+        formato = self._formato
+        if (formato.n_filas, formato.n_columnas) != (n_filas, n_columnas):
+            formato = FormatoInstantanea(n_filas, n_columnas)
+        while not sesion.terminada and partida.jugador_actual.is_ai:
+            jugador = partida.jugador_actual
+            instantanea = formato.empaquetar(partida.tablero, *partida.jugadores, jugador)
+            jugada = await bucle.run_in_executor(
+                self.ejecutor, _jugada_ia, self.politica, instantanea, n_filas, n_columnas
+            )
+            self.jugadas_ia += 1
+            colocadas = partida.aplicar_jugada_ia(jugador, jugada) if jugada is not None else []
+            nombre = jugador.player_id.value
+            if not colocadas:
+                sesion.difundir(f"PASA {nombre}")
+            for pieza in colocadas:
+                sesion.difundir(f"JUGADA {nombre} {'-'.join(map(partida.etiqueta, pieza))}")
+            self._cerrar_turno(sesion, paso=not colocadas)
+
+
+def _memoria_kb() -> int:
+    # Pico de memoria residente del proceso (KB en Linux)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def medir_capacidad(
+    inactivas: int = 1000,
+    activas: int = 8,
+    politica: str = "greedy",
+    workers: Optional[int] = None,
+    hilos: bool = False,
+    segundos: float = 30.0,
+) -> dict:
+    """
+    Mide cuántas partidas inactivas y activas sostiene un proceso.
+
+    Arranca un servidor en localhost y, en el mismo proceso, abre
+    `inactivas` clientes que crean una partida y no juegan (memoria por
+    partida) y luego `activas` partidas IA contra IA, mientras otro cliente
+    mide la latencia de `PING` para comprobar que el bucle no se bloquea.
+
+    Args:
+        inactivas: Partidas creadas sin jugar.
+        activas: Partidas IA contra IA jugando a la vez.
+        politica: Política de la IA de las partidas activas.
+        workers: Trabajadores del ejecutor.
+        hilos: Usa hilos en lugar de procesos.
+        segundos: Tiempo máximo de la fase activa.
+
+    Returns:
+        Resumen con memoria por partida, jugadas de la IA por segundo y latencias.
+    """
+    servidor = ServidorTwixt(politica, workers, hilos)
+    puerto = await servidor.iniciar()
+    clientes = []
+    try:
+        memoria_inicial = _memoria_kb()
+        inicio = time.perf_counter()
+        for _ in range(inactivas):
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            escritor.write(b"NUEVA\n")
+            await lector.readline()
+            await lector.readline()
+            clientes.append(escritor)
+        segundos_inactivas = time.perf_counter() - inicio
+        memoria_inactivas = _memoria_kb()
+
+        async def jugar_activa() -> None:
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            clientes.append(escritor)
+            escritor.write(b"NUEVA AB\n")
+            while True:
+                linea = await lector.readline()
+                if not linea or linea.startswith((b"GANA", b"EMPATE")):
+                    return
+
+        latencias = []
+
+        async def sondear() -> None:
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            clientes.append(escritor)
+            while True:
+                envio = time.perf_counter()
+                escritor.write(b"PING\n")
+                await lector.readline()
+                latencias.append(time.perf_counter() - envio)
+                await asyncio.sleep(0.01)
+
+        sonda = asyncio.create_task(sondear())
+        inicio = time.perf_counter()
+        partidas = [asyncio.create_task(jugar_activa()) for _ in range(activas)]
+        _, pendientes = await asyncio.wait(partidas, timeout=segundos)
+        segundos_activas = time.perf_counter() - inicio
+        for tarea in (sonda, *pendientes):
+            tarea.cancel()
+        latencias.sort()
+        jugadas_ia = servidor.jugadas_ia
+    finally:
+        for escritor in clientes:
+            escritor.close()
+        await servidor.cerrar()
+
+    def percentil(p: float) -> float:
+        return latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000 if latencias else 0.0
+
+    return {
+        "inactivas": inactivas,
+        "kb_por_partida_inactiva": (memoria_inactivas - memoria_inicial) / inactivas if inactivas else 0.0,
+        "partidas_inactivas_por_s": inactivas / segundos_inactivas if segundos_inactivas else 0.0,
+        "activas": activas,
+        "activas_terminadas": activas - len(pendientes),
+        "politica": politica,
+        "jugadas_ia_por_s": jugadas_ia / segundos_activas if segundos_activas else 0.0,
+        "ping_ms_p50": percentil(0.5),
+        "ping_ms_p99": percentil(0.99),
+        "ping_ms_max": percentil(1.0),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Servidor TWIXT con muchas partidas simultáneas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--politica", default=None, help=f"Política de la IA (por defecto {POLITICA_IA})")
+    parser.add_argument("--workers", type=int, default=None, help="Trabajadores del ejecutor de la IA")
+    parser.add_argument("--hilos", action="store_true", help="Ejecutor de hilos en lugar de procesos")
+    parser.add_argument("--medir", action="store_true", help="Mide la capacidad del proceso y termina")
+    parser.add_argument("--inactivas", type=int, default=1000, help="Partidas inactivas al medir")
+    parser.add_argument("--activas", type=int, default=8, help="Partidas IA contra IA al medir")
+    parser.add_argument("--segundos", type=float, default=30.0, help="Duración máxima de la fase activa")
+    args = parser.parse_args()
+
+    if args.medir:
+        resumen = asyncio.run(
+            medir_capacidad(
+                args.inactivas, args.activas, args.politica or "greedy", args.workers, args.hilos, args.segundos
+            )
+        )
+        print(json.dumps(resumen, ensure_ascii=False))
+    else:
+
+        async def servir() -> None:
+            servidor = ServidorTwixt(args.politica or POLITICA_IA, args.workers, args.hilos)
+            puerto = await servidor.iniciar(args.host, args.puerto)
+            print(f"Servidor TWIXT escuchando en {args.host}:{puerto}")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await servidor.cerrar()
+
+        try:
+            asyncio.run(servir())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,243 @@
+# tabla_cruces.py
+from functools import lru_cache
+
+
+# Direcciones de una muralla tomada desde su ficha superior
+ABAJO_DERECHA = 0  # "↘ "
+ABAJO_IZQUIERDA = 1  # "↙ "
+DESPLAZAMIENTOS = ((2, 2), (2, -2))
+
+# Celdas hasta las que las tablas por tamaño se calculan completas (64x64);
+# por encima se calculan elemento a elemento al consultarlas
+MAX_CELDAS_TABLAS = 4096
+
+
+def _puntos_segmento(fila: int, col: int, direccion: int) -> set:
+    # Puntos del segmento a resolución de media celda (coordenadas dobladas):
+    # dos diagonales solo pueden cortarse en coordenadas enteras o medias.
+    df, dc = DESPLAZAMIENTOS[direccion]
+    return {(2 * fila + i * df // 2, 2 * col + i * dc // 2) for i in range(5)}
+
+
+def _se_cruzan(a: tuple, b: tuple) -> bool:
+    puntos_a = _puntos_segmento(*a)
+    puntos_b = _puntos_segmento(*b)
+    extremos_a = {min(puntos_a), max(puntos_a)}
+    extremos_b = {min(puntos_b), max(puntos_b)}
+    # Dos murallas que solo comparten una ficha no se cruzan
+    comunes = (puntos_a & puntos_b) - (extremos_a & extremos_b)
+    return bool(comunes)
+
+
+@lru_cache(maxsize=None)
+def desplazamientos_en_conflicto() -> tuple:
+    """
+    Calcula, para cada dirección, las murallas relativas que cruzan a una
+    muralla que parte de (0, 0).
+
+    Returns:
+        Tupla indexada por dirección con tuplas (df, dc, direccion) en conflicto.
+    """
+    resultado = []
+    for direccion in (ABAJO_DERECHA, ABAJO_IZQUIERDA):
+        base = (0, 0, direccion)
+        conflictos = []
+        for df in range(-2, 3):
+            for dc in range(-4, 5):
+                for otra in (ABAJO_DERECHA, ABAJO_IZQUIERDA):
+                    candidata = (df, dc, otra)
+                    if candidata != base and _se_cruzan(base, candidata):
+                        conflictos.append(candidata)
+        resultado.append(tuple(conflictos))
+    return tuple(resultado)
+
+
+def id_muralla(celda_a: int, celda_b: int, n_columnas: int):
+    """
+    Devuelve el id de la muralla que une dos celdas, o None si no están a un
+    salto diagonal de dos casillas.
+
+    El id es `2 * celda_superior + direccion`, así cada muralla posible del
+    tablero tiene un único entero independiente del orden de las fichas.
+    """
+    if celda_a > celda_b:
+        celda_a, celda_b = celda_b, celda_a
+    fila_a, col_a = divmod(celda_a, n_columnas)
+    fila_b, col_b = divmod(celda_b, n_columnas)
+    if fila_b - fila_a != 2:
+        return None
+    if col_b - col_a == 2:
+        return 2 * celda_a + ABAJO_DERECHA
+    if col_b - col_a == -2:
+        return 2 * celda_a + ABAJO_IZQUIERDA
+    return None
+
+
+def extremos_muralla(id_muralla: int, n_columnas: int) -> tuple:
+    """Devuelve las celdas (superior, inferior) que une una muralla."""
+    celda, direccion = divmod(id_muralla, 2)
+    df, dc = DESPLAZAMIENTOS[direccion]
+    return celda, celda + df * n_columnas + dc
+
+
+def celda_central(id_muralla: int, n_columnas: int) -> int:
+    """Devuelve la celda donde se dibuja la muralla."""
+    celda, direccion = divmod(id_muralla, 2)
+    df, dc = DESPLAZAMIENTOS[direccion]
+    return celda + (df // 2) * n_columnas + dc // 2
+
+
+class TablaPerezosa(dict):
+    """
+    Tabla de solo lectura que calcula cada elemento la primera vez que se pide.
+
+    Reemplaza a las tuplas completas en tableros grandes (más de
+    `MAX_CELDAS_TABLAS` celdas): una partida solo consulta las celdas y
+    murallas cercanas a sus piezas, así que la memoria crece con las
+    consultas y no con el área. Se indexa como la tupla a la que reemplaza
+    (`tabla[i]`, `len`, iteración en orden); los elementos ya calculados se
+    leen con la búsqueda de `dict`, sin llamar a Python.
+    """
+
+    __slots__ = ("_calcular", "_n")
+
+    def __init__(self, calcular, n: int):
+        """
+        Args:
+            calcular: Función `calcular(indice)` que da cada elemento.
+            n: Número de elementos de la tabla completa.
+        """
+        super().__init__()
+        self._calcular = calcular
+        self._n = n
+
+    def __missing__(self, indice: int):
+        if not 0 <= indice < self._n:
+            raise IndexError("Índice fuera de la tabla")
+        valor = self[indice] = self._calcular(indice)
+        return valor
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self):
+        return (self[indice] for indice in range(self._n))
+
+
+def _tabla(calcular, n: int, n_celdas: int):
+    # Tupla completa en tableros normales; perezosa en los grandes
+    if n_celdas <= MAX_CELDAS_TABLAS:
+        return tuple(calcular(indice) for indice in range(n))
+    return TablaPerezosa(calcular, n)
+
+
+def cruces_de(id_muralla: int, n_filas: int, n_columnas: int) -> tuple:
+    """Ids de las murallas que cruzan a `id_muralla` (vacía si no está dentro del tablero)."""
+    celda, direccion = divmod(id_muralla, 2)
+    fila, col = divmod(celda, n_columnas)
+    df, dc = DESPLAZAMIENTOS[direccion]
+    if not (fila + df < n_filas and 0 <= col + dc < n_columnas):
+        return ()
+    cruces = []
+    for f, c, otra in desplazamientos_en_conflicto()[direccion]:
+        fila_o, col_o = fila + f, col + c
+        df_o, dc_o = DESPLAZAMIENTOS[otra]
+        if (
+            0 <= fila_o
+            and fila_o + df_o < n_filas
+            and 0 <= col_o < n_columnas
+            and 0 <= col_o + dc_o < n_columnas
+        ):
+            cruces.append(2 * (fila_o * n_columnas + col_o) + otra)
+    return tuple(cruces)
+
+
+def extremos_de(id_muralla: int, n_filas: int, n_columnas: int):
+    """(celda_superior, celda_inferior, celda_central) de una muralla, o None si no está dentro del tablero."""
+    celda, direccion = divmod(id_muralla, 2)
+    fila, col = divmod(celda, n_columnas)
+    df, dc = DESPLAZAMIENTOS[direccion]
+    if fila + df < n_filas and 0 <= col + dc < n_columnas:
+        a, b = extremos_muralla(id_muralla, n_columnas)
+        return a, b, celda_central(id_muralla, n_columnas)
+    return None
+
+
+def saltos_de(celda: int, n_filas: int, n_columnas: int) -> tuple:
+    """Murallas que pueden salir de `celda`: tuplas (id_muralla, otra_celda, celda_central)."""
+    fila, col = divmod(celda, n_columnas)
+    vecinas = []
+    for df in (-2, 2):
+        for dc in (-2, 2):
+            if 0 <= fila + df < n_filas and 0 <= col + dc < n_columnas:
+                otra = celda + df * n_columnas + dc
+                vecinas.append((id_muralla(celda, otra, n_columnas), otra, (celda + otra) // 2))
+    return tuple(vecinas)
+
+
+def centros_de(celda: int, n_filas: int, n_columnas: int) -> tuple:
+    """Ids (en orden) de las murallas que se dibujarían sobre `celda`."""
+    fila, col = divmod(celda, n_columnas)
+    ids = []
+    for direccion in (ABAJO_DERECHA, ABAJO_IZQUIERDA):
+        df, dc = DESPLAZAMIENTOS[direccion]
+        # La ficha superior está una fila arriba y media muralla hacia atrás
+        fila_a, col_a = fila - df // 2, col - dc // 2
+        if 0 <= fila_a and fila_a + df < n_filas and 0 <= col_a < n_columnas and 0 <= col_a + dc < n_columnas:
+            ids.append(2 * (fila_a * n_columnas + col_a) + direccion)
+    return tuple(ids)
+
+
+@lru_cache(maxsize=None)
+def tabla_cruces(n_filas: int, n_columnas: int):
+    """
+    Tabla de cruces para un tamaño de tablero.
+
+    Se calcula una sola vez por tamaño a partir de los desplazamientos
+    relativos y se comparte entre todos los tableros de ese tamaño (en los
+    tableros grandes, elemento a elemento; ver `TablaPerezosa`).
+
+    Args:
+        n_filas: Número de filas.
+        n_columnas: Número de columnas.
+
+    Returns:
+        Tabla indexada por id de muralla con la tupla de ids que la cruzan
+        (vacía para ids que no corresponden a una muralla dentro del tablero).
+    """
+    n_celdas = n_filas * n_columnas
+    return _tabla(lambda id_m: cruces_de(id_m, n_filas, n_columnas), 2 * n_celdas, n_celdas)
+
+
+@lru_cache(maxsize=None)
+def tabla_extremos(n_filas: int, n_columnas: int):
+    """
+    Tabla id de muralla -> (celda_superior, celda_inferior, celda_central).
+
+    Los ids que no corresponden a una muralla dentro del tablero quedan en None.
+    """
+    n_celdas = n_filas * n_columnas
+    return _tabla(lambda id_m: extremos_de(id_m, n_filas, n_columnas), 2 * n_celdas, n_celdas)
+
+
+@lru_cache(maxsize=None)
+def murallas_por_celda(n_filas: int, n_columnas: int):
+    """
+    Para cada celda, las murallas que pueden salir de ella en las cuatro diagonales.
+
+    Returns:
+        Tabla indexada por celda con tuplas (id_muralla, otra_celda, celda_central).
+    """
+    n_celdas = n_filas * n_columnas
+    return _tabla(lambda celda: saltos_de(celda, n_filas, n_columnas), n_celdas, n_celdas)
+
+
+@lru_cache(maxsize=None)
+def murallas_por_centro(n_filas: int, n_columnas: int):
+    """
+    Para cada celda, los ids de las murallas que se dibujarían sobre ella.
+
+    Una ficha o muralla en esa celda impide construir cualquiera de ellas.
+    """
+    n_celdas = n_filas * n_columnas
+    return _tabla(lambda celda: centros_de(celda, n_filas, n_columnas), n_celdas, n_celdas)
@@ -1,45 +1,171 @@
 import string
+import time
+from enum import Enum
+import src.Instrumentacion as instrumentacion
+from src.MovimientosLegales import MovimientosLegales
+from src.Renderizador import Renderizador
+from src.TableroBits import JUGADOR_VERTICAL, TableroBits, indice_jugador
 # from src.Jugador import Jugador
 # from Ficha import Ficha
 
+
+def etiquetas_filas(n_filas: int) -> list:
+    """
+    Etiquetas de fila al estilo de hoja de cálculo: A..Z, AA..AZ, BA...
+    Permite tableros de más de 26 filas (por ejemplo 48x48).
+    """
+    etiquetas = []
+    for i in range(n_filas):
+        etiqueta = ""
+        i += 1
+        while i:
+            i, resto = divmod(i - 1, 26)
+            etiqueta = string.ascii_uppercase[resto] + etiqueta
+        etiquetas.append(etiqueta)
+    return etiquetas
+
+
+class MotivoValidacion(Enum):
+    """Resultado de validar una ficha o muralla (ver Tablero.motivo_*)."""
+
+    VALIDA = "valida"
+    FILA_INEXISTENTE = "fila_inexistente"
+    COLUMNA_INEXISTENTE = "columna_inexistente"
+    CASILLA_OCUPADA = "casilla_ocupada"
+    LIMITE_RIVAL = "limite_rival"  # Borde reservado al otro jugador
+    SIN_APOYO_EXTREMO = "sin_apoyo_extremo"  # Extremo ganador sin ficha propia a dos saltos
+    NO_ES_SALTO_DIAGONAL = "no_es_salto_diagonal"
+    FICHAS_AJENAS = "fichas_ajenas"
+    CRUZA_MURALLA = "cruza_muralla"
+
+
+class AccionTablero:
+    """
+    Delta mínimo de una pieza aceptada por `Tablero.recibir_pieza`.
+
+    Guarda lo necesario para deshacerla y rehacerla en O(1): la pieza, su
+    celda (que estaba vacía, así que deshacer solo borra su glifo), el
+    estado previo de `winner` si esta pieza lo cambió (None si no), el
+    `Jugador` dueño al que se agregó (o None) y la marca de
+    `MovimientosLegales.cambios`.
+    """
+
+    __slots__ = ("pieza", "es_ficha", "jugador", "celda", "ganador_anterior", "propietario", "marca")
+
+    def __init__(self, pieza, es_ficha, jugador, celda, propietario):
+        self.pieza = pieza
+        self.es_ficha = es_ficha
+        self.jugador = jugador
+        self.celda = celda
+        self.ganador_anterior = None
+        self.propietario = propietario
+        self.marca = 0
+
+
 class Tablero:
     """
     Representa el tablero del juego.
-    - Es una matriz (lista de listas) con letras para filas y números para columnas.
+    - Usa letras para filas (A..Z, AA.., ver `etiquetas_filas`) y números para columnas.
+    - Es disperso: `glifos` solo guarda las celdas con ficha o muralla; el resto
+      del dibujo (puntos y líneas de borde) se deduce de la posición con
+      `glifo`. Las validaciones se resuelven sobre el núcleo de bitboards
+      `bits` (ver `TableroBits`), así que la memoria por partida crece con las
+      piezas y no con el área (tableros de hasta 200x200).
     """
 
     def __init__(self, filas=None, columnas=None):
         """
         Inicializa el tablero con las dimensiones dadas.
         """
-        # Valores por defecto: tablero estándar Twixt 24x24
+        # Valores por defecto: tablero de 12x12 (el estándar de Twixt es 24x24)
         if filas is None:
-            filas = list(string.ascii_uppercase[:12])  # ['A','B',...,'X']
+            filas = list(string.ascii_uppercase[:12])  # ['A','B',...,'L']
         if columnas is None:
-            columnas = list(range(1, 13))  # 1 a 24
+            columnas = list(range(1, 13))  # 1 a 12
 
         self.filas = filas
         self.columnas = columnas 
-        self.matriz = self._get_rows_columns_table(columnas, filas)
+        # Tablas de coordenadas: etiqueta -> índice y id de celda -> (fila, columna)
+        self.indice_fila = {fila: i for i, fila in enumerate(filas)}
+        self.indice_columna = {columna: j for j, columna in enumerate(columnas)}
+        # Glifo de cada celda con pieza (id de celda -> símbolo)
+        self.glifos: dict[int, str] = {}
+        # Coordenadas en texto ("C5") ya pedidas, por id de celda
+        self._textos_celda: dict[int, str] = {}
+        # Anchos de dibujo: etiqueta de fila y celda (al menos 2, para "↘ " y "A ")
+        self.ancho_fila = max(2, max(len(str(fila)) for fila in filas))
+        self.ancho_celda = max(2, max(len(str(columna)) for columna in columnas))
+        self.bits = TableroBits(len(filas), len(columnas))
+        # Jugadas candidatas por jugador, actualizadas en recibir_pieza
+        self.movimientos = MovimientosLegales(self.bits)
         self.winner = {"is_winner":False, "player": ""}
+        # (MotivoValidacion, etiqueta, es_muralla) de la última pieza rechazada por recibir_pieza
+        self.ultimo_rechazo = None
+        # RegistroPartida opcional donde se anotan las piezas aceptadas
+        self.registro = None
+        # Dibuja solo las celdas que cambiaron desde el último mostrar_tablero
+        self.renderizador = Renderizador(self)
+        # Pilas de AccionTablero para deshacer y rehacer
+        self.acciones: list[AccionTablero] = []
+        self.deshechas: list[AccionTablero] = []
+
+    def celda_de(self, x: str, y: int):
+        """
+        Convierte una coordenada (letra, número) en su id plano de celda en O(1).
+        - devuelve: El id de la celda, o None si la coordenada no existe.
+        """
+        fila_idx = self.indice_fila.get(x)
+        col_idx = self.indice_columna.get(y)
+        if fila_idx is None or col_idx is None:
+            return None
+        return fila_idx * len(self.columnas) + col_idx
+
+    def coordenadas_de(self, celda: int) -> tuple:
+        """
+        Devuelve la tupla (letra, número) de un id de celda.
+        """
+        fila_idx, col_idx = divmod(celda, len(self.columnas))
+        return self.filas[fila_idx], self.columnas[col_idx]
+
+    def glifo(self, fila_idx: int, col_idx: int) -> str:
+        """
+        Texto a dibujar en una celda: su pieza, o el fondo (". ", o "| " / "- "
+        en las líneas junto a los bordes meta).
+        """
+        simbolo = self.glifos.get(fila_idx * len(self.columnas) + col_idx)
+        if simbolo is not None:
+            return simbolo
+        ultima_fila, ultima_columna = len(self.filas) - 1, len(self.columnas) - 1
+        if fila_idx in (0, ultima_fila) or col_idx in (0, ultima_columna):
+            return ". "
+        if fila_idx in (1, ultima_fila - 1):
+            return "- "
+        if col_idx in (1, ultima_columna - 1):
+            return "| "
+        return ". "
 
     def mostrar_tablero(self) -> None:
         """
         Muestra el estado actual del tablero con filas y columnas.
+        En una terminal solo se redibujan las celdas cambiadas (ver `Renderizador`).
         """
-        # Encabezado: cada número ocupa 2 caracteres y se separa con 1 espacio
-        header = "   " + " ".join(f"{c:>2}" for c in self.columnas)
-        print(header)
-        for i, fila in enumerate(self.filas):
-            row = self._mostrar_fila(fila, i)
-
-            # row = f"{fila:2} " + " ".join([cell for cell in self.matriz[i]])
-            print(row)
+        medidor = instrumentacion.actual
+        if medidor is None:
+            self.renderizador.dibujar()
+            return
+        inicio = time.perf_counter()
+        self.renderizador.dibujar()
+        medidor.fase("tablero.mostrar", time.perf_counter() - inicio)
 
-    def conocer_movimientos_posibles(self, jugador):
+    def conocer_movimientos_posibles(self, jugador) -> list:
+        """
+        Lista las jugadas sugeridas para el jugador, sin escribir en consola.
+        - En la primera jugada: todas las casillas de su borde de salida.
+        - Después: las casillas válidas a un salto diagonal de sus fichas.
+        - devuelve: Lista de coordenadas en texto (por ejemplo "C5").
+        """
         final_result = []
         is_first_play = len(jugador.pieces) == 0
-        # print(is_first_play)
         if(is_first_play):
             if(jugador.is_vertical_player):
                 y = self.filas[0]
@@ -52,202 +178,232 @@ class Tablero:
                 for fil in filas:
                     final_result.append(f"{fil}{x}")
         else: 
-            for ficha  in jugador.pieces:
-                result = self._construir_tupla_jugadas_posibles(ficha)
-                for res in result:
-                    print(res,123)
-                    final_result.append(res)
-        print(final_result) 
-            
-            
-
-    def _construir_tupla_jugadas_posibles(self, ficha):
-        cord_arriba_izquierda = self._find_cord(ficha.idx_x - 2, ficha.idx_y - 2)
-        cord_arriba_derecha = self._find_cord(ficha.idx_x + 2, ficha.idx_y - 2)
-        cord_abajo_izquierda = self._find_cord(ficha.idx_x - 2, ficha.idx_y + 2)
-        cord_abajo_derecha = self._find_cord(ficha.idx_x + 2, ficha.idx_y + 2)
-
-        list_result_cords = [cord_arriba_izquierda, cord_arriba_derecha, cord_abajo_izquierda, cord_abajo_derecha]
-
-        list_valid_result = []
-                
-        for result in list_result_cords:
-            if result: 
-                x, y = result
-                valid = self.validar_posicion(x, y, False, ficha.vertical_player, ficha.simbolo)
-                print(valid)
-                if valid:
-                    list_valid_result.append(f"{x}{y}")
-                
-       
-        # print(list_valid_result)
-        # print(list_result_cords)
-        print(list_valid_result)
-        return list_valid_result
-        # pos_arriba_izquierda = self.validar_posicion(,)
-        # pos_arriba_izquierda = self.validar_posicion(ficha.idx_x - 2)
-        # pos_arriba_izquierda = self.validar_posicion(ficha.idx_x - 2)
-        # pos_arriba_izquierda = self.validar_posicion(ficha.idx_x - 2)
-            
-            
-            
-    def _find_cord(self, idx_x, idx_y):
-        cord_x= None
-        cord_y= None
-        
-        if idx_x < len(self.columnas) and idx_x > 0:
-            cord_x = self.columnas[idx_x]
-        
-        if idx_y < len(self.filas) and idx_y >0:
-            cord_y = self.filas[idx_y]
-        
-        
-        # print(idx_x, idx_y, cord_x, cord_y)
-        if cord_x == None or cord_y == None:
-            return None 
-        
-        print(cord_x, cord_y)
-        return (cord_x, cord_y)
-
-    def validar_posicion(self, x: str, y: int, es_muralla= False, vertical_player = True, simbolo_jugador = "") -> bool:
+            textos = self._textos_celda
+            for celda in sorted(self.fichas_posibles(jugador.is_vertical_player)):
+                texto = textos.get(celda)
+                if texto is None:
+                    x, y = self.coordenadas_de(celda)
+                    texto = textos[celda] = f"{x}{y}"
+                final_result.append(texto)
+        return final_result
+
+    def fichas_posibles(self, vertical_player = True) -> set:
+        """
+        Celdas válidas a un salto diagonal de las fichas del jugador.
+        - devuelve: El conjunto mantenido por `movimientos` (no modificarlo).
+        """
+        return self.movimientos.fichas[indice_jugador(vertical_player)]
+
+    def murallas_posibles(self, vertical_player = True) -> list:
+        """
+        Murallas que el jugador puede construir ahora entre sus fichas.
+        - devuelve: Lista de pares (celda_a, celda_b) de los extremos.
+        """
+        return self.movimientos.extremos_murallas(indice_jugador(vertical_player))
+
+    def motivo_posicion(self, x: str, y: int, es_muralla= False, vertical_player = True) -> MotivoValidacion:
+        """
+        Motivo por el que (x, y) no admite una ficha o muralla, o VALIDA.
+        No escribe en consola; `Juego` traduce el código a un mensaje.
+        """
+        if x not in self.indice_fila:
+            return MotivoValidacion.FILA_INEXISTENTE
+        if y not in self.indice_columna:
+            return MotivoValidacion.COLUMNA_INEXISTENTE
+        return self.motivo_celda(self.celda_de(x, y), es_muralla, vertical_player)
+
+    def motivo_celda(self, celda: int, es_muralla= False, vertical_player = True) -> MotivoValidacion:
+        """
+        Igual que motivo_posicion pero recibiendo directamente el id de celda.
+        """
+        jugador = indice_jugador(vertical_player)
+        if self.bits.esta_ocupada(celda):
+            return MotivoValidacion.CASILLA_OCUPADA
+        if self.bits.en_limite_prohibido(jugador, celda):
+            return MotivoValidacion.LIMITE_RIVAL
+        if self.bits.en_extremo_ganador(jugador, celda) and not self.bits.tiene_apoyo(jugador, celda):
+            return MotivoValidacion.SIN_APOYO_EXTREMO
+        return MotivoValidacion.VALIDA
+
+    def motivo_muralla(self, extremo_a: int, extremo_b: int, vertical_player = True) -> MotivoValidacion:
+        """
+        Motivo por el que no se puede unir extremo_a con extremo_b, o VALIDA.
+        La consulta usa la tabla de cruces precalculada, así que es de costo constante.
+        """
+        id_muralla = self.bits.id_muralla(extremo_a, extremo_b)
+        if id_muralla is None:
+            return MotivoValidacion.NO_ES_SALTO_DIAGONAL
+        fichas = self.bits.fichas[indice_jugador(vertical_player)]
+        if not (fichas >> extremo_a) & 1 or not (fichas >> extremo_b) & 1:
+            return MotivoValidacion.FICHAS_AJENAS
+        if self.bits.cruza_muralla(id_muralla):
+            return MotivoValidacion.CRUZA_MURALLA
+        return MotivoValidacion.VALIDA
+
+    def validar_posicion(self, x: str, y: int, es_muralla= False, vertical_player = True) -> bool:
         """
         Valida si la posición (x, y) es válida para colocar ficha o muralla.
         """
+        return self.motivo_posicion(x, y, es_muralla, vertical_player) is MotivoValidacion.VALIDA
 
-        # print(x, y, es_muralla)
-        if x not in self.filas:
-            print(x, "no")
-            return False
-        
-        if y not in self.columnas:
-            print("no", y)
-            return False
-
-        
-        fila_idx = self.filas.index(x)
-        col_idx = self.columnas.index(y)
-
-        casilla_ocupada = self.matriz[fila_idx][col_idx].strip() not in (None, ".", "|", "-")
-        
-        mensaje_muralla = ""
-        mensaje_player = ""
-        if(es_muralla):
-            mensaje_muralla = " No se puede añadir una muralla:"
-
-        mensaje_player = "jugador horizontal" if vertical_player else "jugador vertical"
-
-        if casilla_ocupada:
-            print(f"{x}{y}:{mensaje_muralla} La casilla ya esta ocupada")
-            return False
-        
-        limite_correcto = self.validar_si_limite_correcto(col_idx, fila_idx, vertical_player)
-        if not limite_correcto:
-            print(f"{x}{y}:{mensaje_muralla} Usted no es un {mensaje_player}, no puede añadir una ficha en ese limite a menos de que este proximo a ganar")
-            return False
-        
-        if  fila_idx == len(self.filas)-1:
-            ficha_en_otro_extremo_no_valida = not self.validar_ficha_en_extremo_ganador(vertical_player, es_muralla, col_idx, fila_idx,simbolo_jugador, x, y)
-            if ficha_en_otro_extremo_no_valida:
-                return False
-        # return self.matriz[fila_idx][col_idx] is None
-        return True
-    
+    def validar_celda(self, celda: int, es_muralla= False, vertical_player = True) -> bool:
+        """
+        Igual que validar_posicion pero recibiendo directamente el id de celda.
+        """
+        return self.motivo_celda(celda, es_muralla, vertical_player) is MotivoValidacion.VALIDA
 
     def validar_ficha_en_extremo_ganador(self, vertical_player, es_muralla, idx_x, idx_y, simbolo_jugador, x,y):
-        if vertical_player:
-            idx_ficha_a_izquierda =idx_x - 2 
-            idx_ficha_a_derecha =idx_x + 2 
-            coleccion_a_evaluar = self.matriz[len(self.filas)-3] 
-            result_derecha = False
-            result_izquierda = False
-            if idx_ficha_a_derecha < len(coleccion_a_evaluar):
-                result_derecha =  coleccion_a_evaluar[idx_ficha_a_derecha] == simbolo_jugador
-            if idx_ficha_a_izquierda >= 0:
-                print(coleccion_a_evaluar[idx_ficha_a_izquierda], idx_x)
-                result_izquierda=  coleccion_a_evaluar[idx_ficha_a_izquierda] == simbolo_jugador
-
-            if not result_derecha and not result_izquierda:
-                print(f"{x}{y}: La ficha que intento poner en la fila ante penultima no se puede añadir ya que no hay ninguna ficha ni a derecha ni a izquierda en la fila J")
-                return False 
-            else:
-                return True
-        
-        else:
-            idx_ficha_arriba  =idx_y - 2 
-            idx_ficha_a_abajo =idx_y + 2 
-            coleccion_a_evaluar = []
-            
-            for fila in  self.matriz:
-                coleccion_a_evaluar.append(fila[len(fila)-3])
-            result_arriba = False
-            result_abajo = False
-            if idx_ficha_arriba > 0:
-                result_arriba =  coleccion_a_evaluar[idx_ficha_arriba] == simbolo_jugador
-            
-            if idx_ficha_a_izquierda >= 0:
-                # print(coleccion_a_evaluar[idx_ficha_a_izquierda], idx_x)
-                result_abajo=  coleccion_a_evaluar[idx_ficha_a_abajo] == simbolo_jugador
-
-            if not result_arriba and not result_abajo:
-                print(f"{x}{y}: La ficha que intento poner en la fila L no se puede añadir ya que no hay ninguna ficha ni a derecha ni a izquierda en la fila J")
-                return False 
-            else:
-                return True
+        # Requiere una ficha propia a dos saltos en la fila (o columna) N-3
+        celda = self.bits.celda(idx_y, idx_x)
+        return self.bits.tiene_apoyo(indice_jugador(vertical_player), celda)
 
      
     """ Validacion de que no puede poner una ficha
       en los limites de otro jugador a menos de que 
       hayan fichas en la fila o columna N-1, """
     def validar_si_limite_correcto(self, idx_x, idx_y, horizontal_player:bool) -> bool:
-        if horizontal_player: 
-            if idx_y > 0 and (idx_x == 0 or idx_x == len(self.columnas) - 1):
-                return False
-        else:
-            # print(idx_y, idxz_x)
-            if idx_x > 0 and (idx_y == 0 or idx_y == len(self.filas) - 1):
-                return False
-        return True
+        celda = self.bits.celda(idx_y, idx_x)
+        return not self.bits.en_limite_prohibido(indice_jugador(horizontal_player), celda)
 
-        
+    def validar_muralla(self, extremo_a: int, extremo_b: int, vertical_player = True) -> bool:
+        """
+        Valida que la muralla una dos fichas propias y no cruce otra muralla.
+        """
+        return self.motivo_muralla(extremo_a, extremo_b, vertical_player) is MotivoValidacion.VALIDA
 
-    def recibir_pieza(self, pieza, es_ficha, horizontal_player:bool, simbolo_jugador="") -> None:
+    def recibir_pieza(self, pieza, es_ficha, horizontal_player:bool, simbolo_jugador="", propietario=None) -> None:
         """
         Recibe una pieza (ficha o muralla) para añadirla al tablero.
+        Si no es válida no la coloca y deja el motivo en `ultimo_rechazo`.
+        Si se indica `propietario` (Jugador), la pieza se agrega a sus fichas o
+        murallas y `deshacer` la quita de ahí.
         """
-        # print(pieza)
-        if self.validar_posicion(pieza.x, pieza.y,not es_ficha,horizontal_player, simbolo_jugador ):
-
-            fila_idx = self.filas.index(pieza.x)
-            col_idx = self.columnas.index(pieza.y)
-            self.matriz[fila_idx][col_idx] = pieza.simbolo
-            if col_idx == len(self.columnas)-1: 
-                self.winner["is_winner"] = True
-                self.winner["player"] = "B"
-
-            if fila_idx == len(self.filas)-1: 
-                self.winner["is_winner"] = True
-                self.winner["player"] = "A"
-            return {"x_index":col_idx, "y_index":fila_idx}
-    
-    
-    def _mostrar_fila(self, fila, index):
-        # Etiqueta de fila (2 chars) + espacio; celdas (2 chars) separadas por 1 espacio
-        filaStr = f"{fila:>2} " + " ".join(self.matriz[index])
-        return filaStr
-    
-
-    def _get_rows_columns_table(self, columnas, filas):
-        matriz = [[". " for _ in columnas] for _ in filas]
-        for i in range(len(matriz)): 
-            fila = matriz[i]
-        
-            if i != 0 and i != len(matriz) -1:
-                fila[1] = "| "
-                fila[len(fila)-2] = "| "
-            
-            if i == 1 or i == len(matriz) - 2:
-                for iFila in range(len(fila)):
-                    if iFila > 0 and iFila < len(fila) -1:
-                        fila[iFila]= "- " 
-        
-        return matriz
\ No newline at end of file
+        medidor = instrumentacion.actual
+        if medidor is not None:
+            inicio = time.perf_counter()
+        celda = pieza.celda
+        if celda is None:
+            # Coordenada fuera del tablero o fichas que no forman un salto diagonal
+            if es_ficha:
+                motivo = self.motivo_posicion(pieza.x, pieza.y, False, horizontal_player)
+            else:
+                motivo = self.motivo_muralla(*pieza.celdas_extremos, horizontal_player)
+        else:
+            motivo = self.motivo_celda(celda, not es_ficha, horizontal_player)
+            if motivo is MotivoValidacion.VALIDA and not es_ficha:
+                motivo = self.motivo_muralla(*pieza.celdas_extremos, horizontal_player)
+        if medidor is not None:
+            validado = time.perf_counter()
+            medidor.fase("tablero.validar", validado - inicio)
+
+        if motivo is not MotivoValidacion.VALIDA:
+            if es_ficha:
+                etiqueta = f"{pieza.x}{pieza.y}"
+            else:
+                etiqueta = "-".join(f"{x}{y}" for x, y in map(self.coordenadas_de, pieza.celdas_extremos))
+            self.ultimo_rechazo = (motivo, etiqueta, not es_ficha)
+            return None
+
+        accion = AccionTablero(pieza, es_ficha, indice_jugador(horizontal_player), celda, propietario)
+        # Una jugada nueva descarta las acciones que se podían rehacer
+        if self.deshechas:
+            self.deshechas.clear()
+        self.ultimo_rechazo = None
+        self._aplicar(accion)
+        if medidor is not None:
+            medidor.fase("tablero.aplicar", time.perf_counter() - validado)
+        return {"x_index": celda % len(self.columnas), "y_index": celda // len(self.columnas)}
+
+    def colocar_sin_validar(self, pieza, es_ficha, horizontal_player: bool, propietario=None) -> None:
+        """
+        Coloca una pieza ya validada en otro lugar (p. ej. al restaurar una
+        instantánea). Igual que `TwixtState.place`, descarta el historial:
+        las piezas anteriores ya no se pueden deshacer.
+        """
+        accion = AccionTablero(pieza, es_ficha, indice_jugador(horizontal_player), pieza.celda, propietario)
+        self._aplicar(accion)
+        self.acciones.clear()
+        self.deshechas.clear()
+        self.bits.olvidar_historial()
+        self.movimientos.cambios.clear()
+
+    def _aplicar(self, accion: AccionTablero) -> None:
+        """Coloca la pieza ya validada de `accion`, guardando lo que hace falta para deshacerla."""
+        pieza = accion.pieza
+        celda = accion.celda
+        jugador = accion.jugador
+        bits = self.bits
+        movimientos = self.movimientos
+        accion.marca = len(movimientos.cambios)
+        if accion.es_ficha:
+            bits.colocar_ficha(jugador, celda)
+            movimientos.ficha_colocada(jugador, celda)
+            if self.registro is not None:
+                self.registro.anotar_ficha(jugador, celda)
+        else:
+            bits.colocar_muralla(jugador, celda, *pieza.celdas_extremos)
+            movimientos.muralla_colocada(jugador, bits.id_muralla(*pieza.celdas_extremos))
+            if self.registro is not None:
+                self.registro.anotar_muralla(jugador, *pieza.celdas_extremos)
+        if accion.propietario is not None:
+            if accion.es_ficha:
+                accion.propietario.add_piece(pieza)
+            else:
+                accion.propietario.add_wall(pieza)
+        self.glifos[celda] = pieza.simbolo
+        self.renderizador.marcar(celda)
+        self.acciones.append(accion)
+        # Solo gana quien une sus dos bordes meta mediante murallas
+        if bits.conecta_bordes(jugador):
+            accion.ganador_anterior = (self.winner["is_winner"], self.winner["player"])
+            self.winner["is_winner"] = True
+            self.winner["player"] = "A" if jugador == JUGADOR_VERTICAL else "B"
+
+    def deshacer(self):
+        """
+        Revierte la última pieza colocada en O(1) y la deja lista para `rehacer`.
+        - devuelve: La AccionTablero deshecha, o None si no había acciones.
+        """
+        if not self.acciones:
+            return None
+        accion = self.acciones.pop()
+        pieza = accion.pieza
+        celda = accion.celda
+        if accion.es_ficha:
+            self.bits.quitar_ficha(accion.jugador, celda)
+        else:
+            self.bits.quitar_muralla(accion.jugador, celda, *pieza.celdas_extremos)
+        self.movimientos.deshacer_hasta(accion.marca)
+        if self.registro is not None:
+            self.registro.acciones.pop()
+        if accion.propietario is not None:
+            if accion.es_ficha:
+                accion.propietario.remove_piece(pieza)
+            else:
+                accion.propietario.remove_wall(pieza)
+        del self.glifos[celda]
+        self.renderizador.marcar(celda)
+        if accion.ganador_anterior is not None:
+            self.winner["is_winner"], self.winner["player"] = accion.ganador_anterior
+            accion.ganador_anterior = None
+        self.deshechas.append(accion)
+        return accion
+
+    def rehacer(self):
+        """
+        Vuelve a colocar la última pieza deshecha.
+        - devuelve: La AccionTablero rehecha, o None si no había nada que rehacer.
+        """
+        if not self.deshechas:
+            return None
+        accion = self.deshechas.pop()
+        self._aplicar(accion)
+        return accion
+
+    def _mostrar_fila(self, fila, index, desde=0, hasta=None):
+        # Etiqueta de fila + espacio; celdas de `ancho_celda` separadas por 1 espacio.
+        # `desde`/`hasta` limitan las columnas dibujadas (ventana del Renderizador)
+        hasta = len(self.columnas) if hasta is None else hasta
+        ancho = self.ancho_celda
+        celdas = " ".join(f"{self.glifo(index, col_idx):<{ancho}}" for col_idx in range(desde, hasta))
+        return f"{fila:>{self.ancho_fila}} " + celdas
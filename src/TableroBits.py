@@ -0,0 +1,282 @@
+# tablero_bits.py
+from functools import lru_cache
+
+from src.TablaCruces import id_muralla, tabla_cruces
+from src.UnionFind import nuevo_union_find
+
+
+JUGADOR_VERTICAL = 0  # Jugador A
+JUGADOR_HORIZONTAL = 1  # Jugador B
+
+
+def indice_jugador(vertical_player: bool) -> int:
+    """Convierte la bandera `vertical_player` usada por Tablero/Ficha en un índice 0/1."""
+    return JUGADOR_VERTICAL if vertical_player else JUGADOR_HORIZONTAL
+
+
+@lru_cache(maxsize=None)
+def mascaras_apoyo(n_filas: int, n_columnas: int) -> tuple:
+    """
+    Máscaras de apoyo del extremo ganador, compartidas por todos los tableros de ese tamaño.
+
+    Returns:
+        (vertical, horizontal): para cada celda de la última fila, las fichas
+        de la fila N-3 a dos columnas; para cada celda de la última columna,
+        las de la columna N-3 a dos filas. Diccionarios celda -> máscara, que
+        no deben modificarse.
+    """
+    vertical = {}
+    if n_filas > 2:
+        fila_idx = n_filas - 1
+        for col_idx in range(n_columnas):
+            mascara = 0
+            for dc in (-2, 2):
+                if 0 <= col_idx + dc < n_columnas:
+                    mascara |= 1 << ((fila_idx - 2) * n_columnas + col_idx + dc)
+            vertical[fila_idx * n_columnas + col_idx] = mascara
+    horizontal = {}
+    if n_columnas > 2:
+        col_idx = n_columnas - 1
+        for fila_idx in range(n_filas):
+            mascara = 0
+            for df in (-2, 2):
+                if 0 <= fila_idx + df < n_filas:
+                    mascara |= 1 << ((fila_idx + df) * n_columnas + col_idx - 2)
+            horizontal[fila_idx * n_columnas + col_idx] = mascara
+    return vertical, horizontal
+
+
+class TableroBits:
+    """
+    Núcleo del tablero basado en bitboards.
+
+    Cada celda tiene un id plano `fila_idx * n_columnas + col_idx` y se
+    representa con el bit `1 << id` de un entero de Python. Por jugador se
+    guardan las fichas y las celdas centrales ocupadas por sus murallas, de modo
+    que las validaciones de ocupación, límites y apoyo en el extremo ganador se
+    reducen a unas pocas operaciones de bits, independientemente del tamaño del
+    tablero.
+
+    Attributes:
+        n_filas: Número de filas.
+        n_columnas: Número de columnas.
+        fichas: Bitboard de fichas por jugador (índice 0 = A, 1 = B).
+        murallas: Bitboard de celdas ocupadas por murallas por jugador.
+        ocupadas: Unión de todas las celdas ocupadas (fichas y murallas).
+        conexiones: Union-find por jugador sobre sus fichas, con dos nodos
+            virtuales (`nodo_inicio`, `nodo_fin`) para sus dos bordes meta.
+        cruces: Tabla compartida id de muralla -> ids de murallas que la cruzan.
+        puentes: Conjunto de ids de murallas colocadas (de ambos jugadores).
+        puentes_jugador: Ids de murallas colocadas por cada jugador.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int):
+        """
+        Inicializa el núcleo vacío y precalcula las máscaras de límites.
+
+        Args:
+            n_filas: Número de filas del tablero.
+            n_columnas: Número de columnas del tablero.
+        """
+        self.n_filas = n_filas
+        self.n_columnas = n_columnas
+        self.n_celdas = n_filas * n_columnas
+        self.fichas = [0, 0]
+        self.murallas = [0, 0]
+        self.ocupadas = 0
+
+        self.mascara_fila_superior = self._mascara_fila(0)
+        self.mascara_fila_inferior = self._mascara_fila(n_filas - 1)
+        self.mascara_columna_izquierda = self._mascara_columna(0)
+        self.mascara_columna_derecha = self._mascara_columna(n_columnas - 1)
+
+        # Límites donde cada jugador no puede colocar (ver Tablero.validar_si_limite_correcto)
+        laterales = self.mascara_columna_izquierda | self.mascara_columna_derecha
+        horizontales = self.mascara_fila_superior | self.mascara_fila_inferior
+        self.prohibidas = [
+            laterales & ~self.mascara_fila_superior,
+            horizontales & ~self.mascara_columna_izquierda,
+        ]
+        # Extremo ganador que exige una ficha propia de apoyo a dos saltos
+        self.extremo_ganador = [self.mascara_fila_inferior, self.mascara_columna_derecha]
+        self.apoyo = list(mascaras_apoyo(n_filas, n_columnas))
+
+        # Bordes meta: A une arriba con abajo, B izquierda con derecha. Como las
+        # murallas saltan de dos en dos, cada meta abarca el borde y la línea
+        # dibujada junto a él ("- " / "| "), para que ambas paridades puedan ganar.
+        self.borde_inicio = [
+            self.mascara_fila_superior | self._mascara_fila(1),
+            self.mascara_columna_izquierda | self._mascara_columna(1),
+        ]
+        self.borde_fin = [
+            self.mascara_fila_inferior | self._mascara_fila(n_filas - 2),
+            self.mascara_columna_derecha | self._mascara_columna(n_columnas - 2),
+        ]
+        self.nodo_inicio = self.n_celdas
+        self.nodo_fin = self.n_celdas + 1
+        self.conexiones = [nuevo_union_find(self.n_celdas + 2), nuevo_union_find(self.n_celdas + 2)]
+
+        self.cruces = tabla_cruces(n_filas, n_columnas)
+        self.puentes: set[int] = set()
+        self.puentes_jugador: list[set[int]] = [set(), set()]
+
+    def _mascara_fila(self, fila_idx: int) -> int:
+        return ((1 << self.n_columnas) - 1) << (fila_idx * self.n_columnas)
+
+    def _mascara_columna(self, col_idx: int) -> int:
+        mascara = 0
+        for fila_idx in range(self.n_filas):
+            mascara |= 1 << (fila_idx * self.n_columnas + col_idx)
+        return mascara
+
+    def celda(self, fila_idx: int, col_idx: int) -> int:
+        """Devuelve el id plano de la celda (fila_idx, col_idx)."""
+        return fila_idx * self.n_columnas + col_idx
+
+    def esta_ocupada(self, celda: int) -> bool:
+        """True si la celda contiene una ficha o una muralla."""
+        return (self.ocupadas >> celda) & 1 == 1
+
+    def en_limite_prohibido(self, jugador: int, celda: int) -> bool:
+        """True si la celda pertenece a un límite reservado al rival."""
+        return (self.prohibidas[jugador] >> celda) & 1 == 1
+
+    def en_extremo_ganador(self, jugador: int, celda: int) -> bool:
+        """True si la celda está en el extremo ganador del jugador."""
+        return (self.extremo_ganador[jugador] >> celda) & 1 == 1
+
+    def tiene_apoyo(self, jugador: int, celda: int) -> bool:
+        """True si hay una ficha propia a dos saltos que permita llegar al extremo."""
+        return self.fichas[jugador] & self.apoyo[jugador].get(celda, 0) != 0
+
+    def puede_colocar_ficha(self, jugador: int, celda: int) -> bool:
+        """
+        Valida en O(1) si el jugador puede colocar una ficha en la celda.
+
+        Args:
+            jugador: Índice del jugador (0 = A vertical, 1 = B horizontal).
+            celda: Id plano de la celda.
+
+        Returns:
+            True si la celda está libre, fuera de los límites del rival y, si es
+            el extremo ganador, con ficha propia de apoyo.
+        """
+        bit = 1 << celda
+        if self.ocupadas & bit or self.prohibidas[jugador] & bit:
+            return False
+        if self.extremo_ganador[jugador] & bit:
+            return self.tiene_apoyo(jugador, celda)
+        return True
+
+    def colocar_ficha(self, jugador: int, celda: int) -> None:
+        """Marca la celda como ficha del jugador (sin validar).
+
+        Si la celda está en un borde meta del jugador se une con su nodo virtual.
+        """
+        bit = 1 << celda
+        self.fichas[jugador] |= bit
+        self.ocupadas |= bit
+        if self.borde_inicio[jugador] & bit:
+            self.conexiones[jugador].unir(celda, self.nodo_inicio)
+        if self.borde_fin[jugador] & bit:
+            self.conexiones[jugador].unir(celda, self.nodo_fin)
+
+    def quitar_ficha(self, jugador: int, celda: int) -> None:
+        """Revierte `colocar_ficha`. Debe llamarse en orden inverso a las colocaciones."""
+        bit = 1 << celda
+        if self.borde_fin[jugador] & bit:
+            self.conexiones[jugador].deshacer()
+        if self.borde_inicio[jugador] & bit:
+            self.conexiones[jugador].deshacer()
+        self.fichas[jugador] &= ~bit
+        self.ocupadas &= ~bit
+
+    def id_muralla(self, extremo_a: int, extremo_b: int):
+        """Id de la muralla entre dos celdas, o None si no están a un salto diagonal."""
+        return id_muralla(extremo_a, extremo_b, self.n_columnas)
+
+    def cruza_muralla(self, id_muralla: int) -> bool:
+        """True si la muralla cruza alguna muralla ya colocada."""
+        puentes = self.puentes
+        for otra in self.cruces[id_muralla]:
+            if otra in puentes:
+                return True
+        return False
+
+    def puede_colocar_muralla(self, jugador: int, extremo_a: int, extremo_b: int) -> bool:
+        """
+        Valida en tiempo constante una muralla entre dos fichas del jugador.
+
+        Args:
+            jugador: Índice del jugador.
+            extremo_a: Celda de la primera ficha.
+            extremo_b: Celda de la segunda ficha.
+
+        Returns:
+            True si ambas fichas son del jugador, están a un salto diagonal, la
+            celda central está libre y la muralla no cruza a ninguna otra.
+        """
+        id_muralla = self.id_muralla(extremo_a, extremo_b)
+        if id_muralla is None:
+            return False
+        fichas = self.fichas[jugador]
+        if not (fichas >> extremo_a) & 1 or not (fichas >> extremo_b) & 1:
+            return False
+        centro = (extremo_a + extremo_b) // 2
+        if (self.ocupadas >> centro) & 1:
+            return False
+        return not self.cruza_muralla(id_muralla)
+
+    def colocar_muralla(self, jugador: int, celda: int, extremo_a: int, extremo_b: int) -> None:
+        """Marca la celda central de una muralla del jugador (sin validar).
+
+        Args:
+            jugador: Índice del jugador dueño de la muralla.
+            celda: Celda central donde se dibuja la muralla.
+            extremo_a: Celda de la primera ficha conectada.
+            extremo_b: Celda de la segunda ficha conectada.
+        """
+        bit = 1 << celda
+        self.murallas[jugador] |= bit
+        self.ocupadas |= bit
+        id_muralla = self.id_muralla(extremo_a, extremo_b)
+        self.puentes.add(id_muralla)
+        self.puentes_jugador[jugador].add(id_muralla)
+        self.conexiones[jugador].unir(extremo_a, extremo_b)
+
+    def quitar_muralla(self, jugador: int, celda: int, extremo_a: int, extremo_b: int) -> None:
+        """Revierte `colocar_muralla`. Debe llamarse en orden inverso a las colocaciones."""
+        self.conexiones[jugador].deshacer()
+        id_muralla = self.id_muralla(extremo_a, extremo_b)
+        self.puentes.discard(id_muralla)
+        self.puentes_jugador[jugador].discard(id_muralla)
+        bit = 1 << celda
+        self.murallas[jugador] &= ~bit
+        self.ocupadas &= ~bit
+
+    def conecta_bordes(self, jugador: int) -> bool:
+        """True si las murallas del jugador ya unen sus dos bordes meta."""
+        return self.conexiones[jugador].conectados(self.nodo_inicio, self.nodo_fin)
+
+    def ganador(self):
+        """Devuelve el índice del jugador que conectó sus bordes, o None."""
+        for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+            if self.conecta_bordes(jugador):
+                return jugador
+        return None
+
+    def olvidar_historial(self) -> None:
+        """Descarta lo necesario para deshacer las piezas ya colocadas (ver `UnionFind.olvidar`)."""
+        for conexiones in self.conexiones:
+            conexiones.olvidar()
+
+    def limpiar(self) -> None:
+        """Vacía el núcleo conservando las máscaras precalculadas."""
+        self.fichas = [0, 0]
+        self.murallas = [0, 0]
+        self.ocupadas = 0
+        for conexiones in self.conexiones:
+            conexiones.limpiar()
+        self.puentes.clear()
+        for puentes in self.puentes_jugador:
+            puentes.clear()
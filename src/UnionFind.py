@@ -0,0 +1,161 @@
+# union_find.py
+
+# Nodos hasta los que conviene la versión densa (listas); por encima, la dispersa
+MAX_NODOS_DENSO = 4096
+
+
+class UnionFind:
+    """
+    Conjuntos disjuntos (union-find) con unión por tamaño.
+
+    No se comprimen caminos para que cada unión pueda deshacerse en O(1): la
+    profundidad de los árboles queda acotada por log2(n), así que `encontrar`
+    recorre a lo sumo unos pocos nodos incluso en tableros grandes.
+
+    Guarda listas densas de `n` nodos, que son lo más rápido de recorrer; para
+    tableros grandes está `UnionFindDisperso` (ver `nuevo_union_find`).
+
+    Attributes:
+        n: Número de nodos.
+        padre: Padre de cada nodo (la raíz es su propio padre).
+        tamano: Tamaño del conjunto para cada raíz.
+        historial: Pila de uniones realizadas, usada por `deshacer`. Quien
+            deja de poder deshacer (p. ej. al colocar piezas fijas) la vacía
+            con `olvidar`, para que no crezca sin límite.
+    """
+
+    def __init__(self, n: int):
+        """
+        Crea `n` conjuntos unitarios.
+
+        Args:
+            n: Número de nodos.
+        """
+        self.n = n
+        self.padre = list(range(n))
+        self.tamano = [1] * n
+        self.historial: list = []
+
+    def encontrar(self, nodo: int) -> int:
+        """Devuelve la raíz del conjunto que contiene a `nodo`."""
+        padre = self.padre
+        while padre[nodo] != nodo:
+            nodo = padre[nodo]
+        return nodo
+
+    def unir(self, a: int, b: int) -> bool:
+        """
+        Une los conjuntos de `a` y `b`.
+
+        Returns:
+            True si estaban separados, False si ya compartían conjunto.
+        """
+        raiz_a = self.encontrar(a)
+        raiz_b = self.encontrar(b)
+        if raiz_a == raiz_b:
+            self.historial.append(None)
+            return False
+        if self.tamano[raiz_a] < self.tamano[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.padre[raiz_b] = raiz_a
+        self.tamano[raiz_a] += self.tamano[raiz_b]
+        self.historial.append(raiz_b)
+        return True
+
+    def deshacer(self) -> None:
+        """Revierte la última llamada a `unir`."""
+        raiz_b = self.historial.pop()
+        if raiz_b is None:
+            return
+        raiz_a = self.padre[raiz_b]
+        self.padre[raiz_b] = raiz_b
+        self.tamano[raiz_a] -= self.tamano[raiz_b]
+
+    def olvidar(self) -> None:
+        """Descarta el historial: las uniones hechas hasta ahora ya no se pueden deshacer."""
+        self.historial.clear()
+
+    def conectados(self, a: int, b: int) -> bool:
+        """True si `a` y `b` pertenecen al mismo conjunto."""
+        return self.encontrar(a) == self.encontrar(b)
+
+    def limpiar(self) -> None:
+        """Vuelve a dejar todos los nodos en conjuntos unitarios."""
+        self.padre = list(range(self.n))
+        self.tamano = [1] * self.n
+        self.historial.clear()
+
+    def padres(self) -> list:
+        """Lista densa con el padre de cada uno de los `n` nodos (la raíz es su propio padre)."""
+        return list(self.padre)
+
+
+class UnionFindDisperso(UnionFind):
+    """
+    `UnionFind` que solo guarda los nodos que ya se unieron a otro.
+
+    La memoria (y `limpiar`) crece con las uniones y no con `n`, a cambio de
+    un `encontrar` algo más lento (consultas a diccionario). Lo usan los
+    tableros grandes, donde la mayoría de las celdas nunca se conectan.
+
+    Attributes:
+        padre: Padre de cada nodo que no es raíz (los ausentes son raíz).
+        tamano: Tamaño del conjunto de cada raíz con más de un nodo.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.padre: dict[int, int] = {}
+        self.tamano: dict[int, int] = {}
+        self.historial: list = []
+
+    def encontrar(self, nodo: int) -> int:
+        padre = self.padre
+        siguiente = padre.get(nodo)
+        while siguiente is not None:
+            nodo = siguiente
+            siguiente = padre.get(nodo)
+        return nodo
+
+    def unir(self, a: int, b: int) -> bool:
+        raiz_a = self.encontrar(a)
+        raiz_b = self.encontrar(b)
+        if raiz_a == raiz_b:
+            self.historial.append(None)
+            return False
+        tamano = self.tamano
+        tamano_a, tamano_b = tamano.get(raiz_a, 1), tamano.get(raiz_b, 1)
+        if tamano_a < tamano_b:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.padre[raiz_b] = raiz_a
+        tamano[raiz_a] = tamano_a + tamano_b
+        self.historial.append(raiz_b)
+        return True
+
+    def deshacer(self) -> None:
+        raiz_b = self.historial.pop()
+        if raiz_b is None:
+            return
+        raiz_a = self.padre.pop(raiz_b)
+        tamano = self.tamano
+        restante = tamano[raiz_a] - tamano.get(raiz_b, 1)
+        if restante > 1:
+            tamano[raiz_a] = restante
+        else:
+            del tamano[raiz_a]
+
+    def limpiar(self) -> None:
+        self.padre.clear()
+        self.tamano.clear()
+        self.historial.clear()
+
+    def padres(self) -> list:
+        padres = list(range(self.n))
+        for nodo, padre in self.padre.items():
+            padres[nodo] = padre
+        return padres
+
+
+def nuevo_union_find(n: int) -> UnionFind:
+    """`UnionFind` denso hasta `MAX_NODOS_DENSO` nodos; `UnionFindDisperso` por encima."""
+    return UnionFind(n) if n <= MAX_NODOS_DENSO else UnionFindDisperso(n)
@@ -0,0 +1,305 @@
+# batch_eval.py
+from functools import lru_cache
+
+from src.ai.heuristics import PESOS, VICTORIA, _pesos_centro, evaluate, progreso
+from src.TableroBits import JUGADOR_VERTICAL, TableroBits
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se evalúa posición por posición
+    np = None
+
+HAY_NUMPY = np is not None
+
+
+@lru_cache(maxsize=None)
+def _tablas(n_filas: int, n_columnas: int) -> tuple:
+    # Máscaras por tamaño como arreglos (2, n_filas, n_columnas) y pesos del centro
+    bits = TableroBits(n_filas, n_columnas)
+    prohibidas = np.stack([_a_matriz(bits.prohibidas[j], n_filas, n_columnas) for j in (0, 1)])
+    extremo = np.stack([_a_matriz(bits.extremo_ganador[j], n_filas, n_columnas) for j in (0, 1)])
+    centro = np.array(_pesos_centro(n_filas, n_columnas)).reshape(n_filas, n_columnas)
+    return prohibidas, extremo, centro
+
+
+def _a_matriz(bitboard: int, n_filas: int, n_columnas: int):
+    n_celdas = n_filas * n_columnas
+    crudo = np.frombuffer(bitboard.to_bytes((n_celdas + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(crudo, bitorder="little")[:n_celdas].astype(bool).reshape(n_filas, n_columnas)
+
+
+def _rangos(state, jugador: int) -> dict:
+    # Raíz union-find -> [mínimo, máximo] en el eje objetivo, como en heuristics.progreso
+    bits = state.bits
+    conexiones = bits.conexiones[jugador]
+    n_columnas = state.n_cols
+    vertical = jugador == JUGADOR_VERTICAL
+    rangos: dict[int, list[int]] = {}
+    fichas = bits.fichas[jugador]
+    while fichas:
+        bajo = fichas & -fichas
+        celda = bajo.bit_length() - 1
+        fichas ^= bajo
+        eje = celda // n_columnas if vertical else celda % n_columnas
+        raiz = conexiones.encontrar(celda)
+        rango = rangos.get(raiz)
+        if rango is None:
+            rangos[raiz] = [eje, eje]
+        elif eje < rango[0]:
+            rango[0] = eje
+        elif eje > rango[1]:
+            rango[1] = eje
+    return rangos
+
+
+def _progresos_hijos(state, jugadas: list) -> tuple:
+    """
+    Progreso del jugador en turno y ganador para cada hijo, sin aplicar jugadas.
+
+    Una jugada solo puede unir componentes del que mueve: la ficha nueva se
+    suma a los nodos virtuales de los bordes que toca y la muralla fusiona los
+    componentes de sus extremos. La extensión del componente resultante es la
+    unión de las extensiones fusionadas.
+    """
+    jugador = state.turn
+    bits = state.bits
+    conexiones = bits.conexiones[jugador]
+    encontrar = conexiones.encontrar
+    n_columnas = state.n_cols
+    n_celdas = state.n_cells
+    vertical = jugador == JUGADOR_VERTICAL
+    largo = state.n_rows if vertical else n_columnas
+    rangos = _rangos(state, jugador)
+    mejor = max((hi - lo for lo, hi in rangos.values()), default=-1)
+    raiz_inicio = encontrar(bits.nodo_inicio)
+    raiz_fin = encontrar(bits.nodo_fin)
+    inicio = bits.borde_inicio[jugador]
+    fin = bits.borde_fin[jugador]
+
+    progresos = []
+    ganadores = []
+    for jugada in jugadas:
+        if jugada < n_celdas:
+            eje = jugada // n_columnas if vertical else jugada % n_columnas
+            lo = hi = eje
+            raices = set()
+            if (inicio >> jugada) & 1:
+                raices.add(raiz_inicio)
+            if (fin >> jugada) & 1:
+                raices.add(raiz_fin)
+        else:
+            a, b, _ = state.wall_ends(jugada - n_celdas)
+            raices = {encontrar(a), encontrar(b)}
+            lo, hi = largo, -1
+        for raiz in raices:
+            rango = rangos.get(raiz)
+            if rango is not None:
+                lo = min(lo, rango[0])
+                hi = max(hi, rango[1])
+        extension = max(mejor, hi - lo)
+        progresos.append((extension + 1) / largo if extension >= 0 else 0.0)
+        ganadores.append(raiz_inicio in raices and raiz_fin in raices)
+    return progresos, ganadores
+
+
+def _puntuar(fichas, ocupadas, puentes, avance, turnos, n_filas: int, n_columnas: int, pesos: dict):
+    """
+    Evalúa un lote de posiciones en una sola pasada de NumPy.
+
+    Args:
+        fichas: Arreglo booleano (B, 2, n_filas, n_columnas).
+        ocupadas: Arreglo booleano (B, n_filas, n_columnas).
+        puentes: Murallas por jugador, (B, 2).
+        avance: Progreso por jugador, (B, 2).
+        turnos: Jugador en turno de cada posición, (B,).
+
+    Returns:
+        Arreglo (B,) con la puntuación desde el jugador en turno.
+    """
+    prohibidas, extremo, centro = _tablas(n_filas, n_columnas)
+    n_celdas = n_filas * n_columnas
+
+    piezas = fichas.sum(axis=(2, 3))
+    cercania = (fichas * centro).sum(axis=(2, 3))
+    # Pares a un salto diagonal: producto de la matriz con ella misma desplazada (+2, ±2)
+    enlaces = (fichas[:, :, :-2, :-2] & fichas[:, :, 2:, 2:]).sum(axis=(2, 3)) + (
+        fichas[:, :, :-2, 2:] & fichas[:, :, 2:, :-2]
+    ).sum(axis=(2, 3))
+
+    # Movilidad: celdas libres y permitidas; el extremo ganador exige apoyo a dos saltos
+    libres = ~ocupadas[:, None] & ~prohibidas[None]
+    apoyo_a = np.zeros((len(fichas), n_columnas), dtype=bool)
+    apoyo_b = np.zeros((len(fichas), n_filas), dtype=bool)
+    if n_filas > 2:
+        fila = fichas[:, 0, n_filas - 3]
+        apoyo_a[:, 2:] |= fila[:, :-2]
+        apoyo_a[:, :-2] |= fila[:, 2:]
+    if n_columnas > 2:
+        columna = fichas[:, 1, :, n_columnas - 3]
+        apoyo_b[:, 2:] |= columna[:, :-2]
+        apoyo_b[:, :-2] |= columna[:, 2:]
+    sin_apoyo = np.zeros_like(libres)
+    sin_apoyo[:, 0, n_filas - 1] = ~apoyo_a
+    sin_apoyo[:, 1, :, n_columnas - 1] = ~apoyo_b
+    movilidad = (libres & ~(extremo[None] & sin_apoyo)).sum(axis=(2, 3)) / n_celdas
+
+    conectividad = 2 * puentes + enlaces
+    total = (
+        pesos["progreso"] * avance
+        + pesos["piezas"] * piezas
+        + pesos["centro"] * cercania
+        + pesos["conectividad"] * conectividad
+        + pesos["movilidad"] * movilidad
+    )
+    signo = np.where(turnos == JUGADOR_VERTICAL, 1.0, -1.0)
+    return signo * (total[:, 0] - total[:, 1])
+
+
+def evaluate_batch(states: list, pesos=None) -> list[float]:
+    """
+    Evalúa varias posiciones a la vez; equivale a `[evaluate(s) for s in states]`.
+
+    Args:
+        states: `TwixtState` del mismo tamaño de tablero.
+        pesos: Pesos de cada componente; por defecto `PESOS`.
+
+    Returns:
+        Puntuaciones desde el jugador en turno de cada posición.
+    """
+    if np is None or not states:
+        return [evaluate(state, pesos) for state in states]
+    if pesos is None:
+        pesos = PESOS
+    n_filas, n_columnas = states[0].n_rows, states[0].n_cols
+    fichas = np.stack(
+        [
+            np.stack([_a_matriz(s.bits.fichas[j], n_filas, n_columnas) for j in (0, 1)])
+            for s in states
+        ]
+    )
+    ocupadas = np.stack([_a_matriz(s.bits.ocupadas, n_filas, n_columnas) for s in states])
+    puentes = np.array([[len(p) for p in s.bits.puentes_jugador] for s in states])
+    avance = np.array([[progreso(s, 0), progreso(s, 1)] for s in states])
+    turnos = np.array([s.turn for s in states])
+    valores = _puntuar(fichas, ocupadas, puentes, avance, turnos, n_filas, n_columnas, pesos).tolist()
+    for i, state in enumerate(states):
+        if state.winner is not None:
+            valores[i] = VICTORIA if state.winner == state.turn else -VICTORIA
+    return valores
+
+
+def evaluate_children(state, moves=None, pesos=None) -> list[float]:
+    """
+    Evalúa todos los hijos de una posición en una sola llamada.
+
+    El resultado de cada hijo coincide con `evaluate` aplicado tras
+    `state.make(jugada)`, es decir, desde el punto de vista del rival. Con
+    NumPy, el tablero padre se replica en un tensor (B, 2, filas, columnas), se
+    marcan las celdas de cada jugada y todos los términos se calculan de una
+    vez; el progreso y la victoria se derivan de los componentes del padre.
+
+    Args:
+        state: `TwixtState` padre (no se modifica).
+        moves: Jugadas a evaluar; por defecto `state.legal_moves()`.
+        pesos: Pesos de cada componente; por defecto `PESOS`.
+
+    Returns:
+        Lista de puntuaciones en el orden de `moves`.
+    """
+    if moves is None:
+        moves = state.legal_moves()
+    # Los mapas de distancia no se pueden replicar en el tensor: se evalúa hijo a hijo
+    if np is None or not moves or state.winner is not None or state.distances is not None:
+        valores = []
+        for jugada in moves:
+            state.make(jugada)
+            valores.append(evaluate(state, pesos))
+            state.unmake()
+        return valores
+    if pesos is None:
+        pesos = PESOS
+    jugador = state.turn
+    rival = jugador ^ 1
+    bits = state.bits
+    n_filas, n_columnas = state.n_rows, state.n_cols
+    n_celdas = state.n_cells
+    n_hijos = len(moves)
+
+    jugadas = np.array(moves)
+    es_ficha = jugadas < n_celdas
+    fichas = np.repeat(
+        np.stack([_a_matriz(bits.fichas[j], n_filas, n_columnas) for j in (0, 1)])[None], n_hijos, axis=0
+    )
+    ocupadas = np.repeat(_a_matriz(bits.ocupadas, n_filas, n_columnas)[None], n_hijos, axis=0)
+    indices = np.arange(n_hijos)
+    celdas_ficha = jugadas[es_ficha]
+    fichas[indices[es_ficha], jugador, celdas_ficha // n_columnas, celdas_ficha % n_columnas] = True
+    ocupadas[indices[es_ficha], celdas_ficha // n_columnas, celdas_ficha % n_columnas] = True
+    centros = np.array([state.wall_ends(int(m) - n_celdas)[2] for m in jugadas[~es_ficha]], dtype=int)
+    ocupadas[indices[~es_ficha], centros // n_columnas, centros % n_columnas] = True
+
+    puentes = np.empty((n_hijos, 2))
+    puentes[:, jugador] = len(bits.puentes_jugador[jugador]) + (~es_ficha)
+    puentes[:, rival] = len(bits.puentes_jugador[rival])
+    progresos, ganadores = _progresos_hijos(state, moves)
+    avance = np.empty((n_hijos, 2))
+    avance[:, jugador] = progresos
+    avance[:, rival] = progreso(state, rival)
+    turnos = np.full(n_hijos, rival)
+
+    valores = _puntuar(fichas, ocupadas, puentes, avance, turnos, n_filas, n_columnas, pesos).tolist()
+    for i, gano in enumerate(ganadores):
+        if gano:
+            valores[i] = -VICTORIA
+    return valores
+
+
+def medir_aceleracion(n_posiciones: int = 3, repeticiones: int = 20) -> dict:
+    """
+    Compara `evaluate` hijo por hijo (make/evaluate/unmake) con `evaluate_children`.
+
+    Args:
+        n_posiciones: Posiciones estándar de 20x20 a evaluar.
+        repeticiones: Veces que se evalúan todos los hijos de cada posición.
+
+    Returns:
+        Diccionario con los tiempos por hijo y la aceleración obtenida.
+    """
+    import time
+
+    from src.ai.parallel import posicion_estandar
+
+    posiciones = [posicion_estandar(n_jugadas=20, semilla=s) for s in range(n_posiciones)]
+    hijos = sum(len(state.legal_moves()) for state in posiciones) * repeticiones
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for state in posiciones:
+            for jugada in state.legal_moves():
+                state.make(jugada)
+                evaluate(state)
+                state.unmake()
+    uno_a_uno = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for state in posiciones:
+            evaluate_children(state)
+    en_lote = time.perf_counter() - inicio
+    return {
+        "numpy": HAY_NUMPY,
+        "hijos": hijos,
+        "us_por_hijo": uno_a_uno / hijos * 1e6,
+        "us_por_hijo_lote": en_lote / hijos * 1e6,
+        "aceleracion": uno_a_uno / en_lote if en_lote else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mide la evaluación en lote de los hijos de una posición.")
+    parser.add_argument("--posiciones", type=int, default=3)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+    print(medir_aceleracion(args.posiciones, args.repeticiones))
@@ -0,0 +1,379 @@
+# book.py
+import mmap
+import struct
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import src.Instrumentacion as instrumentacion
+from src.ai.batch_eval import evaluate_children
+from src.ai.solver import ResultadoBusqueda, Solver
+from src.ai.state import TwixtState, tablas_zobrist
+from src.TablaCruces import id_muralla, tabla_extremos
+
+MAGIA_LIBRO = b"TWXB"
+VERSION = 1
+# Cabecera: magia, versión, filas, columnas, relleno
+CABECERA = struct.Struct("<4sHHHH")
+# Entrada: hash canónico, jugada (en el marco canónico), peso
+ENTRADA = struct.Struct("<QIi")
+
+# Libro incluido para el tablero 20x20 de `Juego`
+LIBRO_20X20 = Path(__file__).resolve().parents[2] / "libros" / "twixt_20x20.twxb"
+
+# Identidad, espejo de columnas, espejo de filas y giro de 180 grados
+SIMETRIAS = 4
+
+
+@lru_cache(maxsize=None)
+def tablas_simetria(n_filas: int, n_columnas: int) -> tuple:
+    """
+    Imagen de cada jugada bajo las cuatro simetrías que conservan los bordes de cada jugador.
+
+    Todas son involuciones, así que la misma tabla lleva del marco canónico al
+    real y viceversa.
+
+    Returns:
+        Tupla indexada por simetría con la tupla jugada -> jugada (None para
+        ids de muralla que no existen en el tablero).
+    """
+    n_celdas = n_filas * n_columnas
+    extremos = tabla_extremos(n_filas, n_columnas)
+    tablas = []
+    for simetria in range(SIMETRIAS):
+        espejo_columnas = simetria & 1
+        espejo_filas = simetria & 2
+
+        def imagen(celda: int) -> int:
+            fila, col = divmod(celda, n_columnas)
+            if espejo_filas:
+                fila = n_filas - 1 - fila
+            if espejo_columnas:
+                col = n_columnas - 1 - col
+            return fila * n_columnas + col
+
+        jugadas = [imagen(celda) for celda in range(n_celdas)]
+        for extremo in extremos:
+            if extremo is None:
+                jugadas.append(None)
+            else:
+                a, b, _ = extremo
+                jugadas.append(n_celdas + id_muralla(imagen(a), imagen(b), n_columnas))
+        tablas.append(tuple(jugadas))
+    return tuple(tablas)
+
+
+def _bits(valor: int):
+    while valor:
+        menor = valor & -valor
+        yield menor.bit_length() - 1
+        valor ^= menor
+
+
+def hash_canonico(state) -> tuple:
+    """
+    Hash Zobrist mínimo entre las cuatro simetrías de la posición.
+
+    Args:
+        state: `TwixtState` de la posición.
+
+    Returns:
+        (hash, simetria): el hash canónico y la simetría que lleva la posición
+        a su forma canónica.
+    """
+    z_fichas, z_murallas, z_turno = tablas_zobrist(state.n_rows, state.n_cols)
+    tablas = tablas_simetria(state.n_rows, state.n_cols)
+    n_celdas = state.n_cells
+    hashes = [z_turno if state.turn else 0] * SIMETRIAS
+    for jugador in (0, 1):
+        claves_fichas = z_fichas[jugador]
+        claves_murallas = z_murallas[jugador]
+        for celda in _bits(state.bits.fichas[jugador]):
+            for simetria in range(SIMETRIAS):
+                hashes[simetria] ^= claves_fichas[tablas[simetria][celda]]
+        for id_m in state.bits.puentes_jugador[jugador]:
+            for simetria in range(SIMETRIAS):
+                hashes[simetria] ^= claves_murallas[tablas[simetria][n_celdas + id_m] - n_celdas]
+    mejor = min(range(SIMETRIAS), key=hashes.__getitem__)
+    return hashes[mejor], mejor
+
+
+def _es_legal(state, jugada: int) -> bool:
+    bits = state.bits
+    if jugada < state.n_cells:
+        return bits.puede_colocar_ficha(state.turn, jugada)
+    a, b, _ = state.wall_ends(jugada - state.n_cells)
+    return bits.puede_colocar_muralla(state.turn, a, b)
+
+
+class LibroAperturas:
+    """
+    Libro de aperturas en disco: tabla de entradas ordenadas por hash canónico.
+
+    El archivo se lee con `mmap` y cada consulta es una búsqueda binaria sobre
+    las entradas de ancho fijo, sin cargar el libro en memoria. Las posiciones
+    equivalentes por simetría comparten entrada (ver `hash_canonico`).
+
+    La regla de apoyo del extremo ganador no es simétrica, así que una jugada
+    reflejada puede ser ilegal en la posición real; `buscar` la descarta en ese
+    caso y se recurre a la búsqueda normal.
+
+    Attributes:
+        ruta: Archivo del libro.
+        n_filas: Filas del tablero del libro.
+        n_columnas: Columnas del tablero del libro.
+        n_entradas: Número de entradas.
+    """
+
+    def __init__(self, ruta: str):
+        """
+        Abre un libro guardado con `GeneradorLibro.guardar`.
+
+        Raises:
+            ValueError: Si el archivo no es un libro de aperturas.
+        """
+        self.ruta = str(ruta)
+        self._archivo = open(self.ruta, "rb")
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, self.n_filas, self.n_columnas, _ = CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA_LIBRO or version != VERSION:
+            self.cerrar()
+            raise ValueError(f"{self.ruta} no es un libro de aperturas")
+        self.n_entradas = (len(self._mapa) - CABECERA.size) // ENTRADA.size
+
+    def _entrada(self, indice: int) -> tuple:
+        return ENTRADA.unpack_from(self._mapa, CABECERA.size + indice * ENTRADA.size)
+
+    def _primera(self, clave: int) -> int:
+        # Primera entrada con hash >= clave
+        bajo, alto = 0, self.n_entradas
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._entrada(medio)[0] < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def jugadas(self, state) -> list:
+        """
+        Jugadas del libro para la posición, ya llevadas al marco real.
+
+        Returns:
+            Lista de (jugada, peso) ordenada de mayor a menor peso.
+        """
+        if (state.n_rows, state.n_cols) != (self.n_filas, self.n_columnas):
+            return []
+        clave, simetria = hash_canonico(state)
+        tabla = tablas_simetria(self.n_filas, self.n_columnas)[simetria]
+        resultado = []
+        indice = self._primera(clave)
+        while indice < self.n_entradas:
+            hash_entrada, jugada, peso = self._entrada(indice)
+            if hash_entrada != clave:
+                break
+            resultado.append((tabla[jugada], peso))
+            indice += 1
+        resultado.sort(key=lambda par: -par[1])
+        return resultado
+
+    def buscar(self, state):
+        """
+        Mejor jugada legal del libro para la posición, o None si no está.
+
+        Args:
+            state: `TwixtState` de la posición.
+        """
+        for jugada, _ in self.jugadas(state):
+            if jugada is not None and _es_legal(state, jugada):
+                return jugada
+        return None
+
+    def cerrar(self) -> None:
+        """Libera el mapa y el archivo."""
+        self._mapa.close()
+        self._archivo.close()
+
+    def __len__(self) -> int:
+        return self.n_entradas
+
+
+class SolverConLibro:
+    """
+    Consulta el libro antes de buscar; si la posición no está, delega en `motor`.
+
+    Tiene la misma interfaz `solve(state)` que `Solver` y `MCTSSolver`.
+
+    Attributes:
+        libro: `LibroAperturas` consultado.
+        motor: Buscador usado fuera del libro.
+        aciertos: Jugadas respondidas por el libro.
+    """
+
+    def __init__(self, libro: LibroAperturas, motor):
+        self.libro = libro
+        self.motor = motor
+        self.aciertos = 0
+
+    def solve(self, state) -> ResultadoBusqueda:
+        """Jugada del libro (profundidad 0, sin nodos) o el resultado de `motor.solve`."""
+        inicio = time.perf_counter()
+        jugada = self.libro.buscar(state)
+        if jugada is None:
+            return self.motor.solve(state)
+        self.aciertos += 1
+        resultado = ResultadoBusqueda(jugada, 0.0, 0, 0, time.perf_counter() - inicio, [jugada])
+        medidor = instrumentacion.actual
+        if medidor is not None:
+            medidor.busqueda("libro", resultado)
+        return resultado
+
+
+class GeneradorLibro:
+    """
+    Acumula pares (posición, jugada) con peso y los escribe como libro ordenado.
+
+    Attributes:
+        n_filas: Filas del tablero.
+        n_columnas: Columnas del tablero.
+        pesos: Diccionario (hash canónico, jugada canónica) -> peso.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int):
+        self.n_filas = n_filas
+        self.n_columnas = n_columnas
+        self.pesos: dict = {}
+        self._tablas = tablas_simetria(n_filas, n_columnas)
+
+    def agregar(self, state, jugada: int, peso: int = 1) -> None:
+        """Suma `peso` a la jugada en la posición (guardada en el marco canónico)."""
+        clave, simetria = hash_canonico(state)
+        canonica = self._tablas[simetria][jugada]
+        self.pesos[(clave, canonica)] = self.pesos.get((clave, canonica), 0) + peso
+
+    def agregar_registro(self, registro, plies: int) -> None:
+        """
+        Agrega las primeras `plies` acciones del ganador de un `RegistroPartida`.
+
+        Cada acción se guarda con peso 1 en la posición previa, con el turno del
+        jugador que la hizo; las partidas sin ganador se ignoran.
+        """
+        from src.RegistroPartida import reproducir
+
+        ganador = reproducir(registro).ganador
+        if ganador is None:
+            return
+        jugador_ganador = "AB".index(ganador)
+        state = TwixtState(registro.n_filas, registro.n_columnas)
+        for accion in registro.acciones[:plies]:
+            jugada, jugador = divmod(accion, 2)
+            state.set_turn(jugador)
+            if jugador == jugador_ganador:
+                self.agregar(state, jugada)
+            state.place(jugador, jugada)
+
+    def guardar(self, ruta: str) -> int:
+        """
+        Escribe el libro ordenado por hash canónico.
+
+        Returns:
+            Número de entradas escritas.
+        """
+        entradas = sorted((clave, jugada, peso) for (clave, jugada), peso in self.pesos.items())
+        with open(ruta, "wb") as archivo:
+            archivo.write(CABECERA.pack(MAGIA_LIBRO, VERSION, self.n_filas, self.n_columnas, 0))
+            archivo.write(b"".join(ENTRADA.pack(*entrada) for entrada in entradas))
+        return len(entradas)
+
+
+def construir_desde_busqueda(
+    n_filas: int = 20,
+    n_columnas: int = 20,
+    plies: int = 4,
+    ancho: int = 3,
+    max_time_s: float = 1.0,
+    max_depth: int = 4,
+    progreso=None,
+) -> GeneradorLibro:
+    """
+    Construye un libro buscando cada posición de las primeras `plies` jugadas.
+
+    En cada posición se guarda la jugada elegida por `Solver` y se exploran esa
+    jugada y las `ancho - 1` mejores según la evaluación de un ply, para cubrir
+    respuestas razonables de ambos jugadores.
+
+    Args:
+        n_filas: Filas del tablero.
+        n_columnas: Columnas del tablero.
+        plies: Profundidad del libro en jugadas.
+        ancho: Jugadas exploradas por posición.
+        max_time_s: Tiempo de búsqueda por posición.
+        max_depth: Profundidad máxima de la búsqueda.
+        progreso: Función opcional llamada con el número de posiciones buscadas.
+
+    Returns:
+        `GeneradorLibro` listo para `guardar`.
+    """
+    generador = GeneradorLibro(n_filas, n_columnas)
+    solver = Solver(max_time_s=max_time_s, max_depth=max_depth)
+    state = TwixtState(n_filas, n_columnas)
+    vistas = set()
+
+    def explorar(ply: int) -> None:
+        if ply == plies or state.winner is not None:
+            return
+        clave = hash_canonico(state)[0]
+        if clave in vistas:
+            return
+        vistas.add(clave)
+        mejor = solver.solve(state).move
+        if mejor is None:
+            return
+        generador.agregar(state, mejor)
+        if progreso is not None:
+            progreso(len(vistas))
+        jugadas = state.focused_moves()
+        valores = evaluate_children(state, jugadas)
+        # El hijo con menor valor (desde el rival) es el mejor para quien mueve
+        alternativas = [j for _, j in sorted(zip(valores, jugadas)) if j != mejor]
+        for jugada in [mejor] + alternativas[: ancho - 1]:
+            state.make(jugada)
+            explorar(ply + 1)
+            state.unmake()
+
+    explorar(0)
+    return generador
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construye un libro de aperturas TWIXT.")
+    parser.add_argument("salida", help="Archivo del libro")
+    parser.add_argument("--filas", type=int, default=20)
+    parser.add_argument("--columnas", type=int, default=20)
+    parser.add_argument("--plies", type=int, default=4, help="Jugadas cubiertas por el libro")
+    parser.add_argument("--ancho", type=int, default=3, help="Jugadas exploradas por posición")
+    parser.add_argument("--tiempo", type=float, default=1.0, help="Segundos de búsqueda por posición")
+    parser.add_argument("--profundidad", type=int, default=4)
+    parser.add_argument("--registros", nargs="*", default=[], help="Registros de partidas a agregar")
+    args = parser.parse_args()
+
+    from src.RegistroPartida import RegistroPartida
+
+    if args.tiempo > 0:
+        generador = construir_desde_busqueda(
+            args.filas,
+            args.columnas,
+            args.plies,
+            args.ancho,
+            args.tiempo,
+            args.profundidad,
+            progreso=lambda n: print(f"\r{n} posiciones buscadas", end="", flush=True),
+        )
+        print()
+    else:
+        generador = GeneradorLibro(args.filas, args.columnas)
+    for ruta in args.registros:
+        generador.agregar_registro(RegistroPartida.cargar(ruta), args.plies)
+    print(f"{generador.guardar(args.salida)} entradas escritas en {args.salida}")
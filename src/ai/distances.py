@@ -0,0 +1,241 @@
+# distances.py
+import heapq
+from collections import deque
+
+from src.TablaCruces import murallas_por_celda, murallas_por_centro, tabla_extremos
+
+# Distancia de una celda inalcanzable
+INFINITO = 1 << 30
+
+
+class MapasDistancia:
+    """
+    Mapas de distancia de conexión de cada jugador, actualizados de forma incremental.
+
+    El grafo es el de los saltos diagonales (±2, ±2) que pueden unir una
+    muralla (ver `Muralla.anadir_muralla_usando_fichas`). Entrar a una celda
+    cuesta 0 si tiene una ficha propia y 1 si está libre y el jugador puede
+    usarla; las fichas rivales, las celdas de muralla y los límites prohibidos
+    no se pueden usar. Un salto solo se puede usar si ya es una muralla propia
+    o si su celda central está libre y no cruza ninguna muralla.
+
+    Por jugador hay dos mapas, desde su borde meta inicial y desde el final,
+    calculados con BFS 0-1. `distancia(jugador)` es el mínimo de fichas que
+    aún faltan para unir ambos bordes.
+
+    Al colocar una pieza solo se recalcula la región afectada: las celdas
+    cuyo camino mínimo pasaba por una celda o salto que dejó de servir (o por
+    la celda cuyo costo cambió) se invalidan y se vuelven a resolver desde su
+    frontera. Cada cambio se anota para que `deshacer` lo revierta en el
+    mismo costo.
+
+    Attributes:
+        bits: `TableroBits` observado (ya actualizado al notificar una pieza).
+        mapas: `mapas[jugador][lado]` con la distancia por celda (lado 0 =
+            borde inicial, 1 = borde final).
+    """
+
+    def __init__(self, bits):
+        """
+        Calcula los mapas completos para la posición actual de `bits`.
+
+        Args:
+            bits: `TableroBits` del tablero.
+        """
+        self.bits = bits
+        n_filas, n_columnas = bits.n_filas, bits.n_columnas
+        self.n_celdas = n_filas * n_columnas
+        self._saltos = murallas_por_celda(n_filas, n_columnas)
+        self._por_centro = murallas_por_centro(n_filas, n_columnas)
+        self._extremos = tabla_extremos(n_filas, n_columnas)
+        self._fuentes = [
+            [self._celdas(bits.borde_inicio[jugador]), self._celdas(bits.borde_fin[jugador])]
+            for jugador in (0, 1)
+        ]
+        self.mapas: list = [[[], []], [[], []]]
+        self._historial: list = []
+        self._marcas: list = []
+        self.recalcular()
+
+    @staticmethod
+    def _celdas(mascara: int) -> frozenset:
+        celdas = set()
+        while mascara:
+            bajo = mascara & -mascara
+            celdas.add(bajo.bit_length() - 1)
+            mascara ^= bajo
+        return frozenset(celdas)
+
+    def _costo(self, jugador: int, celda: int):
+        # 0 = ficha propia, 1 = libre y usable, None = no se puede usar
+        bits = self.bits
+        if (bits.fichas[jugador] >> celda) & 1:
+            return 0
+        if (bits.ocupadas >> celda) & 1 or (bits.prohibidas[jugador] >> celda) & 1:
+            return None
+        return 1
+
+    def _salto_usable(self, jugador: int, id_muralla: int, centro: int) -> bool:
+        bits = self.bits
+        if id_muralla in bits.puentes_jugador[jugador]:
+            return True
+        return not (bits.ocupadas >> centro) & 1 and not bits.cruza_muralla(id_muralla)
+
+    def recalcular(self) -> None:
+        """Recalcula todos los mapas desde cero y descarta el historial."""
+        self._historial.clear()
+        self._marcas.clear()
+        for jugador in (0, 1):
+            for lado in (0, 1):
+                self.mapas[jugador][lado] = self._bfs(jugador, self._fuentes[jugador][lado])
+
+    def _bfs(self, jugador: int, fuentes: frozenset) -> list:
+        distancias = [INFINITO] * self.n_celdas
+        cola = deque()
+        for costo_fuente in (0, 1):
+            for celda in fuentes:
+                if self._costo(jugador, celda) == costo_fuente:
+                    distancias[celda] = costo_fuente
+                    cola.append(celda)
+        saltos = self._saltos
+        while cola:
+            celda = cola.popleft()
+            base = distancias[celda]
+            for id_muralla, otra, centro in saltos[celda]:
+                costo = self._costo(jugador, otra)
+                if costo is None or base + costo >= distancias[otra]:
+                    continue
+                if not self._salto_usable(jugador, id_muralla, centro):
+                    continue
+                distancias[otra] = base + costo
+                if costo:
+                    cola.append(otra)
+                else:
+                    cola.appendleft(otra)
+        return distancias
+
+    def distancia(self, jugador: int) -> int:
+        """Fichas que le faltan al jugador para unir sus bordes (INFINITO si ya no puede)."""
+        desde_inicio = self.mapas[jugador][0]
+        return min(desde_inicio[celda] for celda in self._fuentes[jugador][1])
+
+    def ficha(self, jugador: int, celda: int) -> None:
+        """
+        Actualiza los mapas tras colocar una ficha (con `bits` ya actualizado).
+
+        La celda pasa a costar 0 para su dueño y queda bloqueada para el rival;
+        los saltos cuyo centro es esa celda dejan de servir a ambos.
+        """
+        self._marcas.append(len(self._historial))
+        aristas = self._por_centro[celda]
+        for lado in (0, 1):
+            # Para el dueño la celda solo mejora; para el rival queda bloqueada
+            self._actualizar(jugador, lado, (), aristas, celda)
+            self._actualizar(jugador ^ 1, lado, (celda,), aristas)
+
+    def muralla(self, jugador: int, id_muralla: int) -> None:
+        """
+        Actualiza los mapas tras construir una muralla (con `bits` ya actualizado).
+
+        Su celda central queda bloqueada y los saltos que la cruzan o pasan por
+        esa celda dejan de servir a ambos jugadores.
+        """
+        self._marcas.append(len(self._historial))
+        centro = self._extremos[id_muralla][2]
+        aristas = [otra for otra in self.bits.cruces[id_muralla]]
+        aristas.extend(otra for otra in self._por_centro[centro] if otra != id_muralla)
+        for j in (0, 1):
+            for lado in (0, 1):
+                self._actualizar(j, lado, (centro,), aristas)
+
+    def deshacer(self) -> None:
+        """Revierte la última llamada a `ficha` o `muralla`."""
+        marca = self._marcas.pop()
+        historial = self._historial
+        while len(historial) > marca:
+            distancias, celda, anterior = historial.pop()
+            distancias[celda] = anterior
+
+    def _actualizar(self, jugador: int, lado: int, celdas: tuple, aristas, mejorada=None) -> None:
+        distancias = self.mapas[jugador][lado]
+        fuentes = self._fuentes[jugador][lado]
+        saltos = self._saltos
+        extremos = self._extremos
+        historial = self._historial
+
+        # 1. Región afectada: celdas bloqueadas, extremos de saltos perdidos que
+        #    dependían de ellos y, por cierre, todo lo que dependía de la región.
+        region = set()
+        pila = []
+        for celda in celdas:
+            if distancias[celda] < INFINITO:
+                region.add(celda)
+                pila.append(celda)
+        for id_muralla in aristas:
+            a, b, _ = extremos[id_muralla]
+            for desde, hacia in ((a, b), (b, a)):
+                if hacia in region or distancias[desde] >= INFINITO:
+                    continue
+                costo = self._costo(jugador, hacia)
+                if costo is not None and distancias[hacia] == distancias[desde] + costo:
+                    region.add(hacia)
+                    pila.append(hacia)
+        while pila:
+            celda = pila.pop()
+            base = distancias[celda]
+            if base >= INFINITO:
+                continue
+            for _, otra, _ in saltos[celda]:
+                if otra in region or distancias[otra] >= INFINITO:
+                    continue
+                costo = self._costo(jugador, otra)
+                if costo is not None and distancias[otra] == base + costo:
+                    region.add(otra)
+                    pila.append(otra)
+
+        # 2. Se invalida la región y se siembra desde las fuentes y su frontera
+        for celda in region:
+            historial.append((distancias, celda, distancias[celda]))
+            distancias[celda] = INFINITO
+        monticulo = []
+        for celda in region:
+            costo = self._costo(jugador, celda)
+            if costo is None:
+                continue
+            mejor = costo if celda in fuentes else INFINITO
+            for id_muralla, otra, centro in saltos[celda]:
+                base = distancias[otra]
+                if base + costo < mejor and self._salto_usable(jugador, id_muralla, centro):
+                    mejor = base + costo
+            if mejor < INFINITO:
+                distancias[celda] = mejor
+                monticulo.append((mejor, celda))
+
+        # La celda que pasó a costar 0 se siembra sin invalidar a quienes dependen de ella
+        if mejorada is not None:
+            mejor = 0 if mejorada in fuentes else distancias[mejorada]
+            for id_muralla, otra, centro in saltos[mejorada]:
+                if distancias[otra] < mejor and self._salto_usable(jugador, id_muralla, centro):
+                    mejor = distancias[otra]
+            if mejor < distancias[mejorada]:
+                if mejorada not in region:
+                    historial.append((distancias, mejorada, distancias[mejorada]))
+                distancias[mejorada] = mejor
+                monticulo.append((mejor, mejorada))
+
+        # 3. Dijkstra desde las semillas; solo avanza mientras mejora alguna celda
+        heapq.heapify(monticulo)
+        while monticulo:
+            base, celda = heapq.heappop(monticulo)
+            if base != distancias[celda]:
+                continue
+            for id_muralla, otra, centro in saltos[celda]:
+                costo = self._costo(jugador, otra)
+                if costo is None or base + costo >= distancias[otra]:
+                    continue
+                if not self._salto_usable(jugador, id_muralla, centro):
+                    continue
+                if otra not in region:
+                    historial.append((distancias, otra, distancias[otra]))
+                distancias[otra] = base + costo
+                heapq.heappush(monticulo, (base + costo, otra))
@@ -0,0 +1,179 @@
+# heuristics.py
+from functools import lru_cache
+from typing import Optional
+
+from src.TableroBits import JUGADOR_VERTICAL
+
+# Valor de una posición ganada; cualquier evaluación heurística queda muy por debajo
+VICTORIA = 1_000_000.0
+
+PESOS = {
+    "progreso": 40.0,
+    "piezas": 2.0,
+    "centro": 1.5,
+    "conectividad": 6.0,
+    "movilidad": 0.5,
+    "distancia": 8.0,
+}
+
+
+@lru_cache(maxsize=None)
+def _mascaras_salto(n_filas: int, n_columnas: int) -> tuple:
+    # Celdas desde las que un salto (+2, +2) o (+2, -2) cae dentro del tablero
+    derecha = 0
+    izquierda = 0
+    for celda in range(n_filas * n_columnas):
+        fila, col = divmod(celda, n_columnas)
+        if fila + 2 < n_filas:
+            if col + 2 < n_columnas:
+                derecha |= 1 << celda
+            if col - 2 >= 0:
+                izquierda |= 1 << celda
+    return derecha, izquierda
+
+
+@lru_cache(maxsize=None)
+def _pesos_centro(n_filas: int, n_columnas: int) -> tuple:
+    # Distancia Manhattan inversa al centro, precalculada por celda
+    centro_f = (n_filas - 1) / 2
+    centro_c = (n_columnas - 1) / 2
+    maximo = centro_f + centro_c + 1
+    pesos = []
+    for celda in range(n_filas * n_columnas):
+        fila, col = divmod(celda, n_columnas)
+        pesos.append(1.0 - (abs(fila - centro_f) + abs(col - centro_c)) / maximo)
+    return tuple(pesos)
+
+
+def enlaces_potenciales(fichas: int, n_filas: int, n_columnas: int) -> int:
+    """Cuenta los pares de fichas a un salto diagonal (posibles murallas)."""
+    derecha, izquierda = _mascaras_salto(n_filas, n_columnas)
+    salto_d = 2 * n_columnas + 2
+    salto_i = 2 * n_columnas - 2
+    return (
+        (fichas & derecha & (fichas >> salto_d)).bit_count()
+        + (fichas & izquierda & (fichas >> salto_i)).bit_count()
+    )
+
+
+def progreso(state, jugador: int) -> float:
+    """
+    Mayor extensión, en el eje objetivo del jugador, de un grupo de fichas
+    unidas por murallas, normalizada a [0, 1].
+    """
+    bits = state.bits
+    fichas = bits.fichas[jugador]
+    if not fichas:
+        return 0.0
+    conexiones = bits.conexiones[jugador]
+    n_columnas = state.n_cols
+    vertical = jugador == JUGADOR_VERTICAL
+    largo = state.n_rows if vertical else n_columnas
+    extremos: dict[int, list[int]] = {}
+    while fichas:
+        bajo = fichas & -fichas
+        celda = bajo.bit_length() - 1
+        fichas ^= bajo
+        fila, col = divmod(celda, n_columnas)
+        eje = fila if vertical else col
+        raiz = conexiones.encontrar(celda)
+        rango = extremos.get(raiz)
+        if rango is None:
+            extremos[raiz] = [eje, eje]
+        elif eje < rango[0]:
+            rango[0] = eje
+        elif eje > rango[1]:
+            rango[1] = eje
+    mejor = max(hi - lo for lo, hi in extremos.values()) + 1
+    return mejor / largo
+
+
+def centro(state, jugador: int) -> float:
+    """Suma de la cercanía al centro de las fichas del jugador."""
+    pesos = _pesos_centro(state.n_rows, state.n_cols)
+    fichas = state.bits.fichas[jugador]
+    total = 0.0
+    while fichas:
+        bajo = fichas & -fichas
+        total += pesos[bajo.bit_length() - 1]
+        fichas ^= bajo
+    return total
+
+
+def movilidad(state, jugador: int) -> float:
+    """Fracción de celdas donde el jugador todavía puede colocar una ficha."""
+    return state.legal_peg_mask(jugador).bit_count() / state.n_cells
+
+
+def evaluate(state, pesos=None) -> float:
+    """
+    Evalúa la posición desde el punto de vista del jugador en turno.
+
+    Combina progreso hacia el objetivo, diferencia de piezas, control del
+    centro, conectividad por saltos (murallas construidas y posibles) y
+    movilidad, cada uno como diferencia entre el jugador y su rival. Si el
+    estado mantiene mapas de distancia (`TwixtState.track_distances`), suma
+    además la diferencia entre las fichas que le faltan a cada uno para
+    conectar sus bordes.
+
+    Args:
+        state: `TwixtState` a evaluar.
+        pesos: Pesos de cada componente; por defecto `PESOS`.
+
+    Returns:
+        Puntuación positiva si la posición favorece al jugador en turno.
+    """
+    jugador = state.turn
+    rival = jugador ^ 1
+    if state.winner is not None:
+        return VICTORIA if state.winner == jugador else -VICTORIA
+    if pesos is None:
+        pesos = PESOS
+    bits = state.bits
+    n_filas, n_columnas = state.n_rows, state.n_cols
+
+    piezas = bits.fichas[jugador].bit_count() - bits.fichas[rival].bit_count()
+    conectividad = (
+        2 * len(bits.puentes_jugador[jugador])
+        + enlaces_potenciales(bits.fichas[jugador], n_filas, n_columnas)
+        - 2 * len(bits.puentes_jugador[rival])
+        - enlaces_potenciales(bits.fichas[rival], n_filas, n_columnas)
+    )
+    valor = (
+        pesos["progreso"] * (progreso(state, jugador) - progreso(state, rival))
+        + pesos["piezas"] * piezas
+        + pesos["centro"] * (centro(state, jugador) - centro(state, rival))
+        + pesos["conectividad"] * conectividad
+        + pesos["movilidad"] * (movilidad(state, jugador) - movilidad(state, rival))
+    )
+    if state.distances is not None:
+        # Un jugador bloqueado cuenta como si le faltara el tablero entero
+        tope = n_filas + n_columnas
+        faltan_jugador = min(state.distances.distancia(jugador), tope)
+        faltan_rival = min(state.distances.distancia(rival), tope)
+        valor += pesos.get("distancia", 0.0) * (faltan_rival - faltan_jugador)
+    return valor
+
+
+def mejor_muralla(state, celda: int) -> Optional[int]:
+    """
+    Muralla legal con extremo en `celda` que mejor evalúa el jugador en turno.
+
+    Es la que añade la IA tras colocar una ficha (`Partida.muralla_util`) y la
+    que `SolverConPonder` espera que añada el rival.
+
+    Returns:
+        Id de la muralla, o None si ninguna legal toca `celda`.
+    """
+    mejor = None
+    mejor_valor = None
+    for id_muralla in state.legal_walls():
+        a, b, _ = state.wall_ends(id_muralla)
+        if celda not in (a, b):
+            continue
+        state.make(state.wall_move(id_muralla))
+        valor = -evaluate(state)
+        state.unmake()
+        if mejor_valor is None or valor > mejor_valor:
+            mejor, mejor_valor = id_muralla, valor
+    return mejor
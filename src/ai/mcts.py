@@ -0,0 +1,456 @@
+# mcts.py
+import math
+import random
+import time
+from functools import lru_cache
+
+import src.Instrumentacion as instrumentacion
+from src.ai.solver import ResultadoBusqueda
+from src.TablaCruces import murallas_por_celda, tabla_cruces
+from src.TableroBits import TableroBits
+
+LIBRE = 0
+MURALLA = 3  # En el arreglo de dueños: 1 = ficha A, 2 = ficha B, 3 = celda de muralla
+
+
+@lru_cache(maxsize=None)
+def _tablas_simulacion(n_filas: int, n_columnas: int) -> tuple:
+    # Tablas por tamaño para las simulaciones: permisos, bordes meta y apoyos en arreglos planos
+    bits = TableroBits(n_filas, n_columnas)
+    n_celdas = n_filas * n_columnas
+    permitida = []
+    inicio = []
+    fin = []
+    apoyo = []
+    avance = []
+    for jugador in (0, 1):
+        permitida.append(bytes(0 if (bits.prohibidas[jugador] >> c) & 1 else 1 for c in range(n_celdas)))
+        inicio.append(bytes((bits.borde_inicio[jugador] >> c) & 1 for c in range(n_celdas)))
+        fin.append(bytes((bits.borde_fin[jugador] >> c) & 1 for c in range(n_celdas)))
+        apoyo.append(
+            {
+                celda: tuple(c for c in range(n_celdas) if (mascara >> c) & 1)
+                for celda, mascara in bits.apoyo[jugador].items()
+            }
+        )
+        # Saltos que avanzan en el eje objetivo: [sentido -1, sentido +1][celda] -> (id, otra, centro)
+        por_sentido = ([], [])
+        for celda, vecinas in enumerate(murallas_por_celda(n_filas, n_columnas)):
+            fila, col = divmod(celda, n_columnas)
+            for sentido in (0, 1):
+                opciones = []
+                for id_muralla, otra, centro in vecinas:
+                    fila_o, col_o = divmod(otra, n_columnas)
+                    delta = (fila_o - fila) if jugador == 0 else (col_o - col)
+                    if (delta > 0) == (sentido == 1):
+                        opciones.append((id_muralla, otra, centro))
+                por_sentido[sentido].append(tuple(opciones))
+        avance.append((tuple(por_sentido[0]), tuple(por_sentido[1])))
+    return tuple(permitida), tuple(inicio), tuple(fin), tuple(apoyo), tuple(avance)
+
+
+class LoteSimulaciones:
+    """
+    Simulaciones aleatorias en lote sobre un tablero compacto de arreglos.
+
+    Cada partida simulada usa un `bytearray` de dueños por celda, un arreglo de
+    padres de union-find por jugador (con compresión de caminos, ya que nunca
+    se deshace) y el conjunto de murallas colocadas. Todas las partidas del lote
+    avanzan una jugada por ronda, compartiendo las tablas precalculadas.
+
+    Política: cada jugador hace crecer una cadena. En su turno intenta
+    prolongar la punta con un salto diagonal al azar que avance hacia el borde
+    meta del sentido actual y la une con una muralla; al llegar a ese borde la
+    cadena sigue desde su origen en el sentido contrario. Si la punta está
+    bloqueada, empieza una cadena nueva en la siguiente celda libre y permitida
+    de una permutación aleatoria propia de la partida (y la une, si puede, a
+    otra ficha suya). Un relleno uniforme casi siempre termina en empate y no
+    aporta información; las cadenas deciden la mayoría de las simulaciones.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int):
+        """
+        Prepara las tablas compartidas para un tamaño de tablero.
+
+        Args:
+            n_filas: Número de filas.
+            n_columnas: Número de columnas.
+        """
+        self.n_filas = n_filas
+        self.n_columnas = n_columnas
+        self.n_celdas = n_filas * n_columnas
+        self.permitida, self.inicio, self.fin, self.apoyo, self.avance = _tablas_simulacion(
+            n_filas, n_columnas
+        )
+        self.cruces = tabla_cruces(n_filas, n_columnas)
+        self.vecinas = murallas_por_celda(n_filas, n_columnas)
+
+    def simular(self, state, n_partidas: int, rng: random.Random) -> list[int]:
+        """
+        Juega `n_partidas` simulaciones desde `state` en paralelo por rondas.
+
+        Args:
+            state: `TwixtState` inicial (no se modifica).
+            n_partidas: Tamaño del lote.
+            rng: Generador aleatorio.
+
+        Returns:
+            Lista [victorias_A, victorias_B, empates].
+        """
+        n_celdas = self.n_celdas
+        bits = state.bits
+        base = bytearray(n_celdas)
+        for jugador in (0, 1):
+            fichas = bits.fichas[jugador]
+            while fichas:
+                bajo = fichas & -fichas
+                base[bajo.bit_length() - 1] = jugador + 1
+                fichas ^= bajo
+        murallas = bits.murallas[0] | bits.murallas[1]
+        while murallas:
+            bajo = murallas & -murallas
+            base[bajo.bit_length() - 1] = MURALLA
+            murallas ^= bajo
+        libres = [c for c in range(n_celdas) if not base[c]]
+        padres_base = [bits.conexiones[0].padres(), bits.conexiones[1].padres()]
+        puentes_base = set(bits.puentes)
+        nodo_inicio = n_celdas
+        nodo_fin = n_celdas + 1
+
+        # Estado por partida: [dueños, padres A, padres B, puentes, orden, punteros, turno,
+        #                      puntas, orígenes, sentidos]
+        partidas = []
+        for _ in range(n_partidas):
+            orden = libres[:]
+            rng.shuffle(orden)
+            partidas.append(
+                [
+                    bytearray(base),
+                    padres_base[0][:],
+                    padres_base[1][:],
+                    set(puentes_base),
+                    orden,
+                    [0, 0],
+                    state.turn,
+                    [-1, -1],
+                    [-1, -1],
+                    [1, 1],
+                ]
+            )
+
+        resultado = [0, 0, 0]
+        permitida = self.permitida
+        inicio = self.inicio
+        fin = self.fin
+        apoyo = self.apoyo
+        avance = self.avance
+        cruces = self.cruces
+        vecinas = self.vecinas
+        activas = partidas if state.winner is None else []
+        if state.winner is not None:
+            resultado[state.winner] = n_partidas
+
+        while activas:
+            siguientes = []
+            for partida in activas:
+                duenos, padres_a, padres_b, puentes, orden, punteros, jugador, puntas, origenes, sentidos = partida
+                marca = jugador + 1
+                permitidas = permitida[jugador]
+                soportes_jugador = apoyo[jugador]
+                padres = padres_a if jugador == 0 else padres_b
+                celda = -1
+                muralla = None
+                punta = puntas[jugador]
+                sentido = sentidos[jugador]
+                if punta >= 0:
+                    # Primero la punta en el sentido actual; si está bloqueada, el origen en el contrario
+                    intentos = ((punta, sentido), (origenes[jugador], -sentido))
+                    for desde, hacia in intentos:
+                        opciones = avance[jugador][hacia > 0][desde]
+                        n_opciones = len(opciones)
+                        k = rng.randrange(n_opciones) if n_opciones else 0
+                        for j in range(n_opciones):
+                            opcion = opciones[(k + j) % n_opciones]
+                            c = opcion[1]
+                            if duenos[c] or duenos[opcion[2]] or not permitidas[c]:
+                                continue
+                            soportes = soportes_jugador.get(c)
+                            if soportes is not None and not any(duenos[x] == marca for x in soportes):
+                                continue
+                            if any(x in puentes for x in cruces[opcion[0]]):
+                                continue
+                            celda, muralla = c, (opcion[0], desde, opcion[2])
+                            break
+                        if celda >= 0:
+                            if desde != punta:
+                                origenes[jugador] = punta
+                                sentido = sentidos[jugador] = hacia
+                            break
+
+                nueva_cadena = celda < 0
+                if nueva_cadena:
+                    i = punteros[jugador]
+                    n_orden = len(orden)
+                    while i < n_orden:
+                        c = orden[i]
+                        i += 1
+                        if duenos[c] or not permitidas[c]:
+                            continue
+                        soportes = soportes_jugador.get(c)
+                        if soportes is not None and not any(duenos[x] == marca for x in soportes):
+                            continue
+                        celda = c
+                        break
+                    punteros[jugador] = i
+                    if celda < 0:
+                        # Este jugador ya no puede colocar; termina si el rival tampoco
+                        puntas[jugador] = -1
+                        if punteros[jugador ^ 1] >= n_orden and puntas[jugador ^ 1] < 0:
+                            resultado[2] += 1
+                            continue
+                        partida[6] = jugador ^ 1
+                        siguientes.append(partida)
+                        continue
+                    for opcion in vecinas[celda]:
+                        if duenos[opcion[1]] == marca and not duenos[opcion[2]]:
+                            if not any(x in puentes for x in cruces[opcion[0]]):
+                                muralla = opcion
+                                break
+
+                duenos[celda] = marca
+                if inicio[jugador][celda]:
+                    _unir(padres, celda, nodo_inicio)
+                if fin[jugador][celda]:
+                    _unir(padres, celda, nodo_fin)
+                if muralla is not None:
+                    duenos[muralla[2]] = MURALLA
+                    puentes.add(muralla[0])
+                    _unir(padres, muralla[1], celda)
+                if _raiz(padres, nodo_inicio) == _raiz(padres, nodo_fin):
+                    resultado[jugador] += 1
+                    continue
+
+                if nueva_cadena:
+                    puntas[jugador] = origenes[jugador] = celda
+                    sentidos[jugador] = 1 if rng.random() < 0.5 else -1
+                elif (fin if sentido > 0 else inicio)[jugador][celda]:
+                    # Llegó al borde: la cadena crece ahora desde su origen en sentido contrario
+                    puntas[jugador] = origenes[jugador]
+                    sentidos[jugador] = -sentido
+                else:
+                    puntas[jugador] = celda
+                partida[6] = jugador ^ 1
+                siguientes.append(partida)
+            activas = siguientes
+        return resultado
+
+
+def _raiz(padres: list, nodo: int) -> int:
+    while padres[nodo] != nodo:
+        padres[nodo] = padres[padres[nodo]]
+        nodo = padres[nodo]
+    return nodo
+
+
+def _unir(padres: list, a: int, b: int) -> None:
+    raiz_a = _raiz(padres, a)
+    raiz_b = _raiz(padres, b)
+    if raiz_a != raiz_b:
+        padres[raiz_b] = raiz_a
+
+
+class NodoMCTS:
+    """Nodo del árbol; `victorias` se cuentan para el jugador que hizo `jugada`."""
+
+    __slots__ = ("jugada", "padre", "hijos", "pendientes", "visitas", "victorias", "jugador", "hash")
+
+    def __init__(self, jugada, padre, jugador: int, hash_: int):
+        self.jugada = jugada
+        self.padre = padre
+        self.hijos: list = []
+        self.pendientes = None
+        self.visitas = 0
+        self.victorias = 0.0
+        self.jugador = jugador
+        self.hash = hash_
+
+
+class MCTSSolver:
+    """
+    Monte Carlo Tree Search (UCT) con simulaciones en lote.
+
+    Cada iteración selecciona una hoja por UCT, la expande con una jugada
+    enfocada y ejecuta `batch_size` simulaciones desde ella con
+    `LoteSimulaciones`. El árbol está limitado a `max_nodes` nodos: al llegar al
+    tope ya no se expande y se sigue simulando desde las hojas. Entre turnos se
+    reutiliza el subárbol cuya posición coincide con la actual (hasta dos
+    plies por debajo de la raíz anterior).
+
+    Attributes:
+        max_time_s: Tiempo máximo por jugada.
+        batch_size: Simulaciones por hoja expandida.
+        max_nodes: Tope del número de nodos del árbol.
+        exploration: Constante de exploración de UCT.
+        playouts: Simulaciones realizadas en la última búsqueda.
+    """
+
+    def __init__(
+        self,
+        max_time_s: float = 1.0,
+        batch_size: int = 16,
+        max_nodes: int = 200_000,
+        exploration: float = 1.4,
+        seed=None,
+    ):
+        """
+        Configura el motor.
+
+        Args:
+            max_time_s: Presupuesto de tiempo por jugada.
+            batch_size: Simulaciones que avanzan juntas por cada hoja.
+            max_nodes: Número máximo de nodos del árbol.
+            exploration: Constante `c` de UCT.
+            seed: Semilla opcional para reproducibilidad.
+        """
+        self.max_time_s = max_time_s
+        self.batch_size = batch_size
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        self.playouts = 0
+        self._rng = random.Random(seed)
+        self._lote = None
+        self._raiz = None
+        self._n_nodos = 0
+
+    def sembrar(self, seed: int) -> None:
+        """Reinicia el generador aleatorio de las simulaciones con `seed`."""
+        self._rng.seed(seed)
+
+    def limpiar(self) -> None:
+        """Olvida el árbol que `solve` reutiliza entre jugadas."""
+        self._raiz = None
+        self._n_nodos = 0
+
+    def _reutilizar(self, state):
+        # Busca la posición actual entre la raíz previa, sus hijos y sus nietos
+        raiz = self._raiz
+        if raiz is None:
+            return None
+        candidatos = [raiz]
+        for hijo in raiz.hijos:
+            candidatos.append(hijo)
+            candidatos.extend(hijo.hijos)
+        for nodo in candidatos:
+            if nodo.hash == state.hash:
+                nodo.padre = None
+                return nodo
+        return None
+
+    def _contar(self, nodo) -> int:
+        total = 0
+        pila = [nodo]
+        while pila:
+            actual = pila.pop()
+            total += 1
+            pila.extend(actual.hijos)
+        return total
+
+    def solve(self, state) -> ResultadoBusqueda:
+        """
+        Elige la jugada más visitada tras simular hasta agotar el tiempo.
+
+        Args:
+            state: `TwixtState` de la posición; se deja intacto al terminar.
+
+        Returns:
+            `ResultadoBusqueda` con `score` = tasa de victorias estimada,
+            `depth` = profundidad máxima del árbol y `nodes` = simulaciones.
+        """
+        inicio = time.perf_counter()
+        limite = inicio + self.max_time_s
+        if self._lote is None or (self._lote.n_filas, self._lote.n_columnas) != (state.n_rows, state.n_cols):
+            self._lote = LoteSimulaciones(state.n_rows, state.n_cols)
+            self._raiz = None
+
+        raiz = self._reutilizar(state)
+        if raiz is None:
+            raiz = NodoMCTS(None, None, state.turn ^ 1, state.hash)
+            self._n_nodos = 1
+        else:
+            self._n_nodos = self._contar(raiz)
+        self._raiz = raiz
+        self.playouts = 0
+        profundidad_max = 0
+
+        while time.perf_counter() < limite:
+            nodo = raiz
+            aplicadas = 0
+            # Selección
+            while nodo.pendientes is not None and not nodo.pendientes and nodo.hijos:
+                nodo = self._seleccionar(nodo)
+                state.make(nodo.jugada)
+                aplicadas += 1
+            # Expansión
+            if state.winner is None and self._n_nodos < self.max_nodes:
+                if nodo.pendientes is None:
+                    nodo.pendientes = state.focused_moves()
+                    self._rng.shuffle(nodo.pendientes)
+                if nodo.pendientes:
+                    jugada = nodo.pendientes.pop()
+                    jugador = state.turn
+                    state.make(jugada)
+                    aplicadas += 1
+                    hijo = NodoMCTS(jugada, nodo, jugador, state.hash)
+                    nodo.hijos.append(hijo)
+                    self._n_nodos += 1
+                    nodo = hijo
+            profundidad_max = max(profundidad_max, aplicadas)
+            # Simulación en lote
+            victorias = self._lote.simular(state, self.batch_size, self._rng)
+            self.playouts += self.batch_size
+            for _ in range(aplicadas):
+                state.unmake()
+            # Retropropagación
+            empates = victorias[2] * 0.5
+            while nodo is not None:
+                nodo.visitas += self.batch_size
+                nodo.victorias += victorias[nodo.jugador] + empates
+                nodo = nodo.padre
+
+        if not raiz.hijos:
+            jugadas = state.focused_moves()
+            jugada = jugadas[0] if jugadas else None
+            return ResultadoBusqueda(jugada, 0.0, 0, self.playouts, time.perf_counter() - inicio, [])
+        mejor = max(raiz.hijos, key=lambda h: h.visitas)
+        resultado = ResultadoBusqueda(
+            mejor.jugada,
+            mejor.victorias / mejor.visitas if mejor.visitas else 0.0,
+            profundidad_max,
+            self.playouts,
+            time.perf_counter() - inicio,
+            [mejor.jugada],
+        )
+        medidor = instrumentacion.actual
+        if medidor is not None:
+            # Ramificación media del árbol: hijos por nodo expandido
+            expandidos = hijos = 0
+            pila = [raiz]
+            while pila:
+                nodo = pila.pop()
+                if nodo.hijos:
+                    expandidos += 1
+                    hijos += len(nodo.hijos)
+                    pila.extend(nodo.hijos)
+            medidor.busqueda("mcts", resultado, ramificacion=hijos / expandidos)
+        return resultado
+
+    def _seleccionar(self, nodo):
+        log_n = math.log(nodo.visitas)
+        c = self.exploration
+        mejor = None
+        mejor_valor = -1.0
+        for hijo in nodo.hijos:
+            valor = hijo.victorias / hijo.visitas + c * math.sqrt(log_n / hijo.visitas)
+            if valor > mejor_valor:
+                mejor, mejor_valor = hijo, valor
+        return mejor
@@ -0,0 +1,254 @@
+# parallel.py
+import multiprocessing
+import random
+import time
+
+import src.Instrumentacion as instrumentacion
+from src.ai.solver import ResultadoBusqueda, Solver
+from src.ai.state import TwixtState
+
+
+def _bucle_trabajador(conexion, max_time_s: float, max_depth: int, tt_mb: float) -> None:
+    """
+    Bucle de un proceso trabajador de larga vida.
+
+    Mantiene su propio `TwixtState` y su `Solver` (con su tabla de
+    transposición) entre turnos; el proceso principal solo le envía las piezas
+    nuevas desde la última sincronización.
+
+    Mensajes:
+        ("reiniciar", n_filas, n_columnas): Nuevo estado vacío.
+        ("delta", colocaciones, turno): Aplica [(jugador, jugada), ...] y fija el turno.
+        ("buscar", jugadas_raiz, max_time_s, max_depth): Busca sobre esas jugadas
+            raíz y responde `(nodos, iteraciones)` (ver `Solver.iteraciones`).
+        ("cerrar",): Termina el proceso.
+    """
+    solver = Solver(max_time_s=max_time_s, max_depth=max_depth, tt_mb=tt_mb)
+    state = None
+    while True:
+        mensaje = conexion.recv()
+        tipo = mensaje[0]
+        if tipo == "reiniciar":
+            state = TwixtState(mensaje[1], mensaje[2])
+        elif tipo == "delta":
+            _, colocaciones, turno = mensaje
+            for jugador, jugada in colocaciones:
+                state.place(jugador, jugada)
+            state.set_turn(turno)
+        elif tipo == "buscar":
+            _, jugadas_raiz, solver.max_time_s, solver.max_depth = mensaje
+            resultado = solver.solve(state, root_moves=jugadas_raiz)
+            conexion.send((resultado.nodes, solver.iteraciones))
+        elif tipo == "cerrar":
+            break
+    conexion.close()
+
+
+class ParallelSolver:
+    """
+    Búsqueda alfa-beta con división de jugadas raíz entre procesos.
+
+    Los trabajadores se crean una sola vez y viven toda la partida. En cada
+    turno se les envía únicamente el delta de piezas nuevas (pares
+    `(jugador, jugada)`) y su parte de las jugadas raíz, repartidas en turnos
+    rotativos según el orden de `focused_moves`. Cada trabajador ejecuta
+    iterative deepening sobre su subconjunto con el mismo presupuesto de tiempo.
+    Las puntuaciones solo se comparan a una misma profundidad: la más profunda
+    que completaron todos los trabajadores. Una puntuación más superficial suele
+    ser más optimista y no debe ganar a otra más profunda.
+
+    Attributes:
+        n_workers: Número de procesos trabajadores.
+        max_time_s: Tiempo máximo por jugada.
+        max_depth: Profundidad máxima.
+        nodes: Nodos expandidos (sumando todos los trabajadores) en la última búsqueda.
+    """
+
+    def __init__(self, n_workers: int = 2, max_time_s: float = 1.0, max_depth: int = 4, tt_mb: float = 16.0):
+        """
+        Arranca los procesos trabajadores.
+
+        Args:
+            n_workers: Número de procesos (por ejemplo `os.cpu_count()`).
+            max_time_s: Presupuesto de tiempo por jugada.
+            max_depth: Profundidad máxima del iterative deepening.
+            tt_mb: Memoria de la tabla de transposición de cada trabajador.
+        """
+        self.n_workers = max(1, n_workers)
+        self.max_time_s = max_time_s
+        self.max_depth = max_depth
+        self.nodes = 0
+        self._conexiones = []
+        self._procesos = []
+        for _ in range(self.n_workers):
+            propia, remota = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(
+                target=_bucle_trabajador, args=(remota, max_time_s, max_depth, tt_mb), daemon=True
+            )
+            proceso.start()
+            remota.close()
+            self._conexiones.append(propia)
+            self._procesos.append(proceso)
+        self._dimensiones = None
+        self._fichas = [0, 0]
+        self._puentes = [set(), set()]
+
+    def _sincronizar(self, state) -> None:
+        # Envía solo las piezas nuevas; si alguna desapareció se reinicia el estado remoto
+        bits = state.bits
+        dimensiones = (state.n_rows, state.n_cols)
+        retrocedio = any(
+            self._fichas[j] & ~bits.fichas[j] or not self._puentes[j] <= bits.puentes_jugador[j]
+            for j in (0, 1)
+        )
+        if dimensiones != self._dimensiones or retrocedio:
+            for conexion in self._conexiones:
+                conexion.send(("reiniciar", state.n_rows, state.n_cols))
+            self._dimensiones = dimensiones
+            self._fichas = [0, 0]
+            self._puentes = [set(), set()]
+
+        colocaciones = []
+        for jugador in (0, 1):
+            nuevas = bits.fichas[jugador] & ~self._fichas[jugador]
+            while nuevas:
+                bajo = nuevas & -nuevas
+                colocaciones.append((jugador, bajo.bit_length() - 1))
+                nuevas ^= bajo
+        for jugador in (0, 1):
+            for id_muralla in sorted(bits.puentes_jugador[jugador] - self._puentes[jugador]):
+                colocaciones.append((jugador, state.wall_move(id_muralla)))
+        for conexion in self._conexiones:
+            conexion.send(("delta", colocaciones, state.turn))
+        self._fichas = list(bits.fichas)
+        self._puentes = [set(p) for p in bits.puentes_jugador]
+
+    def solve(self, state) -> ResultadoBusqueda:
+        """
+        Busca la mejor jugada repartiendo las jugadas raíz entre los trabajadores.
+
+        Args:
+            state: `TwixtState` de la posición actual (no se modifica).
+
+        Returns:
+            `ResultadoBusqueda` combinado; `depth` es la profundidad común a la
+            que se compararon los trabajadores.
+        """
+        inicio = time.perf_counter()
+        movimientos = state.focused_moves()
+        if not movimientos or state.winner is not None:
+            return ResultadoBusqueda(None, 0.0, 0, 0, 0.0, [])
+        self._sincronizar(state)
+
+        activos = []
+        for i, conexion in enumerate(self._conexiones):
+            parte = movimientos[i :: self.n_workers]
+            if parte:
+                conexion.send(("buscar", parte, self.max_time_s, self.max_depth))
+                activos.append(conexion)
+
+        self.nodes = 0
+        por_trabajador = []
+        for conexion in activos:
+            nodos, iteraciones = conexion.recv()
+            self.nodes += nodos
+            if iteraciones:
+                por_trabajador.append({p: (j, v) for p, j, v in iteraciones})
+        mejor = None
+        if por_trabajador:
+            # Un trabajador que cierra una victoria antes se detiene en esa
+            # profundidad; su valor es exacto y también gana a esa altura
+            comun = min(max(iteraciones) for iteraciones in por_trabajador)
+            for iteraciones in por_trabajador:
+                jugada, valor = iteraciones[comun]
+                if mejor is None or valor > mejor[1]:
+                    mejor = (jugada, valor, comun)
+        jugada, valor, profundidad = mejor if mejor is not None else (movimientos[0], 0.0, 0)
+        resultado = ResultadoBusqueda(
+            jugada, valor, profundidad, self.nodes, time.perf_counter() - inicio, [jugada]
+        )
+        medidor = instrumentacion.actual
+        if medidor is not None:
+            medidor.busqueda("paralelo", resultado)
+        return resultado
+
+    def cerrar(self) -> None:
+        """Detiene los procesos trabajadores."""
+        for conexion in self._conexiones:
+            try:
+                conexion.send(("cerrar",))
+            except (BrokenPipeError, OSError):
+                pass
+        for proceso in self._procesos:
+            proceso.join(timeout=1.0)
+        self._conexiones = []
+        self._procesos = []
+
+    def __enter__(self) -> "ParallelSolver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+def posicion_estandar(n_jugadas: int = 12, semilla: int = 7) -> TwixtState:
+    """
+    Posición de referencia en el tablero 20x20 de `Juego.iniciar_juego`,
+    obtenida con jugadas enfocadas pseudoaleatorias reproducibles.
+    """
+    rng = random.Random(semilla)
+    state = TwixtState(20, 20)
+    for _ in range(n_jugadas):
+        jugadas = state.focused_moves()
+        if not jugadas or state.winner is not None:
+            break
+        state.make(rng.choice(jugadas))
+    return state
+
+
+def medir_aceleracion(n_workers: int, max_depth: int = 4, n_posiciones: int = 3) -> dict:
+    """
+    Compara el tiempo de búsqueda a profundidad fija con 1 y con `n_workers` procesos.
+
+    Args:
+        n_workers: Número de procesos del modo paralelo.
+        max_depth: Profundidad fija de la búsqueda (sin límite de tiempo).
+        n_posiciones: Posiciones estándar de 20x20 a resolver.
+
+    Returns:
+        Diccionario con los tiempos totales, nodos y la aceleración obtenida.
+    """
+    posiciones = [posicion_estandar(semilla=s) for s in range(n_posiciones)]
+    tiempos = {}
+    nodos = {}
+    for workers in (1, n_workers):
+        with ParallelSolver(n_workers=workers, max_time_s=3600.0, max_depth=max_depth) as solver:
+            total = 0.0
+            suma_nodos = 0
+            for state in posiciones:
+                resultado = solver.solve(state)
+                total += resultado.elapsed
+                suma_nodos += resultado.nodes
+        tiempos[workers] = total
+        nodos[workers] = suma_nodos
+    return {
+        "workers": n_workers,
+        "cpus": multiprocessing.cpu_count(),
+        "depth": max_depth,
+        "tiempo_1": tiempos[1],
+        f"tiempo_{n_workers}": tiempos[n_workers],
+        "nodos_1": nodos[1],
+        f"nodos_{n_workers}": nodos[n_workers],
+        "aceleracion": tiempos[1] / tiempos[n_workers] if tiempos[n_workers] else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mide la aceleración de la búsqueda paralela.")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--posiciones", type=int, default=3)
+    args = parser.parse_args()
+    print(medir_aceleracion(args.workers, args.depth, args.posiciones))
@@ -0,0 +1,152 @@
+# ponder.py
+import math
+import threading
+from typing import Optional
+
+from src.ai.heuristics import mejor_muralla
+from src.ai.solver import ResultadoBusqueda, Solver
+
+
+class SolverConPonder:
+    """
+    Sigue buscando en un hilo mientras el rival piensa su jugada ("ponder").
+
+    Tras jugar, `ponder(state)` predice el turno completo del rival: su ficha,
+    con una búsqueda corta de `tiempo_prediccion` segundos restringida a
+    fichas, y la muralla que mejor la aprovecha (`mejor_muralla`, la misma que
+    añade la IA). Aplica ambas y lanza `motor.solve` sin límite de tiempo en
+    un hilo. Esa búsqueda llena la tabla de transposición que comparte con las
+    búsquedas normales.
+    El hilo corre mientras el hilo principal espera en `input()`, que libera el
+    GIL, así que la consola sigue respondiendo.
+
+    Al llegar el turno propio, `solve(state)` compara la posición con la
+    esperada:
+
+    - Acierto: la búsqueda en curso se reutiliza; se espera su resultado hasta
+      `motor.max_time_s` desde ahora (inmediato si ya llegó a `max_depth`) y
+      después se cancela, como si se agotara su plazo.
+    - Fallo: la búsqueda se cancela con `motor.cancelar` y se busca de nuevo;
+      la tabla ya tiene las posiciones vecinas exploradas. Si el rival puso la
+      ficha esperada con otras murallas, cuenta como acierto de ficha.
+
+    Tiene la misma interfaz `solve(state)` que `Solver`.
+
+    Attributes:
+        motor: `Solver` compartido por el hilo y las búsquedas normales.
+        tiempo_prediccion: Segundos de la búsqueda que predice la ficha del rival.
+        aciertos: Turnos en que el rival jugó exactamente el turno esperado.
+        aciertos_ficha: Turnos con la ficha esperada pero otras murallas.
+        fallos: Turnos en que el rival puso otra ficha (o ninguna).
+    """
+
+    def __init__(self, motor: Solver, tiempo_prediccion: float = 0.2):
+        self.motor = motor
+        self.tiempo_prediccion = tiempo_prediccion
+        self.aciertos = 0
+        self.aciertos_ficha = 0
+        self.fallos = 0
+        self._hilo: Optional[threading.Thread] = None
+        self._esperada: Optional[int] = None
+        self._ficha_esperada: Optional[int] = None
+        self._resultado: Optional[ResultadoBusqueda] = None
+
+    @property
+    def pensando(self) -> bool:
+        """True si hay una búsqueda en segundo plano sin recoger."""
+        return self._hilo is not None
+
+    @property
+    def tasa_aciertos(self) -> float:
+        """Fracción de turnos predichos en que el rival jugó el turno esperado."""
+        turnos = self.aciertos + self.aciertos_ficha + self.fallos
+        return self.aciertos / turnos if turnos else 0.0
+
+    def predecir(self, state) -> Optional[int]:
+        """
+        Aplica a `state` el turno esperado del rival en turno y devuelve su ficha.
+
+        Deja colocadas la ficha predicha y su muralla (si la hay) con `place` y
+        el turno de vuelta al jugador propio.
+
+        Returns:
+            Celda de la ficha esperada, o None (sin tocar `state`) si el rival
+            no tiene fichas legales.
+        """
+        fichas = [jugada for jugada in state.focused_moves() if jugada < state.n_cells]
+        if not fichas:
+            fichas = state.legal_pegs()
+        if not fichas:
+            return None
+        rival = state.turn
+        ficha = self.motor.solve(state, root_moves=fichas, max_time_s=self.tiempo_prediccion).move
+        state.place(rival, ficha)
+        muralla = mejor_muralla(state, ficha)
+        if muralla is not None:
+            state.place(rival, state.wall_move(muralla))
+        state.set_turn(rival ^ 1)
+        return ficha
+
+    def ponder(self, state) -> bool:
+        """
+        Empieza a buscar en segundo plano la posición tras el turno esperado del rival.
+
+        Args:
+            state: `TwixtState` con el rival en turno; pasa a ser del hilo, así
+                que no debe reutilizarse.
+
+        Returns:
+            True si se lanzó la búsqueda; False si no hay predicción o el
+            turno esperado termina la partida.
+        """
+        self.detener()
+        self._ficha_esperada = None
+        if state.winner is not None:
+            return False
+        ficha = self.predecir(state)
+        if ficha is None or state.winner is not None:
+            return False
+        self._esperada = state.hash
+        self._ficha_esperada = ficha
+        self._resultado = None
+        self.motor.cancelar.clear()
+        self._hilo = threading.Thread(target=self._buscar, args=(state,), daemon=True)
+        self._hilo.start()
+        return True
+
+    def _buscar(self, state) -> None:
+        self._resultado = self.motor.solve(state, max_time_s=math.inf)
+
+    def detener(self) -> None:
+        """Cancela la búsqueda en segundo plano, si la hay, y espera al hilo."""
+        if self._hilo is None:
+            return
+        self.motor.cancelar.set()
+        self._hilo.join()
+        self.motor.cancelar.clear()
+        self._hilo = None
+        self._resultado = None
+
+    def solve(self, state) -> ResultadoBusqueda:
+        """Resultado de la búsqueda en segundo plano si la posición es la esperada; si no, `motor.solve`."""
+        if self._hilo is not None:
+            if state.hash == self._esperada:
+                # Desde aquí corre el reloj normal; al agotarse se cancela como un plazo
+                self._hilo.join(self.motor.max_time_s)
+                if self._hilo.is_alive():
+                    self.motor.cancelar.set()
+                    self._hilo.join()
+                    self.motor.cancelar.clear()
+                self._hilo = None
+                resultado = self._resultado
+                self._resultado = None
+                if resultado is not None and resultado.move is not None:
+                    self.aciertos += 1
+                    return resultado
+            else:
+                if (state.bits.fichas[state.turn ^ 1] >> self._ficha_esperada) & 1:
+                    self.aciertos_ficha += 1
+                else:
+                    self.fallos += 1
+                self.detener()
+        return self.motor.solve(state)
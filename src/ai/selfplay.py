@@ -0,0 +1,328 @@
+# selfplay.py
+import json
+import multiprocessing
+import random
+import time
+from functools import partial
+
+from src.ai.batch_eval import evaluate_children
+from src.ai.heuristics import PESOS, evaluate
+from src.ai.mcts import MCTSSolver
+from src.ai.solver import Solver
+from src.ai.state import TwixtState
+from src.Instantanea import AlmacenInstantaneas, FormatoInstantanea
+from src.TableroBits import JUGADOR_HORIZONTAL, JUGADOR_VERTICAL
+
+
+class PoliticaAleatoria:
+    """Elige al azar entre las jugadas enfocadas (murallas y saltos desde fichas propias)."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def sembrar(self, semilla: int) -> None:
+        self.rng.seed(semilla)
+
+    def elegir(self, state):
+        jugadas = state.focused_moves()
+        return self.rng.choice(jugadas) if jugadas else None
+
+
+class PoliticaGreedy:
+    """Elige la jugada enfocada cuyo hijo evalúa mejor la heurística (un ply)."""
+
+    def __init__(self, rng: random.Random, pesos=None):
+        self.rng = rng
+        self.pesos = pesos
+
+    def sembrar(self, semilla: int) -> None:
+        self.rng.seed(semilla)
+
+    def elegir(self, state):
+        jugadas = state.focused_moves()
+        if not jugadas:
+            return None
+        valores = evaluate_children(state, jugadas, self.pesos)
+        mejor = max(-v for v in valores)
+        # Desempate al azar para que las partidas no se repitan
+        return self.rng.choice([j for j, v in zip(jugadas, valores) if -v == mejor])
+
+
+class PoliticaBusqueda:
+    """Delega en un motor de búsqueda (`Solver` o `MCTSSolver`) conservado entre partidas."""
+
+    def __init__(self, motor):
+        self.motor = motor
+
+    def sembrar(self, semilla: int) -> None:
+        # Cada partida empieza sin la TT ni el árbol de las anteriores, que
+        # dependen de qué partidas jugó antes este trabajador
+        self.motor.limpiar()
+        # Minimax es determinista; solo MCTS tiene generador
+        if hasattr(self.motor, "sembrar"):
+            self.motor.sembrar(semilla)
+
+    def elegir(self, state):
+        return self.motor.solve(state).move
+
+
+def crear_politica(especificacion: str, semilla: int):
+    """
+    Construye una política a partir de su especificación en texto.
+
+    Formato: `nombre[:clave=valor,...]`, por ejemplo `random`, `greedy`,
+    `minimax:depth=2,time=0.2` o `mcts:time=0.1` (`dist=1` activa en minimax
+    los mapas de distancia de conexión). En `greedy` y `minimax`, `w.<componente>=valor`
+    reemplaza un peso de la heurística (ver `PESOS`), p. ej. `minimax:w.centro=3`.
+    Se usan cadenas para que las políticas puedan crearse dentro de cada
+    proceso trabajador.
+
+    Args:
+        especificacion: Texto con el nombre y los parámetros.
+        semilla: Semilla del generador aleatorio de la política.
+
+    Returns:
+        Objeto con los métodos `elegir(state) -> jugada | None` y `sembrar(semilla)`.
+
+    Raises:
+        ValueError: Si el nombre de la política o un componente de peso no existe.
+    """
+    nombre, _, resto = especificacion.partition(":")
+    parametros = dict(par.split("=", 1) for par in resto.split(",") if par)
+    tiempo = float(parametros.get("time", 0.1))
+    pesos = None
+    cambios = {clave[2:]: float(valor) for clave, valor in parametros.items() if clave.startswith("w.")}
+    if cambios:
+        desconocidos = set(cambios) - set(PESOS)
+        if desconocidos:
+            raise ValueError(f"Componentes de peso desconocidos: {sorted(desconocidos)}")
+        pesos = {**PESOS, **cambios}
+    if nombre == "random":
+        return PoliticaAleatoria(random.Random(semilla))
+    if nombre == "greedy":
+        return PoliticaGreedy(random.Random(semilla), pesos)
+    if nombre == "minimax":
+        profundidad = int(parametros.get("depth", 2))
+        tt_mb = float(parametros.get("tt", 4.0))
+        distancias = parametros.get("dist", "0") == "1"
+        evaluador = evaluate if pesos is None else partial(evaluate, pesos=pesos)
+        return PoliticaBusqueda(
+            Solver(
+                max_time_s=tiempo,
+                max_depth=profundidad,
+                tt_mb=tt_mb,
+                evaluator=evaluador,
+                distances=distancias,
+            )
+        )
+    if nombre == "mcts":
+        return PoliticaBusqueda(MCTSSolver(max_time_s=tiempo, seed=semilla))
+    raise ValueError(f"Política desconocida: {especificacion}")
+
+
+def jugar_partida(state, politicas: list, max_jugadas: int, al_jugar=None) -> dict:
+    """
+    Juega una partida completa desde `state` (que debe estar reiniciado).
+
+    Un jugador sin jugadas pasa el turno; si ambos pasan seguidos o se llega a
+    `max_jugadas`, la partida termina en empate.
+
+    Args:
+        state: `TwixtState` reutilizado por el trabajador.
+        politicas: Política del jugador A (índice 0) y del B (índice 1).
+        max_jugadas: Límite de jugadas de la partida.
+        al_jugar: Función opcional llamada con `state` tras cada jugada.
+
+    Returns:
+        Diccionario con `ganador` ("A", "B" o None) y `jugadas`.
+    """
+    jugadas = 0
+    pases = 0
+    while state.winner is None and jugadas < max_jugadas and pases < 2:
+        jugada = politicas[state.turn].elegir(state)
+        if jugada is None:
+            pases += 1
+            state.set_turn(state.turn ^ 1)
+            continue
+        pases = 0
+        state.make(jugada)
+        jugadas += 1
+        if al_jugar is not None:
+            al_jugar(state)
+    ganador = None
+    if state.winner == JUGADOR_VERTICAL:
+        ganador = "A"
+    elif state.winner == JUGADOR_HORIZONTAL:
+        ganador = "B"
+    return {"ganador": ganador, "jugadas": jugadas}
+
+
+def semilla_partida(semilla: int, indice: int, jugador: int) -> int:
+    """
+    Semilla de la política de `jugador` en la partida `indice`.
+
+    Depende solo de la semilla base y del índice de la partida, no del proceso
+    que la juegue, y `sembrar` vacía además la TT o el árbol del motor. Así una
+    simulación se repite igual con cualquier número de trabajadores si sus
+    políticas no dependen del reloj: `random`, `greedy` y `minimax` con
+    `time=inf` (limitado solo por `depth`). Las búsquedas limitadas por tiempo
+    (`mcts` o `minimax` que agota `time`) llegan más o menos lejos según la
+    carga de la máquina y no son reproducibles.
+    """
+    return (semilla * 1_000_003 + indice) * 2 + jugador
+
+
+# Estado de cada proceso trabajador: un único tablero y sus políticas, reutilizados
+_trabajador: dict = {}
+
+
+def _iniciar_trabajador(
+    n_filas: int, n_columnas: int, politica_a: str, politica_b: str, semilla: int, posiciones: bool = False
+) -> None:
+    _trabajador["state"] = TwixtState(n_filas, n_columnas)
+    _trabajador["formato"] = FormatoInstantanea(n_filas, n_columnas) if posiciones else None
+    _trabajador["semilla"] = semilla
+    _trabajador["politicas"] = [crear_politica(politica_a, semilla), crear_politica(politica_b, semilla + 1)]
+
+
+def _jugar_indice(argumentos: tuple) -> dict:
+    indice, max_jugadas = argumentos
+    state = _trabajador["state"]
+    state.reset()
+    for jugador, politica in enumerate(_trabajador["politicas"]):
+        politica.sembrar(semilla_partida(_trabajador["semilla"], indice, jugador))
+    inicio = time.perf_counter()
+    formato = _trabajador["formato"]
+    if formato is None:
+        resultado = jugar_partida(state, _trabajador["politicas"], max_jugadas)
+    else:
+        # Instantáneas de cada posición, que el proceso principal anexa al almacén
+        posiciones = []
+        resultado = jugar_partida(
+            state,
+            _trabajador["politicas"],
+            max_jugadas,
+            al_jugar=lambda s: posiciones.append(formato.empaquetar_estado(s)),
+        )
+        resultado["posiciones"] = posiciones
+    resultado["partida"] = indice
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def simular(
+    n_partidas: int,
+    politica_a: str = "random",
+    politica_b: str = "random",
+    n_workers: int = 1,
+    n_filas: int = 20,
+    n_columnas: int = 20,
+    max_jugadas=None,
+    semilla: int = 0,
+    al_terminar=None,
+    ruta_posiciones=None,
+) -> dict:
+    """
+    Juega `n_partidas` sin interacción repartidas entre procesos.
+
+    Cada trabajador crea un solo `TwixtState` y sus dos políticas al arrancar y
+    los reutiliza en todas sus partidas (`state.reset()` entre una y otra).
+
+    Args:
+        n_partidas: Número de partidas.
+        politica_a: Especificación de la política de A (ver `crear_politica`).
+        politica_b: Especificación de la política de B.
+        n_workers: Procesos; con 1 se juega en el proceso actual.
+        n_filas: Filas del tablero.
+        n_columnas: Columnas del tablero.
+        max_jugadas: Límite de jugadas por partida; por defecto el número de celdas.
+        semilla: Semilla base de las políticas; cada partida usa `semilla_partida`.
+        al_terminar: Función opcional llamada con el resultado de cada partida.
+        ruta_posiciones: Almacén de instantáneas (`AlmacenInstantaneas`) donde
+            anexar cada posición jugada; None para no guardarlas.
+
+    Returns:
+        Resumen con victorias, empates, partidas/s y jugadas/s.
+    """
+    if max_jugadas is None:
+        max_jugadas = n_filas * n_columnas
+    tareas = [(indice, max_jugadas) for indice in range(n_partidas)]
+    inicializacion = (n_filas, n_columnas, politica_a, politica_b, semilla, ruta_posiciones is not None)
+    resumen = {"A": 0, "B": 0, "empates": 0, "jugadas": 0}
+    almacen = None
+    if ruta_posiciones is not None:
+        almacen = AlmacenInstantaneas(ruta_posiciones, n_filas, n_columnas)
+
+    def registrar(resultado: dict) -> None:
+        if almacen is not None:
+            almacen.agregar_varias(resultado.pop("posiciones"))
+        resumen[resultado["ganador"] or "empates"] += 1
+        resumen["jugadas"] += resultado["jugadas"]
+        if al_terminar is not None:
+            al_terminar(resultado)
+
+    inicio = time.perf_counter()
+    try:
+        if n_workers <= 1:
+            _iniciar_trabajador(*inicializacion)
+            for tarea in tareas:
+                registrar(_jugar_indice(tarea))
+        else:
+            lote = max(1, n_partidas // (n_workers * 8))
+            with multiprocessing.Pool(n_workers, _iniciar_trabajador, inicializacion) as pool:
+                for resultado in pool.imap_unordered(_jugar_indice, tareas, chunksize=lote):
+                    registrar(resultado)
+    finally:
+        if almacen is not None:
+            almacen.cerrar()
+    segundos = time.perf_counter() - inicio
+
+    resumen.update(
+        {
+            "partidas": n_partidas,
+            "politica_a": politica_a,
+            "politica_b": politica_b,
+            "workers": n_workers,
+            "segundos": segundos,
+            "partidas_por_s": n_partidas / segundos if segundos else 0.0,
+            "jugadas_por_s": resumen["jugadas"] / segundos if segundos else 0.0,
+        }
+    )
+    return resumen
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Juega partidas automáticas entre dos políticas.")
+    parser.add_argument("--partidas", type=int, default=100)
+    parser.add_argument("--a", default="random", help="Política de A: random, greedy, minimax:..., mcts:...")
+    parser.add_argument("--b", default="random", help="Política de B")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--filas", type=int, default=20)
+    parser.add_argument("--columnas", type=int, default=20)
+    parser.add_argument("--max-jugadas", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default=None, help="Archivo JSON lines con el resultado de cada partida")
+    parser.add_argument("--posiciones", default=None, help="Almacén de instantáneas donde guardar cada posición")
+    args = parser.parse_args()
+
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        resumen = simular(
+            args.partidas,
+            args.a,
+            args.b,
+            args.workers,
+            args.filas,
+            args.columnas,
+            args.max_jugadas,
+            args.semilla,
+            al_terminar=lambda resultado: salida.write(json.dumps(resultado) + "\n"),
+            ruta_posiciones=args.posiciones,
+        )
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    print(json.dumps(resumen))
@@ -0,0 +1,372 @@
+# solver.py
+import threading
+import time
+from typing import Optional
+
+import src.Instrumentacion as instrumentacion
+from src.ai.heuristics import VICTORIA, evaluate
+
+EXACTO = 0
+COTA_INFERIOR = 1
+COTA_SUPERIOR = 2
+
+# Estimación conservadora del costo en CPython de una entrada (tupla + enteros)
+BYTES_POR_ENTRADA = 160
+# Las puntuaciones por encima de este umbral son victorias y se ajustan por ply
+UMBRAL_VICTORIA = VICTORIA - 10_000
+# Cada cuántos nodos se revisan el reloj y la cancelación (potencia de dos menos uno)
+MASCARA_REVISION = 127
+
+
+class _TiempoAgotado(Exception):
+    """Interrumpe la búsqueda cuando se agota el presupuesto de tiempo."""
+
+
+class TablaTransposicion:
+    """
+    Tabla de transposición de tamaño fijo indexada por el hash Zobrist.
+
+    Reserva de antemano un número de ranuras (potencia de dos) según el límite
+    de memoria, así que nunca crece durante la partida. Cada ranura guarda la
+    tupla `(clave, profundidad, valor, tipo, jugada, generacion)`.
+
+    Reemplazo preferente por profundidad: una entrada de la búsqueda actual
+    solo se sustituye por otra de profundidad igual o mayor; las entradas de
+    búsquedas anteriores (otra generación) siempre pueden reemplazarse.
+
+    Attributes:
+        tamano: Número de ranuras.
+        consultas: Búsquedas realizadas en la tabla.
+        aciertos: Búsquedas que encontraron la clave.
+    """
+
+    def __init__(self, max_mb: float = 16.0):
+        """
+        Reserva la tabla.
+
+        Args:
+            max_mb: Memoria máxima aproximada en megabytes.
+        """
+        ranuras = max(1, int(max_mb * 1024 * 1024) // BYTES_POR_ENTRADA)
+        self.tamano = 1 << (ranuras.bit_length() - 1)
+        self._mascara = self.tamano - 1
+        self._ranuras: list = [None] * self.tamano
+        self.generacion = 0
+        self.consultas = 0
+        self.aciertos = 0
+
+    def buscar(self, clave: int):
+        """Devuelve la entrada guardada para `clave`, o None."""
+        self.consultas += 1
+        entrada = self._ranuras[clave & self._mascara]
+        if entrada is not None and entrada[0] == clave:
+            self.aciertos += 1
+            return entrada
+        return None
+
+    def guardar(self, clave: int, profundidad: int, valor: float, tipo: int, jugada) -> None:
+        """Guarda un resultado aplicando reemplazo preferente por profundidad."""
+        indice = clave & self._mascara
+        actual = self._ranuras[indice]
+        if (
+            actual is None
+            or actual[5] != self.generacion
+            or actual[0] == clave
+            or profundidad >= actual[1]
+        ):
+            self._ranuras[indice] = (clave, profundidad, valor, tipo, jugada, self.generacion)
+
+    def nueva_busqueda(self) -> None:
+        """Marca el inicio de una búsqueda; las entradas previas pasan a ser reemplazables."""
+        self.generacion += 1
+
+    def limpiar(self) -> None:
+        """Vacía la tabla y reinicia las estadísticas."""
+        self._ranuras = [None] * self.tamano
+        self.consultas = 0
+        self.aciertos = 0
+
+
+class ResultadoBusqueda:
+    """Resultado de `Solver.solve`."""
+
+    __slots__ = ("move", "score", "depth", "nodes", "elapsed", "pv")
+
+    def __init__(self, move, score: float, depth: int, nodes: int, elapsed: float, pv: list):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.pv = pv
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultadoBusqueda(move={self.move}, score={self.score:.1f}, depth={self.depth}, "
+            f"nodes={self.nodes}, elapsed={self.elapsed:.3f})"
+        )
+
+
+def _valor_a_tabla(valor: float, ply: int) -> float:
+    # Las victorias se guardan relativas al nodo para que la tabla sea válida a cualquier ply
+    if valor > UMBRAL_VICTORIA:
+        return valor + ply
+    if valor < -UMBRAL_VICTORIA:
+        return valor - ply
+    return valor
+
+
+def _valor_de_tabla(valor: float, ply: int) -> float:
+    if valor > UMBRAL_VICTORIA:
+        return valor - ply
+    if valor < -UMBRAL_VICTORIA:
+        return valor + ply
+    return valor
+
+
+class Solver:
+    """
+    Minimax (negamax) con poda alfa-beta, iterative deepening y tabla de transposición.
+
+    La tabla se conserva entre turnos, de modo que cada búsqueda aprovecha lo
+    aprendido en la anterior. El orden de jugadas prueba primero la jugada de la
+    tabla y la variante principal de la iteración previa.
+
+    Attributes:
+        max_time_s: Tiempo máximo por jugada en segundos.
+        max_depth: Profundidad máxima en plies.
+        tt: Tabla de transposición compartida por todas las búsquedas.
+        nodes: Nodos expandidos en la última búsqueda.
+        iteraciones: `(profundidad, jugada, valor)` de cada iteración completada
+            en la última búsqueda.
+        cancelar: `threading.Event` que, al activarse desde otro hilo, detiene
+            la búsqueda en curso como si se agotara el tiempo (ver `ponder.py`).
+    """
+
+    def __init__(
+        self,
+        max_time_s: float = 1.0,
+        max_depth: int = 4,
+        tt_mb: float = 16.0,
+        evaluator=evaluate,
+        child_evaluator=None,
+        distances: bool = False,
+    ):
+        """
+        Configura el buscador.
+
+        Args:
+            max_time_s: Presupuesto de tiempo por jugada.
+            max_depth: Profundidad máxima del iterative deepening.
+            tt_mb: Memoria máxima de la tabla de transposición.
+            evaluator: Función `evaluator(state) -> float` desde el jugador en turno.
+            child_evaluator: Función opcional `child_evaluator(state, jugadas) -> list`
+                que puntúa de una vez todos los hijos (como `evaluator` tras cada
+                jugada); si se indica, los nodos a profundidad 1 la usan en lugar
+                de recorrer los hijos uno por uno (ver `batch_eval.evaluate_children`).
+            distances: Si es True, activa en el estado los mapas de distancia de
+                conexión (`TwixtState.track_distances`) para que la evaluación
+                los use.
+        """
+        self.max_time_s = max_time_s
+        self.max_depth = max_depth
+        self.tt = TablaTransposicion(tt_mb)
+        self.evaluator = evaluator
+        self.child_evaluator = child_evaluator
+        self.distances = distances
+        self.nodes = 0
+        self.iteraciones: list = []
+        self.cancelar = threading.Event()
+        self._deadline = 0.0
+        self._pv_previa: list = []
+
+    def limpiar(self) -> None:
+        """Olvida la tabla de transposición y la variante principal de búsquedas anteriores."""
+        self.tt.limpiar()
+        self._pv_previa = []
+
+    def solve(
+        self, state, root_moves: Optional[list] = None, max_time_s: Optional[float] = None
+    ) -> ResultadoBusqueda:
+        """
+        Busca la mejor jugada para el jugador en turno.
+
+        Args:
+            state: `TwixtState` de la posición; se deja intacto al terminar.
+            root_moves: Subconjunto opcional de jugadas raíz a considerar.
+            max_time_s: Presupuesto de esta búsqueda; por defecto `self.max_time_s`
+                (`math.inf` busca hasta `max_depth` o hasta `cancelar`).
+
+        Returns:
+            `ResultadoBusqueda` de la última iteración completada.
+        """
+        inicio = time.perf_counter()
+        self._deadline = inicio + (self.max_time_s if max_time_s is None else max_time_s)
+        self.nodes = 0
+        self.iteraciones = []
+        consultas, aciertos = self.tt.consultas, self.tt.aciertos
+        self.tt.nueva_busqueda()
+        if self.distances and state.distances is None:
+            state.track_distances()
+        movimientos = list(root_moves) if root_moves is not None else state.focused_moves()
+        resultado = ResultadoBusqueda(movimientos[0] if movimientos else None, 0.0, 0, 0, 0.0, [])
+        if not movimientos or state.winner is not None:
+            return resultado
+
+        self._pv_previa = []
+        for profundidad in range(1, self.max_depth + 1):
+            try:
+                valor, jugada = self._raiz(state, movimientos, profundidad)
+            except _TiempoAgotado:
+                break
+            pv = self._extraer_pv(state, jugada, profundidad)
+            self._pv_previa = pv
+            self.iteraciones.append((profundidad, jugada, valor))
+            resultado = ResultadoBusqueda(
+                jugada, valor, profundidad, self.nodes, time.perf_counter() - inicio, pv
+            )
+            if abs(valor) > UMBRAL_VICTORIA:
+                break
+        resultado.nodes = self.nodes
+        resultado.elapsed = time.perf_counter() - inicio
+        medidor = instrumentacion.actual
+        if medidor is not None:
+            # Ramificación efectiva: la que daría esos nodos en un árbol uniforme
+            medidor.busqueda(
+                "minimax",
+                resultado,
+                self.tt.consultas - consultas,
+                self.tt.aciertos - aciertos,
+                resultado.nodes ** (1.0 / resultado.depth) if resultado.depth else None,
+            )
+        return resultado
+
+    def _ordenar(self, movimientos: list, jugada_tt, jugada_pv) -> list:
+        primeras = [m for m in (jugada_pv, jugada_tt) if m is not None and m in movimientos]
+        if not primeras:
+            return movimientos
+        resto = [m for m in movimientos if m not in primeras]
+        return list(dict.fromkeys(primeras)) + resto
+
+    def _raiz(self, state, movimientos: list, profundidad: int):
+        alfa = -VICTORIA - 1
+        beta = VICTORIA + 1
+        jugada_pv = self._pv_previa[0] if self._pv_previa else None
+        entrada = self.tt.buscar(state.hash)
+        jugada_tt = entrada[4] if entrada is not None else None
+        mejor_jugada = None
+        mejor_valor = -VICTORIA - 1
+        for jugada in self._ordenar(movimientos, jugada_tt, jugada_pv):
+            state.make(jugada)
+            try:
+                valor = -self._negamax(state, profundidad - 1, -beta, -alfa, 1, jugada == jugada_pv)
+            finally:
+                state.unmake()
+            if valor > mejor_valor:
+                mejor_valor, mejor_jugada = valor, jugada
+            if valor > alfa:
+                alfa = valor
+        self.tt.guardar(state.hash, profundidad, _valor_a_tabla(mejor_valor, 0), EXACTO, mejor_jugada)
+        return mejor_valor, mejor_jugada
+
+    def _negamax(self, state, profundidad: int, alfa: float, beta: float, ply: int, en_pv: bool) -> float:
+        self.nodes += 1
+        if self.nodes & MASCARA_REVISION == 0:
+            if time.perf_counter() > self._deadline or self.cancelar.is_set():
+                raise _TiempoAgotado()
+
+        if state.winner is not None:
+            return -VICTORIA + ply if state.winner != state.turn else VICTORIA - ply
+        if profundidad <= 0:
+            return self.evaluator(state)
+
+        alfa_original = alfa
+        entrada = self.tt.buscar(state.hash)
+        jugada_tt = None
+        if entrada is not None:
+            jugada_tt = entrada[4]
+            if entrada[1] >= profundidad:
+                valor = _valor_de_tabla(entrada[2], ply)
+                tipo = entrada[3]
+                if tipo == EXACTO:
+                    return valor
+                if tipo == COTA_INFERIOR and valor > alfa:
+                    alfa = valor
+                elif tipo == COTA_SUPERIOR and valor < beta:
+                    beta = valor
+                if alfa >= beta:
+                    return valor
+
+        movimientos = state.focused_moves()
+        if not movimientos:
+            return self.evaluator(state)
+        if profundidad == 1 and self.child_evaluator is not None:
+            return self._frontera(state, movimientos, ply)
+        jugada_pv = None
+        if en_pv and ply < len(self._pv_previa):
+            jugada_pv = self._pv_previa[ply]
+
+        mejor_valor = -VICTORIA - 1
+        mejor_jugada = None
+        for jugada in self._ordenar(movimientos, jugada_tt, jugada_pv):
+            state.make(jugada)
+            try:
+                valor = -self._negamax(
+                    state, profundidad - 1, -beta, -alfa, ply + 1, en_pv and jugada == jugada_pv
+                )
+            finally:
+                state.unmake()
+            if valor > mejor_valor:
+                mejor_valor, mejor_jugada = valor, jugada
+            if valor > alfa:
+                alfa = valor
+            if alfa >= beta:
+                break
+
+        if mejor_valor <= alfa_original:
+            tipo = COTA_SUPERIOR
+        elif mejor_valor >= beta:
+            tipo = COTA_INFERIOR
+        else:
+            tipo = EXACTO
+        self.tt.guardar(state.hash, profundidad, _valor_a_tabla(mejor_valor, ply), tipo, mejor_jugada)
+        return mejor_valor
+
+    def _frontera(self, state, movimientos: list, ply: int) -> float:
+        # Todos los hijos se evalúan juntos; sin poda, el valor resultante es exacto
+        valores = self.child_evaluator(state, movimientos)
+        self.nodes += len(movimientos)
+        mejor_valor = -VICTORIA - 1
+        mejor_jugada = None
+        for jugada, valor in zip(movimientos, valores):
+            valor = VICTORIA - ply - 1 if valor <= -VICTORIA else -valor
+            if valor > mejor_valor:
+                mejor_valor, mejor_jugada = valor, jugada
+        self.tt.guardar(state.hash, 1, _valor_a_tabla(mejor_valor, ply), EXACTO, mejor_jugada)
+        return mejor_valor
+
+    def _extraer_pv(self, state, primera, profundidad: int) -> list:
+        # Recorre la tabla desde la raíz siguiendo las mejores jugadas guardadas
+        pv = [primera]
+        state.make(primera)
+        aplicadas = 1
+        try:
+            while len(pv) < profundidad and state.winner is None:
+                entrada = self.tt.buscar(state.hash)
+                if entrada is None or entrada[4] is None:
+                    break
+                jugada = entrada[4]
+                if jugada not in state.legal_moves():
+                    break
+                pv.append(jugada)
+                state.make(jugada)
+                aplicadas += 1
+        finally:
+            for _ in range(aplicadas):
+                state.unmake()
+        return pv
+
+
+def solve(state, max_time_s: float = 1.0, max_depth: int = 4) -> ResultadoBusqueda:
+    """Atajo para una búsqueda puntual con un `Solver` nuevo."""
+    return Solver(max_time_s=max_time_s, max_depth=max_depth).solve(state)
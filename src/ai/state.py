@@ -0,0 +1,357 @@
+# state.py
+import random
+from functools import lru_cache
+
+from src.TablaCruces import murallas_por_celda, tabla_extremos
+from src.TableroBits import JUGADOR_HORIZONTAL, JUGADOR_VERTICAL, TableroBits
+
+ZOBRIST_SEMILLA = 0x7A157
+
+
+@lru_cache(maxsize=None)
+def tablas_zobrist(n_filas: int, n_columnas: int) -> tuple:
+    """
+    Claves Zobrist de 64 bits para un tamaño de tablero.
+
+    Son deterministas (semilla fija) para que el mismo tablero produzca el
+    mismo hash en cualquier proceso, lo que permite compartir tablas y libros.
+
+    Returns:
+        Tupla (fichas, murallas, turno): `fichas[jugador][celda]`,
+        `murallas[jugador][id_muralla]` y la clave que se aplica cuando juega B.
+    """
+    rng = random.Random(ZOBRIST_SEMILLA ^ (n_filas << 16) ^ n_columnas)
+    n_celdas = n_filas * n_columnas
+    fichas = tuple(tuple(rng.getrandbits(64) for _ in range(n_celdas)) for _ in range(2))
+    murallas = tuple(tuple(rng.getrandbits(64) for _ in range(2 * n_celdas)) for _ in range(2))
+    turno = rng.getrandbits(64)
+    return fichas, murallas, turno
+
+
+class TwixtState:
+    """
+    Estado compacto del juego para la búsqueda.
+
+    Envuelve un `TableroBits` propio y lo modifica en sitio con `make`/`unmake`,
+    de modo que explorar una línea no copia el tablero. El hash Zobrist de 64
+    bits se actualiza con un XOR por jugada.
+
+    Las jugadas son enteros: `celda` para colocar una ficha y
+    `n_celdas + id_muralla` para construir una muralla (ver `TablaCruces`).
+    Cada jugada consume el turno, igual que las opciones del menú de `Juego`.
+
+    Attributes:
+        bits: Núcleo de bitboards con fichas, murallas y conectividad.
+        turn: Índice del jugador que mueve (0 = A vertical, 1 = B horizontal).
+        hash: Hash Zobrist de la posición (incluye el turno).
+        winner: Índice del ganador o None.
+        distances: `MapasDistancia` opcional (ver `track_distances`), o None.
+    """
+
+    __slots__ = (
+        "bits",
+        "turn",
+        "hash",
+        "winner",
+        "distances",
+        "n_rows",
+        "n_cols",
+        "n_cells",
+        "_history",
+        "_z_pegs",
+        "_z_walls",
+        "_z_turn",
+        "_walls_end",
+        "_walls_from",
+    )
+
+    def __init__(self, n_rows: int, n_cols: int, turn: int = JUGADOR_VERTICAL):
+        """
+        Crea un estado vacío.
+
+        Args:
+            n_rows: Número de filas.
+            n_cols: Número de columnas.
+            turn: Jugador que mueve primero.
+        """
+        self.bits = TableroBits(n_rows, n_cols)
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.n_cells = n_rows * n_cols
+        self._z_pegs, self._z_walls, self._z_turn = tablas_zobrist(n_rows, n_cols)
+        self._walls_end = tabla_extremos(n_rows, n_cols)
+        self._walls_from = murallas_por_celda(n_rows, n_cols)
+        self._history: list = []
+        self.turn = turn
+        self.hash = self._z_turn if turn == JUGADOR_HORIZONTAL else 0
+        self.winner = None
+        self.distances = None
+
+    def track_distances(self):
+        """
+        Activa los mapas de distancia de conexión (`MapasDistancia`).
+
+        A partir de aquí `make`/`unmake` los actualizan de forma incremental y
+        `heuristics.evaluate` suma el término de distancia.
+
+        Returns:
+            Los mapas creados.
+        """
+        from src.ai.distances import MapasDistancia
+
+        self.distances = MapasDistancia(self.bits)
+        return self.distances
+
+    def reset(self, turn: int = JUGADOR_VERTICAL) -> None:
+        """
+        Vuelve al tablero vacío reutilizando las tablas y el núcleo ya creados.
+
+        Args:
+            turn: Jugador que mueve primero.
+        """
+        self.bits.limpiar()
+        self._history.clear()
+        self.turn = turn
+        self.hash = self._z_turn if turn == JUGADOR_HORIZONTAL else 0
+        self.winner = None
+        if self.distances is not None:
+            self.distances.recalcular()
+
+    @classmethod
+    def from_tablero(cls, tablero, jugador_a, jugador_b, jugador_actual=None) -> "TwixtState":
+        """
+        Construye el estado a partir del tablero y las piezas de ambos jugadores.
+
+        Args:
+            tablero: `Tablero` de la partida.
+            jugador_a: Jugador vertical (A).
+            jugador_b: Jugador horizontal (B).
+            jugador_actual: Jugador que mueve; por defecto A.
+
+        Returns:
+            Nuevo `TwixtState` equivalente a la posición actual.
+        """
+        turn = JUGADOR_VERTICAL
+        if jugador_actual is not None and not jugador_actual.is_vertical_player:
+            turn = JUGADOR_HORIZONTAL
+        state = cls(len(tablero.filas), len(tablero.columnas), turn)
+        for jugador, dueno in ((JUGADOR_VERTICAL, jugador_a), (JUGADOR_HORIZONTAL, jugador_b)):
+            for ficha in dueno.pieces:
+                state._place_peg(jugador, ficha.celda)
+        for jugador, dueno in ((JUGADOR_VERTICAL, jugador_a), (JUGADOR_HORIZONTAL, jugador_b)):
+            for muralla in dueno.walls:
+                id_muralla = state.bits.id_muralla(*muralla.celdas_extremos)
+                state._place_wall(jugador, id_muralla)
+        state.winner = state.bits.ganador()
+        # Las colocaciones iniciales no se deshacen con unmake
+        state._history.clear()
+        state.bits.olvidar_historial()
+        return state
+
+    def place(self, player: int, move: int) -> None:
+        """
+        Coloca una pieza fuera del flujo de turnos (preparación de posiciones).
+
+        A diferencia de `make`, no cambia el turno ni puede deshacerse, y
+        descarta el historial: las jugadas previas ya no se pueden revertir.
+
+        Args:
+            player: Índice del dueño de la pieza.
+            move: Jugada codificada.
+        """
+        if move < self.n_cells:
+            self._place_peg(player, move)
+        else:
+            self._place_wall(player, move - self.n_cells)
+        if self.winner is None and self.bits.conecta_bordes(player):
+            self.winner = player
+        self._history.clear()
+        self.bits.olvidar_historial()
+        if self.distances is not None:
+            self.distances.recalcular()
+
+    def set_turn(self, player: int) -> None:
+        """Fija el jugador en turno manteniendo el hash coherente."""
+        if player != self.turn:
+            self.turn = player
+            self.hash ^= self._z_turn
+
+    def _place_peg(self, player: int, cell: int) -> None:
+        self.bits.colocar_ficha(player, cell)
+        self.hash ^= self._z_pegs[player][cell]
+
+    def _place_wall(self, player: int, wall_id: int) -> None:
+        a, b, centro = self._walls_end[wall_id]
+        self.bits.colocar_muralla(player, centro, a, b)
+        self.hash ^= self._z_walls[player][wall_id]
+
+    def is_peg(self, move: int) -> bool:
+        """True si la jugada coloca una ficha."""
+        return move < self.n_cells
+
+    def wall_move(self, wall_id: int) -> int:
+        """Codifica un id de muralla como jugada."""
+        return self.n_cells + wall_id
+
+    def wall_ends(self, wall_id: int) -> tuple:
+        """Devuelve (celda_a, celda_b, celda_central) de una muralla."""
+        return self._walls_end[wall_id]
+
+    def make(self, move: int) -> None:
+        """
+        Aplica una jugada del jugador en turno (sin validar) y pasa el turno.
+
+        Args:
+            move: Jugada codificada (ver docstring de la clase).
+        """
+        player = self.turn
+        if move < self.n_cells:
+            self._place_peg(player, move)
+            if self.distances is not None:
+                self.distances.ficha(player, move)
+        else:
+            self._place_wall(player, move - self.n_cells)
+            if self.distances is not None:
+                self.distances.muralla(player, move - self.n_cells)
+        self._history.append((move, self.winner))
+        if self.winner is None and self.bits.conecta_bordes(player):
+            self.winner = player
+        self.turn = player ^ 1
+        self.hash ^= self._z_turn
+
+    def unmake(self) -> None:
+        """Revierte la última jugada aplicada con `make`."""
+        move, self.winner = self._history.pop()
+        if self.distances is not None:
+            self.distances.deshacer()
+        player = self.turn ^ 1
+        self.turn = player
+        self.hash ^= self._z_turn
+        if move < self.n_cells:
+            self.bits.quitar_ficha(player, move)
+            self.hash ^= self._z_pegs[player][move]
+        else:
+            wall_id = move - self.n_cells
+            a, b, centro = self._walls_end[wall_id]
+            self.bits.quitar_muralla(player, centro, a, b)
+            self.hash ^= self._z_walls[player][wall_id]
+
+    def is_terminal(self) -> bool:
+        """True si algún jugador ya conectó sus bordes."""
+        return self.winner is not None
+
+    def legal_peg_mask(self, player=None) -> int:
+        """
+        Bitboard de las celdas donde el jugador puede colocar una ficha.
+
+        Args:
+            player: Índice del jugador; por defecto el que está en turno.
+        """
+        if player is None:
+            player = self.turn
+        bits = self.bits
+        libres = ((1 << self.n_cells) - 1) & ~bits.ocupadas & ~bits.prohibidas[player]
+        # Las celdas del extremo ganador requieren ficha propia de apoyo
+        extremo = libres & bits.extremo_ganador[player]
+        if extremo:
+            fichas = bits.fichas[player]
+            apoyo = bits.apoyo[player]
+            while extremo:
+                bajo = extremo & -extremo
+                if not fichas & apoyo.get(bajo.bit_length() - 1, 0):
+                    libres ^= bajo
+                extremo ^= bajo
+        return libres
+
+    def legal_pegs(self, player=None) -> list[int]:
+        """
+        Celdas donde el jugador puede colocar una ficha, en orden creciente.
+
+        Args:
+            player: Índice del jugador; por defecto el que está en turno.
+        """
+        libres = self.legal_peg_mask(player)
+        celdas = []
+        while libres:
+            bajo = libres & -libres
+            celdas.append(bajo.bit_length() - 1)
+            libres ^= bajo
+        return celdas
+
+    def legal_walls(self, player=None) -> list[int]:
+        """
+        Ids de las murallas que el jugador puede construir entre sus fichas.
+
+        Args:
+            player: Índice del jugador; por defecto el que está en turno.
+        """
+        if player is None:
+            player = self.turn
+        bits = self.bits
+        fichas = bits.fichas[player]
+        ocupadas = bits.ocupadas
+        puentes = bits.puentes
+        cruces = bits.cruces
+        walls_from = self._walls_from
+        resultado = []
+        restantes = fichas
+        while restantes:
+            bajo = restantes & -restantes
+            celda = bajo.bit_length() - 1
+            restantes ^= bajo
+            for wall_id, otra, centro in walls_from[celda]:
+                # Cada muralla se genera una sola vez, desde su ficha superior
+                if otra < celda or not (fichas >> otra) & 1 or (ocupadas >> centro) & 1:
+                    continue
+                if any(c in puentes for c in cruces[wall_id]):
+                    continue
+                resultado.append(wall_id)
+        return resultado
+
+    def legal_moves(self) -> list[int]:
+        """Todas las jugadas legales del jugador en turno (murallas primero)."""
+        if self.winner is not None:
+            return []
+        n_cells = self.n_cells
+        moves = [n_cells + wall_id for wall_id in self.legal_walls()]
+        moves.extend(self.legal_pegs())
+        return moves
+
+    def focused_moves(self) -> list[int]:
+        """
+        Jugadas enfocadas para la búsqueda.
+
+        Incluye las murallas legales y las fichas a un salto diagonal de las
+        fichas propias; si el jugador aún no tiene fichas, su borde de salida.
+        Si no hay ninguna, devuelve todas las jugadas legales.
+        """
+        if self.winner is not None:
+            return []
+        player = self.turn
+        bits = self.bits
+        n_cells = self.n_cells
+        moves = [n_cells + wall_id for wall_id in self.legal_walls(player)]
+        fichas = bits.fichas[player]
+        if fichas:
+            objetivo = 0
+            walls_from = self._walls_from
+            restantes = fichas
+            while restantes:
+                bajo = restantes & -restantes
+                restantes ^= bajo
+                for _, otra, _ in walls_from[bajo.bit_length() - 1]:
+                    objetivo |= 1 << otra
+        else:
+            objetivo = bits.borde_inicio[player]
+        objetivo &= self.legal_peg_mask(player)
+        while objetivo:
+            bajo = objetivo & -objetivo
+            moves.append(bajo.bit_length() - 1)
+            objetivo ^= bajo
+        return moves or self.legal_moves()
+
+    def __repr__(self) -> str:
+        return (
+            f"TwixtState({self.n_rows}x{self.n_cols}, turn={self.turn}, "
+            f"hash={self.hash:016x}, winner={self.winner})"
+        )
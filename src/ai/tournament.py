@@ -0,0 +1,393 @@
+# tournament.py
+import itertools
+import math
+import multiprocessing
+import random
+import time
+
+from src.ai.selfplay import crear_politica, jugar_partida, semilla_partida
+from src.ai.state import TwixtState
+
+# Cuantil normal de los intervalos de confianza (95 %)
+Z_95 = 1.959964
+
+# Victorias y derrotas ficticias con que `Marcador.llr` estima la varianza
+PREVIA_LLR = 1.0
+
+
+def puntuacion_esperada(elo: float) -> float:
+    """Puntuación esperada (0..1) con una diferencia de `elo` puntos a favor."""
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def elo_de_puntuacion(puntuacion: float) -> float:
+    """Diferencia de Elo que corresponde a una puntuación media (±inf en 0 y 1)."""
+    if puntuacion <= 0.0:
+        return -math.inf
+    if puntuacion >= 1.0:
+        return math.inf
+    return -400.0 * math.log10(1.0 / puntuacion - 1.0)
+
+
+def limites_sprt(alfa: float = 0.05, beta: float = 0.05) -> tuple:
+    """Cotas (inferior, superior) del logaritmo de la razón de verosimilitud."""
+    return math.log(beta / (1.0 - alfa)), math.log((1.0 - beta) / alfa)
+
+
+class Marcador:
+    """
+    Victorias, empates y derrotas de un motor contra otro.
+
+    Attributes:
+        victorias: Partidas ganadas por el primer motor.
+        empates: Partidas sin ganador.
+        derrotas: Partidas ganadas por el segundo motor.
+    """
+
+    def __init__(self):
+        self.victorias = 0
+        self.empates = 0
+        self.derrotas = 0
+
+    def anotar(self, puntos: float) -> None:
+        """Suma una partida: 1 victoria, 0.5 empate, 0 derrota (del primer motor)."""
+        if puntos == 1.0:
+            self.victorias += 1
+        elif puntos == 0.0:
+            self.derrotas += 1
+        else:
+            self.empates += 1
+
+    @property
+    def partidas(self) -> int:
+        return self.victorias + self.empates + self.derrotas
+
+    @property
+    def puntuacion(self) -> float:
+        """Puntuación media del primer motor (0.5 sin partidas)."""
+        if not self.partidas:
+            return 0.5
+        return (self.victorias + 0.5 * self.empates) / self.partidas
+
+    def _varianza(self, previa: float = 0.0) -> float:
+        # Varianza por partida del resultado (modelo trinomial), con `previa`
+        # victorias y derrotas ficticias añadidas
+        victorias = self.victorias + previa
+        derrotas = self.derrotas + previa
+        n = victorias + self.empates + derrotas
+        s = (victorias + 0.5 * self.empates) / n
+        return (victorias * (1.0 - s) ** 2 + self.empates * (0.5 - s) ** 2 + derrotas * s**2) / n
+
+    def elo(self) -> float:
+        """Diferencia de Elo estimada a favor del primer motor."""
+        return elo_de_puntuacion(self.puntuacion)
+
+    def intervalo(self, z: float = Z_95) -> tuple:
+        """
+        Intervalo de confianza de la diferencia de Elo.
+
+        Se calcula sobre la puntuación media (aproximación normal) y se
+        traslada a Elo, por eso no es simétrico alrededor de `elo()`.
+        """
+        if not self.partidas:
+            return -math.inf, math.inf
+        margen = z * math.sqrt(self._varianza() / self.partidas)
+        return elo_de_puntuacion(self.puntuacion - margen), elo_de_puntuacion(self.puntuacion + margen)
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """
+        Logaritmo de la razón de verosimilitud de H1 (`elo1`) frente a H0 (`elo0`).
+
+        Usa la aproximación normal del SPRT generalizado sobre la puntuación
+        media. La varianza se estima con `PREVIA_LLR` victorias y derrotas
+        ficticias: sin ellas sería 0 en una racha de solo victorias (o solo
+        derrotas) y el LLR no tendría valor. La previa pesa cada vez menos a
+        medida que se juegan partidas.
+        """
+        if not self.partidas:
+            return 0.0
+        varianza = self._varianza(PREVIA_LLR) / self.partidas
+        s0 = puntuacion_esperada(elo0)
+        s1 = puntuacion_esperada(elo1)
+        return (s1 - s0) * (2.0 * self.puntuacion - s0 - s1) / (2.0 * varianza)
+
+    def __repr__(self) -> str:
+        return f"+{self.victorias} ={self.empates} -{self.derrotas}"
+
+
+def ratings(motores: list, marcadores: dict, iteraciones: int = 200) -> list:
+    """
+    Elo de cada motor por máxima verosimilitud (Bradley-Terry) sobre todos los pares.
+
+    Los empates cuentan como media victoria y cada par suma un empate
+    virtual para que un motor sin victorias no quede en -inf. La media de
+    los ratings es 0.
+
+    Args:
+        motores: Especificaciones de los motores.
+        marcadores: `Marcador` por par (i, j) con i < j, desde el punto de vista de i.
+        iteraciones: Iteraciones del algoritmo MM.
+
+    Returns:
+        Lista de Elo en el orden de `motores`.
+    """
+    n = len(motores)
+    victorias = [0.0] * n
+    partidas = [[0.0] * n for _ in range(n)]
+    for (i, j), marcador in marcadores.items():
+        puntos = marcador.victorias + 0.5 * marcador.empates + 0.5
+        victorias[i] += puntos
+        victorias[j] += marcador.partidas + 1 - puntos
+        partidas[i][j] = partidas[j][i] = marcador.partidas + 1
+    fuerza = [1.0] * n
+    for _ in range(iteraciones):
+        for i in range(n):
+            denominador = sum(partidas[i][j] / (fuerza[i] + fuerza[j]) for j in range(n) if partidas[i][j])
+            if denominador:
+                fuerza[i] = victorias[i] / denominador
+        media = math.exp(sum(math.log(f) for f in fuerza) / n)
+        fuerza = [f / media for f in fuerza]
+    return [400.0 * math.log10(f) for f in fuerza]
+
+
+# Estado de cada proceso trabajador: un tablero y las políticas de cada motor
+_trabajador: dict = {}
+
+
+def _iniciar_trabajador(n_filas: int, n_columnas: int, motores: list, semilla: int) -> None:
+    _trabajador["state"] = TwixtState(n_filas, n_columnas)
+    # Una política por motor, creada al usarla por primera vez (conserva su tabla de transposición)
+    _trabajador["motores"] = motores
+    _trabajador["politicas"] = {}
+    _trabajador["semilla"] = semilla
+
+
+def _politica(indice: int):
+    politicas = _trabajador["politicas"]
+    if indice not in politicas:
+        politicas[indice] = crear_politica(_trabajador["motores"][indice], _trabajador["semilla"] + indice)
+    return politicas[indice]
+
+
+def _jugar_emparejamiento(tarea: tuple) -> dict:
+    indice, motor_a, motor_b, semilla_apertura, aperturas, max_jugadas = tarea
+    state = _trabajador["state"]
+    state.reset()
+    # Apertura aleatoria común a las dos partidas de cada par de colores
+    rng = random.Random(semilla_apertura)
+    for _ in range(aperturas):
+        jugadas = state.focused_moves()
+        if not jugadas or state.winner is not None:
+            break
+        state.make(rng.choice(jugadas))
+    politicas = [_politica(motor_a), _politica(motor_b)]
+    for jugador, politica in enumerate(politicas):
+        politica.sembrar(semilla_partida(_trabajador["semilla"], indice, jugador))
+    inicio = time.perf_counter()
+    resultado = jugar_partida(state, politicas, max_jugadas)
+    resultado.update(
+        {"partida": indice, "a": motor_a, "b": motor_b, "segundos": time.perf_counter() - inicio}
+    )
+    return resultado
+
+
+def torneo(
+    motores: list,
+    partidas_por_par: int = 100,
+    n_workers: int = 1,
+    n_filas: int = 20,
+    n_columnas: int = 20,
+    max_jugadas=None,
+    aperturas: int = 2,
+    semilla: int = 0,
+    sprt=None,
+    al_terminar=None,
+) -> dict:
+    """
+    Juega un todos contra todos entre motores y estima su diferencia de Elo.
+
+    Cada par de motores juega `partidas_por_par` partidas (redondeado a par)
+    alternando quién es A y quién B: las partidas 2k y 2k+1 empiezan desde la
+    misma apertura aleatoria de `aperturas` jugadas con los colores
+    cambiados, para que la ventaja de mover primero se compense.
+
+    Con `sprt=(elo0, elo1[, alfa, beta])` y exactamente dos motores, el
+    torneo se detiene en cuanto el SPRT acepta H0 (el segundo motor no es
+    `elo1` mejor) o H1 (es al menos `elo1` mejor, en lugar de `elo0`).
+
+    Args:
+        motores: Especificaciones de los motores (ver `crear_politica`).
+        partidas_por_par: Partidas máximas por par de motores.
+        n_workers: Procesos; con 1 se juega en el proceso actual.
+        n_filas: Filas del tablero.
+        n_columnas: Columnas del tablero.
+        max_jugadas: Límite de jugadas por partida; por defecto el número de celdas.
+        aperturas: Jugadas aleatorias al inicio de cada par de partidas.
+        semilla: Semilla base de las aperturas y de las políticas (ver `semilla_partida`).
+        sprt: Parámetros del SPRT o None para jugar todas las partidas.
+        al_terminar: Función opcional llamada con el resultado de cada partida.
+
+    Returns:
+        Resumen con el marcador, el Elo y su intervalo por par, los ratings
+        de cada motor y, si hay SPRT, su LLR y decisión.
+
+    Raises:
+        ValueError: Si hay menos de dos motores o SPRT con más de dos.
+    """
+    if len(motores) < 2:
+        raise ValueError("Se necesitan al menos dos motores")
+    if sprt is not None and len(motores) != 2:
+        raise ValueError("El SPRT compara exactamente dos motores")
+    if max_jugadas is None:
+        max_jugadas = n_filas * n_columnas
+    rondas = (partidas_por_par + 1) // 2
+    pares = list(itertools.combinations(range(len(motores)), 2))
+    tareas = []
+    # Se intercalan los pares para que un corte temprano deje todos parejos
+    for ronda in range(rondas):
+        semilla_apertura = semilla * 1_000_003 + ronda
+        for i, j in pares:
+            tareas.append((len(tareas), i, j, semilla_apertura, aperturas, max_jugadas))
+            tareas.append((len(tareas), j, i, semilla_apertura, aperturas, max_jugadas))
+
+    marcadores = {par: Marcador() for par in pares}
+    if sprt is not None:
+        elo0, elo1, *errores = sprt
+        inferior, superior = limites_sprt(*errores)
+    decision = None
+
+    def registrar(resultado: dict) -> bool:
+        # Anota la partida; devuelve True si el SPRT ya decidió
+        nonlocal decision
+        a, b = resultado["a"], resultado["b"]
+        i, j = min(a, b), max(a, b)
+        ganador = resultado["ganador"]
+        if ganador is None:
+            puntos = 0.5
+        else:
+            puntos = 1.0 if (ganador == "A") == (a == i) else 0.0
+        marcadores[(i, j)].anotar(puntos)
+        if al_terminar is not None:
+            al_terminar(resultado)
+        if sprt is None:
+            return False
+        # El SPRT se plantea a favor del segundo motor (el candidato): desde el
+        # primero, sus hipótesis son -elo0 y -elo1
+        llr = marcadores[(0, 1)].llr(-elo0, -elo1)
+        if llr >= superior:
+            decision = "H1"
+        elif llr <= inferior:
+            decision = "H0"
+        return decision is not None
+
+    inicializacion = (n_filas, n_columnas, list(motores), semilla)
+    inicio = time.perf_counter()
+    if n_workers <= 1:
+        _iniciar_trabajador(*inicializacion)
+        for tarea in tareas:
+            if registrar(_jugar_emparejamiento(tarea)):
+                break
+    else:
+        with multiprocessing.Pool(n_workers, _iniciar_trabajador, inicializacion) as pool:
+            for resultado in pool.imap_unordered(_jugar_emparejamiento, tareas):
+                if registrar(resultado):
+                    # Al salir del bloque se terminan las partidas en curso
+                    break
+    segundos = time.perf_counter() - inicio
+
+    elos = ratings(motores, marcadores)
+    resumen = {
+        "motores": list(motores),
+        "segundos": segundos,
+        "partidas": sum(m.partidas for m in marcadores.values()),
+        "ratings": dict(zip(motores, elos)),
+        "pares": [],
+    }
+    for (i, j), marcador in marcadores.items():
+        bajo, alto = marcador.intervalo()
+        resumen["pares"].append(
+            {
+                "motor": motores[i],
+                "rival": motores[j],
+                "victorias": marcador.victorias,
+                "empates": marcador.empates,
+                "derrotas": marcador.derrotas,
+                "elo": marcador.elo(),
+                "intervalo_95": [bajo, alto],
+            }
+        )
+    if sprt is not None:
+        resumen["sprt"] = {
+            "elo0": elo0,
+            "elo1": elo1,
+            "llr": marcadores[(0, 1)].llr(-elo0, -elo1),
+            "limites": [inferior, superior],
+            "decision": decision,
+        }
+    return resumen
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Torneo todos contra todos entre motores con Elo y SPRT opcional."
+    )
+    parser.add_argument(
+        "motores", nargs="+", help="Especificaciones de los motores, p. ej. minimax:depth=2,time=0.2"
+    )
+    parser.add_argument("--partidas", type=int, default=100, help="Partidas máximas por par de motores")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--filas", type=int, default=20)
+    parser.add_argument("--columnas", type=int, default=20)
+    parser.add_argument("--max-jugadas", type=int, default=None)
+    parser.add_argument("--aperturas", type=int, default=2, help="Jugadas aleatorias iniciales")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--sprt",
+        type=float,
+        nargs=2,
+        metavar=("ELO0", "ELO1"),
+        default=None,
+        help="Detiene el duelo de dos motores cuando el SPRT decide",
+    )
+    parser.add_argument("--alfa", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--salida", default=None, help="Archivo JSON lines con el resultado de cada partida")
+    args = parser.parse_args()
+
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else None
+    try:
+        resumen = torneo(
+            args.motores,
+            args.partidas,
+            args.workers,
+            args.filas,
+            args.columnas,
+            args.max_jugadas,
+            args.aperturas,
+            args.semilla,
+            sprt=(*args.sprt, args.alfa, args.beta) if args.sprt else None,
+            al_terminar=(lambda resultado: salida.write(json.dumps(resultado) + "\n")) if salida else None,
+        )
+    finally:
+        if salida is not None:
+            salida.close()
+
+    for par in resumen["pares"]:
+        bajo, alto = par["intervalo_95"]
+        print(
+            f"{par['motor']} vs {par['rival']}: +{par['victorias']} ={par['empates']} -{par['derrotas']}  "
+            f"Elo {par['elo']:+.1f} [{bajo:+.1f}, {alto:+.1f}]",
+            file=sys.stderr,
+        )
+    if "sprt" in resumen:
+        sprt = resumen["sprt"]
+        print(
+            f"SPRT [{sprt['elo0']}, {sprt['elo1']}]: LLR {sprt['llr']:.2f} "
+            f"({sprt['limites'][0]:.2f}, {sprt['limites'][1]:.2f}) -> {sprt['decision'] or 'sin decisión'}",
+            file=sys.stderr,
+        )
+    print(json.dumps(resumen))
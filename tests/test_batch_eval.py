@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from src.ai.batch_eval import HAY_NUMPY, evaluate_batch, evaluate_children
+from src.ai.heuristics import evaluate
+from src.ai.state import TwixtState
+
+
+def _hijos_uno_a_uno(state, moves) -> list:
+    valores = []
+    for jugada in moves:
+        state.make(jugada)
+        valores.append(evaluate(state))
+        state.unmake()
+    return valores
+
+
+@pytest.mark.parametrize("n", [8, 12])
+def test_evaluate_children_igual_a_evaluar_cada_hijo(n):
+    # Sin NumPy se recorre la ruta de respaldo; con NumPy, la vectorizada
+    rng = random.Random(n)
+    state = TwixtState(n, n)
+    while state.winner is None:
+        jugadas = state.focused_moves()
+        if not jugadas:
+            break
+        antes = (state.hash, tuple(state.bits.fichas), frozenset(state.bits.puentes))
+        assert evaluate_children(state, jugadas) == pytest.approx(_hijos_uno_a_uno(state, jugadas))
+        assert (state.hash, tuple(state.bits.fichas), frozenset(state.bits.puentes)) == antes
+        state.make(rng.choice(jugadas))
+    assert evaluate_children(state, []) == []
+
+
+def test_evaluate_children_con_mapas_de_distancia():
+    rng = random.Random(3)
+    state = TwixtState(10, 10)
+    state.track_distances()
+    for _ in range(12):
+        state.make(rng.choice(state.focused_moves()))
+    jugadas = state.focused_moves()
+    assert evaluate_children(state, jugadas) == pytest.approx(_hijos_uno_a_uno(state, jugadas))
+
+
+@pytest.mark.skipif(not HAY_NUMPY, reason="NumPy no está instalado")
+def test_evaluate_batch_igual_a_evaluate():
+    rng = random.Random(5)
+    state = TwixtState(12, 12)
+    partida = []
+    while state.winner is None and len(partida) < 40:
+        jugadas = state.focused_moves()
+        if not jugadas:
+            break
+        partida.append(rng.choice(jugadas))
+        state.make(partida[-1])
+    posiciones = []
+    for fin in range(1, len(partida) + 1):
+        posicion = TwixtState(12, 12)
+        for jugada in partida[:fin]:
+            posicion.make(jugada)
+        posiciones.append(posicion)
+    assert evaluate_batch(posiciones) == pytest.approx([evaluate(s) for s in posiciones])
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from src.ai.book import SIMETRIAS, GeneradorLibro, LibroAperturas, hash_canonico, tablas_simetria
+from src.ai.state import TwixtState
+
+
+def _posicion(n: int, semilla: int) -> TwixtState:
+    rng = random.Random(semilla)
+    state = TwixtState(n, n)
+    for _ in range(rng.randint(4, 20)):
+        jugadas = state.focused_moves()
+        if not jugadas or state.winner is not None:
+            break
+        state.make(rng.choice(jugadas))
+    return state
+
+
+def _reflejar(state, simetria: int) -> TwixtState:
+    tabla = tablas_simetria(state.n_rows, state.n_cols)[simetria]
+    reflejo = TwixtState(state.n_rows, state.n_cols, turn=state.turn)
+    for jugador in (0, 1):
+        for celda in range(state.n_cells):
+            if (state.bits.fichas[jugador] >> celda) & 1:
+                reflejo.place(jugador, tabla[celda])
+        for id_m in state.bits.puentes_jugador[jugador]:
+            reflejo.place(jugador, tabla[state.wall_move(id_m)])
+    return reflejo
+
+
+@pytest.mark.parametrize("n", [8, 12, 13])
+def test_tablas_de_simetria_son_involuciones(n):
+    for tabla in tablas_simetria(n, n):
+        for jugada, imagen in enumerate(tabla):
+            assert imagen is None or tabla[imagen] == jugada
+
+
+@pytest.mark.parametrize("semilla", range(6))
+def test_hash_canonico_igual_en_las_cuatro_simetrias(semilla):
+    state = _posicion(12 + semilla % 2, semilla)
+    clave = hash_canonico(state)[0]
+    for simetria in range(SIMETRIAS):
+        assert hash_canonico(_reflejar(state, simetria))[0] == clave
+
+
+def test_libro_responde_en_cada_simetria(tmp_path):
+    n = 12
+    generador = GeneradorLibro(n, n)
+    posiciones = []
+    for semilla in range(5):
+        state = _posicion(n, semilla)
+        # Una ficha del interior: la regla de apoyo de los extremos no es simétrica
+        jugada = next(c for c in state.legal_pegs() if 2 <= c // n < n - 2 and 2 <= c % n < n - 2)
+        generador.agregar(state, jugada, peso=semilla + 1)
+        posiciones.append((state, jugada))
+    ruta = tmp_path / "libro.twxb"
+    assert generador.guardar(ruta) == len(posiciones)
+    libro = LibroAperturas(ruta)
+    try:
+        assert len(libro) == len(posiciones)
+        for state, jugada in posiciones:
+            for simetria in range(SIMETRIAS):
+                esperada = tablas_simetria(n, n)[simetria][jugada]
+                reflejo = _reflejar(state, simetria)
+                assert [j for j, _ in libro.jugadas(reflejo)] == [esperada]
+                assert libro.buscar(reflejo) == esperada
+        assert libro.buscar(TwixtState(n + 1, n + 1)) is None
+    finally:
+        libro.cerrar()
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from src.ai.distances import MapasDistancia
+from src.ai.state import TwixtState
+
+
+def _desde_cero(state) -> list:
+    return MapasDistancia(state.bits).mapas
+
+
+@pytest.mark.parametrize("n", [8, 12, 20])
+def test_actualizacion_incremental_igual_a_recalcular(n):
+    rng = random.Random(n)
+    for _ in range(4):
+        state = TwixtState(n, n)
+        mapas = state.track_distances()
+        while state.winner is None:
+            jugadas = state.legal_moves() if rng.random() < 0.2 else state.focused_moves()
+            if not jugadas:
+                break
+            state.make(rng.choice(jugadas))
+            assert mapas.mapas == _desde_cero(state)
+
+
+def test_deshacer_restaura_los_mapas():
+    rng = random.Random(3)
+    state = TwixtState(12, 12)
+    mapas = state.track_distances()
+    for _ in range(30):
+        jugadas = state.focused_moves()
+        if not jugadas or state.winner is not None:
+            break
+        state.make(rng.choice(jugadas))
+    antes = [[list(m) for m in lados] for lados in mapas.mapas]
+    # Ramas al azar de varias jugadas que se deshacen por completo
+    for _ in range(20):
+        profundidad = 0
+        for _ in range(rng.randint(1, 6)):
+            jugadas = state.legal_moves()
+            if not jugadas or state.winner is not None:
+                break
+            state.make(rng.choice(jugadas))
+            profundidad += 1
+            assert mapas.mapas == _desde_cero(state)
+        for _ in range(profundidad):
+            state.unmake()
+        assert mapas.mapas == antes
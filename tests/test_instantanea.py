@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from src.ai.state import TwixtState
+from src.Instantanea import AlmacenInstantaneas, FormatoInstantanea
+from src.Jugador import Jugador
+
+
+def _partida(n: int, semilla: int) -> list:
+    """Instantáneas de cada posición de una partida al azar."""
+    formato = FormatoInstantanea(n, n)
+    rng = random.Random(semilla)
+    state = TwixtState(n, n)
+    instantaneas = []
+    while state.winner is None:
+        jugadas = state.focused_moves()
+        if not jugadas:
+            break
+        state.make(rng.choice(jugadas))
+        instantaneas.append((formato.empaquetar_estado(state), state.hash, state.turn, state.winner))
+    return instantaneas
+
+
+@pytest.mark.parametrize("n", [5, 12, 20, 23])
+def test_estado_ida_y_vuelta(n):
+    formato = FormatoInstantanea(n, n)
+    for semilla in range(3):
+        for datos, hash_, turno, ganador in _partida(n, semilla):
+            assert len(datos) == formato.tamano
+            state = formato.a_estado(datos)
+            assert state.hash == hash_
+            assert state.turn == turno
+            assert state.winner == ganador
+            assert formato.empaquetar_estado(state) == datos
+
+
+@pytest.mark.parametrize("n", [12, 20])
+def test_tablero_ida_y_vuelta(n):
+    formato = FormatoInstantanea(n, n)
+    for datos, hash_, turno, ganador in _partida(n, 4):
+        tablero, jugador_a, jugador_b, actual = formato.restaurar(datos)
+        assert formato.empaquetar(tablero, jugador_a, jugador_b, actual) == datos
+        assert TwixtState.from_tablero(tablero, jugador_a, jugador_b, actual).hash == hash_
+        # Cada pieza restaurada pertenece a su jugador y se puede encontrar por celda
+        for jugador in (jugador_a, jugador_b):
+            for ficha in jugador.pieces:
+                assert jugador.get_piece_by_cell(ficha.celda) is ficha
+        assert tablero.winner["is_winner"] == (ganador is not None)
+
+
+def test_banderas_de_ia_y_turno():
+    formato = FormatoInstantanea(12, 12)
+    state = TwixtState(12, 12)
+    state.make(state.focused_moves()[0])
+    tablero, a, b, _ = formato.restaurar(formato.empaquetar_estado(state))
+    a_ia = Jugador("IA", "A", is_ai=True)
+    datos = formato.empaquetar(tablero, a_ia, b, b)
+    _, jugador_a, jugador_b, actual = formato.restaurar(datos)
+    assert jugador_a.is_ai and not jugador_b.is_ai
+    assert actual is jugador_b
+
+
+def test_almacen_ida_y_vuelta(tmp_path):
+    ruta = tmp_path / "posiciones.twxs"
+    instantaneas = [datos for datos, *_ in _partida(20, 7)]
+    with AlmacenInstantaneas(ruta, 20, 20) as almacen:
+        almacen.agregar(instantaneas[0])
+        almacen.agregar_varias(instantaneas[1:])
+        assert len(almacen) == len(instantaneas)
+        assert bytes(almacen[-1]) == instantaneas[-1]
+    with AlmacenInstantaneas(ruta) as almacen:
+        assert [bytes(datos) for datos in almacen] == instantaneas
+        assert bytes(almacen[3]) == instantaneas[3]
+    with pytest.raises(ValueError):
+        AlmacenInstantaneas(ruta, 12, 12)
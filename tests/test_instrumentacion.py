@@ -0,0 +1,37 @@
+import io
+import random
+
+import src.Instrumentacion as instrumentacion
+from src.Instrumentacion import Medidor
+from src.Jugador import Jugador
+from tests.test_tablero import _jugar, _tablero
+
+
+def test_fase_anidada_cuenta_solo_su_tiempo_exclusivo():
+    medidor = Medidor(io.StringIO())
+    medidor.iniciar_turno()
+    marca = medidor.marca()
+    medidor.fase("interna", 0.25)
+    medidor.fase("interna", 0.25)
+    medidor.fase("externa", 2.0, marca)
+    medidor.fase("suelta", 1.0)
+    fases = medidor.terminar_turno()["fases"]
+    assert fases["interna"] == {"llamadas": 2, "segundos": 0.5}
+    assert fases["externa"] == {"llamadas": 1, "segundos": 1.5}
+    assert fases["suelta"]["segundos"] == 1.0
+
+
+def test_fases_de_un_turno_no_se_solapan():
+    salida = io.StringIO()
+    medidor = instrumentacion.activar(salida)
+    try:
+        medidor.iniciar_turno()
+        _jugar(_tablero(12), [Jugador("A", "A"), Jugador("B", "B")], random.Random(2), 20)
+        linea = medidor.terminar_turno()
+    finally:
+        instrumentacion.desactivar()
+    fases = linea["fases"]
+    assert fases["muralla.anadir"]["llamadas"] > 0
+    assert all(fase["segundos"] >= 0.0 for fase in fases.values())
+    # La suma de las fases exclusivas no supera el tiempo de pared del turno
+    assert sum(fase["segundos"] for fase in fases.values()) <= linea["segundos"]
@@ -0,0 +1,45 @@
+import random
+
+from src.Ficha import Ficha
+from src.Jugador import Jugador
+from src.Tablero import Tablero, etiquetas_filas
+
+
+def test_consultas_por_posicion_siguen_a_las_fichas():
+    tablero = Tablero()
+    jugador = Jugador("A", "A")
+    fichas = [Ficha.desde_celda(celda, tablero, "A", True) for celda in (13, 15, 37, 38)]
+    for ficha in fichas:
+        assert jugador.add_piece(ficha)
+    assert not jugador.add_piece(Ficha.desde_celda(13, tablero, "A", True))
+    assert jugador.get_pieces_by_row(fichas[0].x) == fichas[:2]
+    assert jugador.get_pieces_by_column(fichas[1].y) == [fichas[1]]
+    assert jugador.get_pieces_by_position(fichas[2].x, fichas[2].y) == [fichas[2]]
+
+    # Los índices por fila y columna siguen a las altas y bajas
+    assert jugador.remove_piece(fichas[0])
+    assert jugador.get_pieces_by_row(fichas[0].x) == [fichas[1]]
+    assert jugador.get_piece_by_cell(13) is None
+    assert jugador.add_piece(fichas[0])
+    assert jugador.get_pieces_by_row(fichas[0].x) == [fichas[1], fichas[0]]
+    jugador.clear_all_pieces()
+    assert jugador.get_pieces_by_position(fichas[2].x, fichas[2].y) == []
+
+
+def test_indices_intercalando_altas_bajas_y_consultas():
+    tablero = Tablero(etiquetas_filas(16), list(range(1, 17)))
+    jugador = Jugador("A", "A")
+    rng = random.Random(11)
+    for _ in range(400):
+        celda = rng.randrange(16 * 16)
+        ficha = jugador.get_piece_by_cell(celda)
+        if ficha is not None and rng.random() < 0.4:
+            assert jugador.remove_piece(ficha)
+        elif ficha is None:
+            assert jugador.add_piece(Ficha.desde_celda(celda, tablero, "A", True))
+        x, y = tablero.coordenadas_de(rng.randrange(16 * 16))
+        assert jugador.get_pieces_by_row(x) == [f for f in jugador.pieces if f.x == x]
+        assert jugador.get_pieces_by_column(y) == [f for f in jugador.pieces if f.y == y]
+        assert jugador.get_pieces_by_position(x, y) == [f for f in jugador.pieces if (f.x, f.y) == (x, y)]
+    jugador.clear_all_pieces()
+    assert jugador.get_pieces_by_row(x) == [] and jugador.get_pieces_by_column(y) == []
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from src.ai.mcts import LoteSimulaciones, MCTSSolver
+from src.ai.state import TwixtState
+
+
+def _cadena_a_una_muralla(n: int) -> tuple:
+    """Posición donde A (vertical) gana con una muralla más; devuelve (state, jugada ganadora)."""
+    state = TwixtState(n, n)
+    celdas = [fila * n + (3 if paso % 2 == 0 else 5) for paso, fila in enumerate(range(0, n - 1, 2))]
+    for celda in celdas:
+        state.place(0, celda)
+    for a, b in zip(celdas[:-2], celdas[1:-1]):
+        state.place(0, state.wall_move(state.bits.id_muralla(a, b)))
+    return state, state.wall_move(state.bits.id_muralla(celdas[-2], celdas[-1]))
+
+
+@pytest.mark.parametrize("n", [8, 12, 20])
+def test_lote_de_simulaciones(n):
+    rng = random.Random(n)
+    lote = LoteSimulaciones(n, n)
+    state = TwixtState(n, n)
+    for _ in range(12):
+        jugadas = state.focused_moves()
+        if not jugadas or state.winner is not None:
+            break
+        state.make(rng.choice(jugadas))
+        antes = (state.hash, tuple(state.bits.fichas), state.bits.ocupadas, frozenset(state.bits.puentes))
+        victorias = lote.simular(state, 16, random.Random(5))
+        assert sum(victorias) == 16
+        # El estado no se toca y el mismo generador repite el lote
+        assert (state.hash, tuple(state.bits.fichas), state.bits.ocupadas, frozenset(state.bits.puentes)) == antes
+        assert lote.simular(state, 16, random.Random(5)) == victorias
+
+
+def test_posicion_ganada_cuenta_como_victoria():
+    state, ganadora = _cadena_a_una_muralla(8)
+    state.make(ganadora)
+    assert state.winner == 0
+    assert LoteSimulaciones(8, 8).simular(state, 16, random.Random(1)) == [16, 0, 0]
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_mcts_elige_la_muralla_ganadora(semilla):
+    state, ganadora = _cadena_a_una_muralla(8)
+    resultado = MCTSSolver(max_time_s=0.2, seed=semilla).solve(state)
+    assert resultado.move == ganadora
+    assert resultado.score > 0.9
+    assert resultado.nodes > 0
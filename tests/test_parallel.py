@@ -0,0 +1,29 @@
+import math
+import random
+
+from src.ai.parallel import ParallelSolver
+from src.ai.solver import Solver
+from src.ai.state import TwixtState
+
+
+def test_reparto_de_la_raiz_igual_a_un_solo_proceso():
+    rng = random.Random(9)
+    state = TwixtState(10, 10)
+    with ParallelSolver(n_workers=2, max_time_s=math.inf, max_depth=3, tt_mb=1.0) as paralelo:
+        for paso in range(6):
+            for _ in range(3):
+                jugadas = state.focused_moves()
+                if not jugadas or state.winner is not None:
+                    break
+                state.make(rng.choice(jugadas))
+            if paso == 3:
+                # Retroceder obliga a reiniciar el estado de los trabajadores
+                state.unmake()
+                state.unmake()
+            if state.winner is not None:
+                break
+            esperado = Solver(max_time_s=math.inf, max_depth=3, tt_mb=1.0).solve(state)
+            resultado = paralelo.solve(state)
+            assert resultado.depth == esperado.depth
+            assert resultado.score == esperado.score
+            assert resultado.move in state.focused_moves()
@@ -0,0 +1,55 @@
+from src.ai.heuristics import mejor_muralla
+from src.ai.ponder import SolverConPonder
+from src.ai.solver import Solver
+from src.ai.state import TwixtState
+
+
+def _posicion(n_jugadas: int) -> TwixtState:
+    state = TwixtState(10, 10)
+    for _ in range(n_jugadas):
+        state.make(state.focused_moves()[0])
+    return state
+
+
+def _turno_rival(state: TwixtState, ficha: int) -> TwixtState:
+    """`state` tras un turno del rival con `ficha` y su mejor muralla."""
+    rival = state.turn
+    state.place(rival, ficha)
+    muralla = mejor_muralla(state, ficha)
+    if muralla is not None:
+        state.place(rival, state.wall_move(muralla))
+    state.set_turn(rival ^ 1)
+    return state
+
+
+def test_prediccion_de_ficha_y_muralla_se_reutiliza():
+    ia = SolverConPonder(Solver(max_time_s=0.05, max_depth=2), tiempo_prediccion=0.05)
+    assert ia.ponder(_posicion(5))
+    ficha = ia._ficha_esperada
+    resultado = ia.solve(_turno_rival(_posicion(5), ficha))
+    assert resultado.move is not None
+    assert (ia.aciertos, ia.aciertos_ficha, ia.fallos) == (1, 0, 0)
+    assert ia.tasa_aciertos == 1.0
+
+
+def test_ficha_esperada_con_otra_muralla_y_fallo():
+    ia = SolverConPonder(Solver(max_time_s=0.05, max_depth=2), tiempo_prediccion=0.05)
+    # Una posición en la que el turno esperado incluye muralla
+    for n_jugadas in range(3, 12):
+        assert ia.ponder(_posicion(n_jugadas))
+        state = _posicion(n_jugadas)
+        rival = state.turn
+        state.place(rival, ia._ficha_esperada)
+        state.set_turn(rival ^ 1)
+        if state.hash != ia._esperada:
+            break
+    ia.solve(state)
+    assert (ia.aciertos, ia.aciertos_ficha, ia.fallos) == (0, 1, 0)
+
+    ia.ponder(_posicion(5))
+    state = _posicion(5)
+    otra = next(c for c in state.legal_pegs() if c != ia._ficha_esperada)
+    ia.solve(_turno_rival(state, otra))
+    assert ia.fallos == 1
+    assert ia.tasa_aciertos == 0.0
+    assert not ia.pensando
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from src.ai.state import TwixtState
+from src.RegistroPartida import NOMBRES_JUGADOR, RegistroPartida, reproducir
+from src.TablaCruces import tabla_extremos
+
+
+def _partida(n: int, semilla: int) -> tuple:
+    """Partida al azar con `TwixtState`; devuelve (estado final, registro)."""
+    rng = random.Random(semilla)
+    state = TwixtState(n, n)
+    registro = RegistroPartida(n, n)
+    while state.winner is None:
+        jugadas = state.legal_moves() if rng.random() < 0.2 else state.focused_moves()
+        if not jugadas:
+            break
+        jugada = rng.choice(jugadas)
+        registro.acciones.append(2 * jugada + state.turn)
+        state.make(jugada)
+    return state, registro
+
+
+@pytest.mark.parametrize("n", [8, 12, 13, 24])
+def test_reproducir_igual_a_twixt_state(n):
+    for semilla in range(6):
+        state, registro = _partida(n, semilla)
+        resultado = reproducir(registro)
+        ganador = None if state.winner is None else NOMBRES_JUGADOR[state.winner]
+        assert (resultado.ganador, resultado.acciones, resultado.invalida) == (ganador, len(registro), None)
+        assert reproducir(registro.a_bytes()).ganador == ganador
+
+
+def test_reproducir_se_detiene_en_la_primera_accion_invalida():
+    _, registro = _partida(12, 1)
+    aplicadas = len(registro) // 2
+    acciones = registro.acciones[:aplicadas]
+    state = TwixtState(12, 12)
+    for accion in acciones:
+        state.make(accion >> 1)
+    celda_ocupada = next(a >> 1 for a in acciones if (a >> 1) < state.n_cells)
+    muralla_sin_fichas = next(
+        id_m for id_m in range(len(tabla_extremos(12, 12))) if not (state.bits.ocupadas >> state.wall_ends(id_m)[0]) & 1
+    )
+    invalidas = [
+        2 * celda_ocupada,  # Celda ya ocupada
+        2 * 1 + 1,  # B en el borde de A
+        2 * state.wall_move(muralla_sin_fichas),  # Muralla sin fichas propias
+    ]
+    for invalida in invalidas:
+        registro_invalido = RegistroPartida(12, 12, acciones + [invalida] + registro.acciones[aplicadas:])
+        resultado = reproducir(registro_invalido)
+        assert (resultado.ganador, resultado.acciones, resultado.invalida) == (None, aplicadas, aplicadas)
+
+
+def test_formatos_binario_y_texto_ida_y_vuelta(tmp_path):
+    for n in (8, 20):
+        _, registro = _partida(n, n)
+        for copia in (
+            RegistroPartida.desde_bytes(registro.a_bytes()),
+            RegistroPartida.desde_texto(registro.a_texto()),
+        ):
+            assert (copia.n_filas, copia.n_columnas, copia.acciones) == (n, n, registro.acciones)
+        for nombre in ("partida.twx", "partida.txt"):
+            registro.guardar(tmp_path / nombre)
+            assert RegistroPartida.cargar(tmp_path / nombre).acciones == registro.acciones
+    with pytest.raises(ValueError):
+        RegistroPartida.desde_bytes(b"TWX0\x08\x08")
+    with pytest.raises(ValueError):
+        RegistroPartida.desde_texto("TWIXT 8x8\nC A1\n")
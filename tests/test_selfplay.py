@@ -0,0 +1,29 @@
+from src.ai.selfplay import crear_politica, simular
+from src.ai.state import TwixtState
+
+
+def _partidas(n_workers: int, politica_a: str, politica_b: str) -> dict:
+    resultados = {}
+
+    def anotar(resultado):
+        resultados[resultado["partida"]] = (resultado["ganador"], resultado["jugadas"])
+
+    simular(6, politica_a, politica_b, n_workers=n_workers, n_filas=8, n_columnas=8, semilla=11, al_terminar=anotar)
+    return resultados
+
+
+def test_mismas_partidas_con_cualquier_numero_de_trabajadores():
+    # Políticas que no dependen del reloj: minimax limitado solo por profundidad
+    uno = _partidas(1, "minimax:depth=2,time=inf", "greedy")
+    assert uno == _partidas(2, "minimax:depth=2,time=inf", "greedy")
+    assert sorted(uno) == list(range(6))
+
+
+def test_sembrar_vacia_la_tabla_de_transposicion():
+    politica = crear_politica("minimax:depth=2,time=inf", 0)
+    state = TwixtState(8, 8)
+    state.make(state.focused_moves()[0])
+    politica.elegir(state)
+    assert any(politica.motor.tt._ranuras)
+    politica.sembrar(1)
+    assert not any(politica.motor.tt._ranuras)
@@ -0,0 +1,90 @@
+import asyncio
+
+from src.Servidor import ServidorTwixt
+
+
+class _Cliente:
+    """Cliente de prueba del protocolo por líneas."""
+
+    def __init__(self, lector, escritor):
+        self.lector = lector
+        self.escritor = escritor
+
+    async def enviar(self, linea: str) -> None:
+        self.escritor.write(linea.encode() + b"\n")
+        await self.escritor.drain()
+
+    async def hasta(self, prefijo: str) -> list:
+        """Líneas recibidas hasta la primera que empieza por `prefijo`, incluida."""
+        lineas = []
+        while not lineas or not lineas[-1].startswith(prefijo):
+            linea = await asyncio.wait_for(self.lector.readline(), 20)
+            assert linea, f"conexión cerrada esperando {prefijo!r}: {lineas}"
+            lineas.append(linea.decode().strip())
+        return lineas
+
+
+async def _conectar(puerto: int) -> _Cliente:
+    return _Cliente(*await asyncio.open_connection("127.0.0.1", puerto))
+
+
+async def _partida_entre_humanos(puerto: int) -> None:
+    cliente = await _conectar(puerto)
+    await cliente.enviar("NUEVA 12")
+    assert (await cliente.hasta("TURNO"))[-2:] == ["OK PARTIDA 1", "TURNO A"]
+
+    await cliente.enviar("FICHA C3")
+    assert await cliente.hasta("TURNO") == ["OK", "JUGADA A C3", "TURNO B"]
+    await cliente.enviar("FICHA H8")
+    assert await cliente.hasta("TURNO") == ["OK", "JUGADA B H8", "TURNO A"]
+    # Ficha y muralla desde ella en el mismo comando
+    await cliente.enviar("FICHA E5 C3")
+    assert await cliente.hasta("TURNO") == ["OK", "JUGADA A E5", "JUGADA A E5-C3", "TURNO B"]
+    await cliente.enviar("FICHA J10")
+    await cliente.hasta("TURNO A")
+    await cliente.enviar("PASAR")
+    assert await cliente.hasta("TURNO") == ["OK", "PASA A", "TURNO B"]
+
+    # Una muralla que no es un salto diagonal se rechaza con su motivo
+    await cliente.enviar("MURALLA H8 J8")
+    rechazo = await cliente.hasta("ERR")
+    assert len(rechazo) == 1
+    await cliente.enviar("MURALLA H8 J10")
+    assert await cliente.hasta("TURNO") == ["OK", "JUGADA B H8-J10", "TURNO A"]
+
+    await cliente.enviar("ESTADO")
+    assert (await cliente.hasta("OK ESTADO"))[-1].endswith("fichas=2,2 murallas=1,1")
+    # Deshace lo de B desde la última pieza de A (J10 y su muralla) y esa ronda de A (E5 y su muralla)
+    await cliente.enviar("DESHACER")
+    assert await cliente.hasta("DESHACE") == ["OK", "DESHACE A"]
+    await cliente.enviar("ESTADO")
+    assert (await cliente.hasta("OK ESTADO"))[-1].endswith("turno=A ganador=- empate=0 fichas=1,1 murallas=0,0")
+    await cliente.enviar("SALIR")
+    assert await cliente.hasta("OK ADIOS") == ["OK ADIOS"]
+
+
+async def _partida_contra_la_ia(servidor: ServidorTwixt, puerto: int) -> None:
+    cliente = await _conectar(puerto)
+    await cliente.enviar("NUEVA B 12")
+    await cliente.hasta("TURNO A")
+    await cliente.enviar("FICHA F6")
+    # El turno de la IA se calcula en el ejecutor y se difunde como cualquier jugada
+    lineas = await cliente.hasta("TURNO A")
+    assert lineas[:3] == ["OK", "JUGADA A F6", "TURNO B"]
+    assert lineas[3].startswith("JUGADA B ")
+    assert servidor.jugadas_ia == 1
+    await cliente.enviar("INFO")
+    assert (await cliente.hasta("OK INFO"))[-1].endswith("jugadas_ia=1")
+
+
+def test_protocolo_sobre_localhost():
+    async def principal():
+        servidor = ServidorTwixt(politica="minimax:depth=1,time=0.2", workers=1, hilos=True)
+        puerto = await servidor.iniciar(puerto=0)
+        try:
+            await _partida_entre_humanos(puerto)
+            await _partida_contra_la_ia(servidor, puerto)
+        finally:
+            await servidor.cerrar()
+
+    asyncio.run(principal())
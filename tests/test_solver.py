@@ -0,0 +1,89 @@
+import math
+import random
+
+import pytest
+
+from src.ai.heuristics import VICTORIA, evaluate
+from src.ai.solver import BYTES_POR_ENTRADA, COTA_INFERIOR, EXACTO, Solver, TablaTransposicion
+from src.ai.state import TwixtState
+
+
+def _negamax(state, profundidad: int, ply: int = 0) -> float:
+    """Minimax sin poda ni tabla, con las mismas jugadas y puntuaciones que `Solver`."""
+    if state.winner is not None:
+        return -VICTORIA + ply if state.winner != state.turn else VICTORIA - ply
+    if profundidad <= 0:
+        return evaluate(state)
+    movimientos = state.focused_moves()
+    if not movimientos:
+        return evaluate(state)
+    mejor = -VICTORIA - 1
+    for jugada in movimientos:
+        state.make(jugada)
+        mejor = max(mejor, -_negamax(state, profundidad - 1, ply + 1))
+        state.unmake()
+    return mejor
+
+
+def _posicion(n: int, jugadas: int, semilla: int) -> TwixtState:
+    rng = random.Random(semilla)
+    state = TwixtState(n, n)
+    for _ in range(jugadas):
+        movimientos = state.focused_moves()
+        if not movimientos or state.winner is not None:
+            break
+        state.make(rng.choice(movimientos))
+    return state
+
+
+@pytest.mark.parametrize("semilla", range(4))
+@pytest.mark.parametrize("tt_mb", [4.0, 0.0001])
+def test_alfa_beta_con_tabla_igual_a_minimax(semilla, tt_mb):
+    state = _posicion(10, 14 + 2 * semilla, semilla)
+    profundidad = 4
+    esperado = _negamax(state, profundidad)
+    resultado = Solver(max_time_s=math.inf, max_depth=profundidad, tt_mb=tt_mb).solve(state)
+    assert resultado.score == esperado
+    # La jugada elegida alcanza ese valor
+    state.make(resultado.move)
+    assert -_negamax(state, profundidad - 1, 1) == esperado
+    state.unmake()
+    assert resultado.pv[0] == resultado.move
+
+
+def test_encuentra_la_victoria_inmediata():
+    state = TwixtState(8, 8)
+    # A (vertical) tiene una cadena de fichas de la fila 0 a la 6 a la que solo le falta la última muralla
+    celdas = [fila * 8 + (3 if paso % 2 == 0 else 5) for paso, fila in enumerate(range(0, 7, 2))]
+    for celda in celdas:
+        state.place(0, celda)
+    for a, b in zip(celdas[:-2], celdas[1:-1]):
+        state.place(0, state.n_cells + state.bits.id_muralla(a, b))
+    ganadora = state.n_cells + state.bits.id_muralla(celdas[-2], celdas[-1])
+    resultado = Solver(max_time_s=math.inf, max_depth=3).solve(state)
+    assert resultado.move == ganadora
+    assert resultado.score == VICTORIA - 1
+    assert resultado.depth == 1
+
+
+def test_tabla_de_tamano_fijo_con_reemplazo_por_profundidad():
+    tabla = TablaTransposicion(0.01)
+    assert tabla.tamano & (tabla.tamano - 1) == 0
+    assert tabla.tamano * BYTES_POR_ENTRADA <= 0.01 * 1024 * 1024
+    clave = 12345
+    otra = clave + tabla.tamano  # Misma ranura
+    tabla.guardar(clave, 4, 1.0, EXACTO, 7)
+    tabla.guardar(otra, 2, 2.0, COTA_INFERIOR, 8)
+    assert tabla.buscar(clave)[1:5] == (4, 1.0, EXACTO, 7)
+    assert tabla.buscar(otra) is None
+    # La misma posición siempre se actualiza
+    tabla.guardar(clave, 3, 5.0, EXACTO, 9)
+    assert tabla.buscar(clave)[1:5] == (3, 5.0, EXACTO, 9)
+    # En otra búsqueda las entradas previas se reemplazan aunque sean más profundas
+    tabla.nueva_busqueda()
+    tabla.guardar(otra, 1, 2.0, COTA_INFERIOR, 8)
+    assert tabla.buscar(otra)[1:5] == (1, 2.0, COTA_INFERIOR, 8)
+    assert tabla.buscar(clave) is None
+    assert (tabla.consultas, tabla.aciertos) == (5, 3)
+    tabla.limpiar()
+    assert tabla.buscar(clave) is None
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from src.ai.state import TwixtState, tablas_zobrist
+from src.TableroBits import JUGADOR_HORIZONTAL, JUGADOR_VERTICAL
+
+
+def _hash_desde_cero(state) -> int:
+    fichas, murallas, turno = tablas_zobrist(state.n_rows, state.n_cols)
+    valor = turno if state.turn == JUGADOR_HORIZONTAL else 0
+    for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+        for celda in range(state.n_cells):
+            if (state.bits.fichas[jugador] >> celda) & 1:
+                valor ^= fichas[jugador][celda]
+        for id_muralla in state.bits.puentes_jugador[jugador]:
+            valor ^= murallas[jugador][id_muralla]
+    return valor
+
+
+def _foto(state) -> tuple:
+    bits = state.bits
+    return (
+        state.hash,
+        state.turn,
+        state.winner,
+        tuple(bits.fichas),
+        tuple(bits.murallas),
+        bits.ocupadas,
+        frozenset(bits.puentes),
+        tuple(tuple(c.padres()) for c in bits.conexiones),
+    )
+
+
+@pytest.mark.parametrize("n", [8, 12, 20])
+def test_hash_incremental_igual_a_recalcular(n):
+    rng = random.Random(n)
+    for _ in range(4):
+        state = TwixtState(n, n)
+        while state.winner is None:
+            jugadas = state.legal_moves() if rng.random() < 0.2 else state.focused_moves()
+            if not jugadas:
+                break
+            state.make(rng.choice(jugadas))
+            assert state.hash == _hash_desde_cero(state)
+
+
+def test_unmake_restaura_el_estado_exacto():
+    rng = random.Random(7)
+    state = TwixtState(12, 12)
+    for _ in range(40):
+        jugadas = state.focused_moves()
+        if not jugadas or state.winner is not None:
+            break
+        state.make(rng.choice(jugadas))
+    # Ramas al azar que se deshacen por completo, como hace la búsqueda
+    for _ in range(30):
+        fotos = []
+        for _ in range(rng.randint(1, 8)):
+            jugadas = state.focused_moves()
+            if not jugadas:
+                break
+            fotos.append(_foto(state))
+            state.make(rng.choice(jugadas))
+        for foto in reversed(fotos):
+            state.unmake()
+            assert _foto(state) == foto
+            assert state.hash == _hash_desde_cero(state)
+
+
+def test_transposiciones_comparten_hash():
+    rng = random.Random(2)
+    jugadas = []
+    state = TwixtState(12, 12)
+    for _ in range(10):
+        jugada = rng.choice(state.legal_pegs())
+        jugadas.append((state.turn, jugada))
+        state.make(jugada)
+    otro = TwixtState(12, 12, turn=state.turn)
+    for jugador, jugada in reversed(jugadas):
+        otro.place(jugador, jugada)
+    assert otro.hash == state.hash
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from src.ai.state import TwixtState
+from src.TablaCruces import TablaPerezosa, cruces_de, extremos_de, tabla_cruces, tabla_extremos
+from src.UnionFind import UnionFind, UnionFindDisperso
+
+
+@pytest.mark.parametrize("n_filas, n_columnas", [(8, 8), (12, 9), (20, 20)])
+def test_tabla_perezosa_igual_a_la_completa(n_filas, n_columnas):
+    completa = tabla_cruces(n_filas, n_columnas)
+    perezosa = TablaPerezosa(lambda i: cruces_de(i, n_filas, n_columnas), len(completa))
+    assert len(perezosa) == len(completa)
+    assert perezosa[len(completa) - 1] == completa[-1]
+    assert list(perezosa) == list(completa)
+    assert [extremos_de(i, n_filas, n_columnas) for i in range(len(completa))] == list(
+        tabla_extremos(n_filas, n_columnas)
+    )
+    with pytest.raises(IndexError):
+        perezosa[len(completa)]
+
+
+def test_union_find_disperso_igual_al_denso():
+    rng = random.Random(5)
+    n = 60
+    denso, disperso = UnionFind(n), UnionFindDisperso(n)
+    for _ in range(500):
+        if denso.historial and rng.random() < 0.3:
+            denso.deshacer()
+            disperso.deshacer()
+        else:
+            a, b = rng.randrange(n), rng.randrange(n)
+            assert denso.unir(a, b) == disperso.unir(a, b)
+        assert denso.padres() == disperso.padres()
+        a, b = rng.randrange(n), rng.randrange(n)
+        assert denso.conectados(a, b) == disperso.conectados(a, b)
+    disperso.limpiar()
+    assert disperso.padres() == list(range(n))
+
+
+def _orientacion(p, q, r) -> int:
+    valor = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+    return (valor > 0) - (valor < 0)
+
+
+def _sobre(p, q, r) -> bool:
+    """True si r está en el segmento p-q."""
+    return _orientacion(p, q, r) == 0 and min(p[0], q[0]) <= r[0] <= max(p[0], q[0]) and min(
+        p[1], q[1]
+    ) <= r[1] <= max(p[1], q[1])
+
+
+def _cortan(a: tuple, b: tuple) -> bool:
+    """Geometría exacta: los segmentos comparten algún punto que no sea una ficha común a ambos."""
+    (p1, p2), (p3, p4) = a, b
+    if (
+        _orientacion(p3, p4, p1) * _orientacion(p3, p4, p2) < 0
+        and _orientacion(p1, p2, p3) * _orientacion(p1, p2, p4) < 0
+    ):
+        return True
+    comunes = {p1, p2} & {p3, p4}
+    tocan = [p for p in (p1, p2) if _sobre(p3, p4, p)] + [p for p in (p3, p4) if _sobre(p1, p2, p)]
+    return any(p not in comunes for p in tocan)
+
+
+@pytest.mark.parametrize("n_filas, n_columnas", [(7, 7), (8, 11)])
+def test_tabla_cruces_igual_a_la_geometria(n_filas, n_columnas):
+    extremos = tabla_extremos(n_filas, n_columnas)
+    cruces = tabla_cruces(n_filas, n_columnas)
+    segmentos = {
+        id_m: tuple(divmod(celda, n_columnas) for celda in extremo[:2])
+        for id_m, extremo in enumerate(extremos)
+        if extremo is not None
+    }
+    for id_m, segmento in segmentos.items():
+        esperadas = {otra for otra, s in segmentos.items() if otra != id_m and _cortan(segmento, s)}
+        assert set(cruces[id_m]) == esperadas
+
+
+def test_jugadas_legales_no_cruzan_murallas_puestas():
+    n = 10
+    extremos = tabla_extremos(n, n)
+
+    def segmento(id_m):
+        return tuple(divmod(celda, n) for celda in extremos[id_m][:2])
+
+    rng = random.Random(4)
+    for _ in range(5):
+        state = TwixtState(n, n)
+        while state.winner is None:
+            puestas = [segmento(id_m) for id_m in state.bits.puentes]
+            for id_m in state.legal_walls():
+                assert not any(_cortan(segmento(id_m), s) for s in puestas)
+            jugadas = state.focused_moves()
+            if not jugadas:
+                break
+            state.make(rng.choice(jugadas))
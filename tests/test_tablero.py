@@ -0,0 +1,211 @@
+import random
+
+from src.Ficha import Ficha
+from src.Jugador import Jugador
+from src.Muralla import Muralla
+from src.Partida import MENSAJES_VALIDACION
+from src.TablaCruces import murallas_por_celda
+from src.Tablero import MotivoValidacion, Tablero, etiquetas_filas
+
+
+def _tablero(n: int) -> Tablero:
+    return Tablero(etiquetas_filas(n), list(range(1, n + 1)))
+
+
+def _foto(tablero: Tablero, jugadores: list) -> tuple:
+    """Todo lo que `deshacer` debe restaurar, en forma comparable."""
+    bits = tablero.bits
+    return (
+        dict(tablero.glifos),
+        dict(tablero.winner),
+        tuple(bits.fichas),
+        bits.ocupadas,
+        frozenset(bits.puentes),
+        tuple(frozenset(p) for p in bits.puentes_jugador),
+        tuple(tuple(c.padres()) for c in bits.conexiones),
+        tuple(frozenset(f) for f in tablero.movimientos.fichas),
+        tuple(frozenset(m) for m in tablero.movimientos.murallas),
+        tuple(tuple(j.pieces) for j in jugadores),
+        tuple(tuple(j.walls) for j in jugadores),
+        tuple(tuple(j.get_piece_by_cell(c) for c in range(len(tablero.filas) * len(tablero.columnas))) for j in jugadores),
+    )
+
+
+def _jugar(tablero: Tablero, jugadores: list, rng: random.Random, n_turnos: int) -> list:
+    """Juega turnos al azar (ficha y, si se puede, muralla) y devuelve la foto tras cada pieza."""
+    fotos = [_foto(tablero, jugadores)]
+    for turno in range(n_turnos):
+        if tablero.winner["is_winner"]:
+            break
+        jugador = jugadores[turno % 2]
+        vertical = jugador.is_vertical_player
+        candidatas = sorted(tablero.fichas_posibles(vertical)) or [
+            c for c in range(len(tablero.filas) * len(tablero.columnas)) if tablero.validar_celda(c, False, vertical)
+        ]
+        for celda in rng.sample(candidatas, min(len(candidatas), 8)):
+            if Ficha.desde_celda(celda, tablero, jugador.symbol, vertical).anadir_ficha(jugador):
+                fotos.append(_foto(tablero, jugadores))
+                break
+        murallas = sorted(tablero.murallas_posibles(vertical))
+        if murallas:
+            a, b = rng.choice(murallas)
+            muralla = Muralla(tablero, jugador.get_piece_by_cell(a), jugador.get_piece_by_cell(b), vertical)
+            if muralla.anadir_muralla(jugador):
+                fotos.append(_foto(tablero, jugadores))
+    return fotos
+
+
+def test_deshacer_y_rehacer_restauran_cada_estado():
+    for semilla in range(5):
+        tablero = _tablero(12)
+        jugadores = [Jugador("A", "A"), Jugador("B", "B")]
+        fotos = _jugar(tablero, jugadores, random.Random(semilla), 60)
+        assert len(tablero.acciones) == len(fotos) - 1
+
+        for esperada in reversed(fotos[:-1]):
+            assert tablero.deshacer() is not None
+            assert _foto(tablero, jugadores) == esperada
+        assert tablero.deshacer() is None
+
+        for esperada in fotos[1:]:
+            assert tablero.rehacer() is not None
+            assert _foto(tablero, jugadores) == esperada
+        assert tablero.rehacer() is None
+
+
+def test_deshacer_revierte_al_ganador():
+    # Con suficientes turnos alguna partida termina; deshacer su última pieza la reabre
+    for semilla in range(40):
+        tablero = _tablero(8)
+        jugadores = [Jugador("A", "A"), Jugador("B", "B")]
+        fotos = _jugar(tablero, jugadores, random.Random(semilla), 200)
+        if tablero.winner["is_winner"]:
+            break
+    assert tablero.winner["is_winner"]
+    tablero.deshacer()
+    assert not tablero.winner["is_winner"]
+    assert _foto(tablero, jugadores) == fotos[-2]
+    tablero.rehacer()
+    assert tablero.winner["is_winner"]
+    assert _foto(tablero, jugadores) == fotos[-1]
+
+
+def test_pieza_nueva_descarta_lo_deshecho():
+    tablero = _tablero(12)
+    jugadores = [Jugador("A", "A"), Jugador("B", "B")]
+    _jugar(tablero, jugadores, random.Random(1), 6)
+    tablero.deshacer()
+    assert tablero.deshechas
+    jugador = jugadores[0]
+    celda = sorted(tablero.fichas_posibles(True))[0]
+    assert Ficha.desde_celda(celda, tablero, jugador.symbol, True).anadir_ficha(jugador)
+    assert not tablero.deshechas
+    assert tablero.rehacer() is None
+
+
+def _movimientos_desde_cero(tablero: Tablero) -> tuple:
+    """Candidatas de cada jugador recorriendo todas sus fichas, sin el registro incremental."""
+    bits = tablero.bits
+    saltos = murallas_por_celda(bits.n_filas, bits.n_columnas)
+    fichas, murallas = [set(), set()], [set(), set()]
+    for jugador in (0, 1):
+        propias = bits.fichas[jugador]
+        for celda in range(bits.n_celdas):
+            if not (propias >> celda) & 1:
+                continue
+            for id_muralla, otra, centro in saltos[celda]:
+                if (propias >> otra) & 1:
+                    if not (bits.ocupadas >> centro) & 1 and not bits.cruza_muralla(id_muralla):
+                        murallas[jugador].add(id_muralla)
+                elif bits.puede_colocar_ficha(jugador, otra):
+                    fichas[jugador].add(otra)
+    return fichas, murallas
+
+
+def test_movimientos_legales_igual_a_recalcular():
+    for semilla in range(4):
+        tablero = _tablero(12)
+        jugadores = [Jugador("A", "A"), Jugador("B", "B")]
+        _jugar(tablero, jugadores, random.Random(semilla), 60)
+        movimientos = tablero.movimientos
+        assert (movimientos.fichas, movimientos.murallas) == _movimientos_desde_cero(tablero)
+        # Cada estado intermedio, al deshacer y al rehacer
+        while tablero.deshacer() is not None:
+            assert (movimientos.fichas, movimientos.murallas) == _movimientos_desde_cero(tablero)
+        assert movimientos.fichas == [set(), set()] and not movimientos.cambios
+        while tablero.rehacer() is not None:
+            assert (movimientos.fichas, movimientos.murallas) == _movimientos_desde_cero(tablero)
+
+
+def _valida_como_matriz(tablero: Tablero, jugador: Jugador, fila: int, col: int) -> bool:
+    """Reglas de `validar_posicion` recorriendo casillas, sin bitboards."""
+    n_filas, n_columnas = len(tablero.filas), len(tablero.columnas)
+    if fila * n_columnas + col in tablero.glifos:
+        return False
+    propias = {(f.idx_y, f.idx_x) for f in jugador.pieces}
+    if jugador.is_vertical_player:
+        if fila > 0 and col in (0, n_columnas - 1):
+            return False
+        if fila == n_filas - 1:
+            return (n_filas - 3, col - 2) in propias or (n_filas - 3, col + 2) in propias
+    else:
+        if col > 0 and fila in (0, n_filas - 1):
+            return False
+        if col == n_columnas - 1:
+            return (fila - 2, n_columnas - 3) in propias or (fila + 2, n_columnas - 3) in propias
+    return True
+
+
+def test_validacion_por_bitboards_igual_a_recorrer_la_matriz():
+    for semilla in range(6):
+        for n in (8, 12, 13):
+            tablero = _tablero(n)
+            jugadores = [Jugador("A", "A"), Jugador("B", "B")]
+            _jugar(tablero, jugadores, random.Random(semilla), 4 * semilla + 10)
+            for jugador in jugadores:
+                for fila_idx, fila in enumerate(tablero.filas):
+                    for col_idx, columna in enumerate(tablero.columnas):
+                        esperado = _valida_como_matriz(tablero, jugador, fila_idx, col_idx)
+                        assert tablero.validar_posicion(fila, columna, False, jugador.is_vertical_player) == esperado
+                        celda = tablero.celda_de(fila, columna)
+                        assert tablero.validar_celda(celda, False, jugador.is_vertical_player) == esperado
+
+
+def test_motivos_de_rechazo_sin_escribir_en_consola(capsys):
+    tablero = _tablero(12)
+    a, b = Jugador("A", "A"), Jugador("B", "B")
+
+    def ficha(jugador, x, y):
+        return Ficha(x, y, tablero, jugador.symbol, jugador.is_vertical_player)
+
+    assert tablero.motivo_posicion("Z", 5) is MotivoValidacion.FILA_INEXISTENTE
+    assert tablero.motivo_posicion("C", 13) is MotivoValidacion.COLUMNA_INEXISTENTE
+    assert tablero.motivo_posicion("D", 1, False, True) is MotivoValidacion.LIMITE_RIVAL
+    assert tablero.motivo_posicion("A", 5, False, False) is MotivoValidacion.LIMITE_RIVAL
+    assert tablero.motivo_posicion("L", 5, False, True) is MotivoValidacion.SIN_APOYO_EXTREMO
+    assert ficha(a, "J", 3).anadir_ficha(a)
+    assert tablero.motivo_posicion("L", 5, False, True) is MotivoValidacion.VALIDA
+
+    assert ficha(a, "C", 5).anadir_ficha(a)
+    assert not ficha(b, "C", 5).anadir_ficha(b)
+    assert tablero.ultimo_rechazo == (MotivoValidacion.CASILLA_OCUPADA, "C5", False)
+
+    for x, y in (("D", 3), ("F", 5)):
+        assert ficha(a, x, y).anadir_ficha(a)
+    for x, y in (("D", 6), ("F", 4)):
+        assert ficha(b, x, y).anadir_ficha(b)
+    c5, d3, f5, d6, f4 = (tablero.celda_de(x, y) for x, y in (("C", 5), ("D", 3), ("F", 5), ("D", 6), ("F", 4)))
+    assert tablero.motivo_muralla(c5, d3, True) is MotivoValidacion.NO_ES_SALTO_DIAGONAL
+    assert tablero.motivo_muralla(d6, f4, True) is MotivoValidacion.FICHAS_AJENAS
+    assert tablero.motivo_muralla(d3, f5, True) is MotivoValidacion.VALIDA
+    assert Muralla(tablero, a.get_piece_by_cell(d3), a.get_piece_by_cell(f5), True).anadir_muralla(a)
+    # D3-F5 y D6-F4 se cortan aunque sus celdas centrales (E4 y E5) sean distintas
+    assert tablero.motivo_muralla(d6, f4, False) is MotivoValidacion.CRUZA_MURALLA
+    assert not Muralla(tablero, b.get_piece_by_cell(d6), b.get_piece_by_cell(f4), False).anadir_muralla(b)
+    assert tablero.ultimo_rechazo == (MotivoValidacion.CRUZA_MURALLA, "D6-F4", True)
+    assert capsys.readouterr().out == ""
+
+
+def test_cada_motivo_tiene_mensaje():
+    con_mensaje = set(MENSAJES_VALIDACION) | {MotivoValidacion.VALIDA, MotivoValidacion.SIN_APOYO_EXTREMO}
+    assert con_mensaje == set(MotivoValidacion)
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from src.ai.state import TwixtState
+from src.TablaCruces import tabla_extremos
+from src.TableroBits import JUGADOR_HORIZONTAL, JUGADOR_VERTICAL, TableroBits
+
+
+def _cadena(n: int, jugador: int, primera: int, ultima: int) -> list:
+    """Celdas de una cadena de saltos diagonales entre las líneas `primera` y `ultima` de su eje."""
+    celdas = []
+    for paso, linea in enumerate(range(primera, ultima + 1, 2)):
+        otra = 3 if paso % 2 == 0 else 5
+        fila, columna = (linea, otra) if jugador == JUGADOR_VERTICAL else (otra, linea)
+        celdas.append(fila * n + columna)
+    return celdas
+
+
+def _unir(bits: TableroBits, jugador: int, celdas: list) -> list:
+    """Coloca las fichas y las murallas de la cadena; devuelve conecta_bordes tras cada muralla."""
+    for celda in celdas:
+        bits.colocar_ficha(jugador, celda)
+    conectado = []
+    for a, b in zip(celdas, celdas[1:]):
+        bits.colocar_muralla(jugador, (a + b) // 2, a, b)
+        conectado.append(bits.conecta_bordes(jugador))
+    return conectado
+
+
+# Las murallas saltan de dos en dos: cada meta es el borde más la línea junto a él,
+# y según la paridad se gana del borde 0 a la línea N-2 o de la línea 1 al borde N-1
+@pytest.mark.parametrize("n", [12, 13, 70])
+@pytest.mark.parametrize("jugador", [JUGADOR_VERTICAL, JUGADOR_HORIZONTAL])
+@pytest.mark.parametrize("primera", [0, 1])
+def test_gana_con_cualquier_paridad_de_bordes(n, jugador, primera):
+    bits = TableroBits(n, n)
+    ultima = n - 1 if (n - 1 - primera) % 2 == 0 else n - 2
+    celdas = _cadena(n, jugador, primera, ultima)
+    assert _unir(bits, jugador, celdas) == [False] * (len(celdas) - 2) + [True]
+    assert bits.ganador() == jugador
+    assert not bits.conecta_bordes(jugador ^ 1)
+
+    a, b = celdas[-2:]
+    bits.quitar_muralla(jugador, (a + b) // 2, a, b)
+    assert not bits.conecta_bordes(jugador)
+    assert bits.ganador() is None
+
+
+@pytest.mark.parametrize("n", [12, 70])
+def test_no_gana_sin_llegar_a_los_bordes_meta(n):
+    # Las líneas 2 y N-3 ya no forman parte de las metas
+    bits = TableroBits(n, n)
+    ultima = n - 3 if (n - 5) % 2 == 0 else n - 4
+    celdas = _cadena(n, JUGADOR_VERTICAL, 2, ultima)
+    assert not any(_unir(bits, JUGADOR_VERTICAL, celdas))
+    assert bits.ganador() is None
+
+
+def _conecta_por_bfs(bits: TableroBits, jugador: int) -> bool:
+    """Recorre las murallas del jugador desde sus fichas del borde inicial."""
+    extremos = tabla_extremos(bits.n_filas, bits.n_columnas)
+    vecinas = {}
+    for id_muralla in bits.puentes_jugador[jugador]:
+        a, b = extremos[id_muralla][:2]
+        vecinas.setdefault(a, []).append(b)
+        vecinas.setdefault(b, []).append(a)
+    fichas = bits.fichas[jugador]
+    pendientes = [c for c in range(bits.n_celdas) if (fichas & bits.borde_inicio[jugador]) >> c & 1]
+    vistas = set(pendientes)
+    while pendientes:
+        celda = pendientes.pop()
+        if (bits.borde_fin[jugador] >> celda) & 1:
+            return True
+        for otra in vecinas.get(celda, ()):
+            if otra not in vistas:
+                vistas.add(otra)
+                pendientes.append(otra)
+    return False
+
+
+@pytest.mark.parametrize("n", [8, 12, 20])
+def test_conecta_bordes_igual_a_bfs_al_jugar_y_deshacer(n):
+    rng = random.Random(n)
+    for _ in range(3):
+        state = TwixtState(n, n)
+        hechas = 0
+        while state.winner is None and hechas < 6 * n:
+            jugadas = state.focused_moves()
+            if not jugadas:
+                break
+            state.make(rng.choice(jugadas))
+            hechas += 1
+            for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+                assert state.bits.conecta_bordes(jugador) == _conecta_por_bfs(state.bits, jugador)
+        # Deshacer en orden inverso devuelve la conectividad de cada paso
+        for _ in range(hechas):
+            state.unmake()
+            for jugador in (JUGADOR_VERTICAL, JUGADOR_HORIZONTAL):
+                assert state.bits.conecta_bordes(jugador) == _conecta_por_bfs(state.bits, jugador)
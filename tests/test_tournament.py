@@ -0,0 +1,48 @@
+import math
+
+import pytest
+
+from src.ai.tournament import Z_95, Marcador, limites_sprt, puntuacion_esperada
+
+
+def _marcador(victorias: int, empates: int, derrotas: int) -> Marcador:
+    marcador = Marcador()
+    for puntos, veces in ((1.0, victorias), (0.5, empates), (0.0, derrotas)):
+        for _ in range(veces):
+            marcador.anotar(puntos)
+    return marcador
+
+
+def test_elo_e_intervalo_con_conteos_conocidos():
+    # +60 =20 -20: puntuación 0.7, varianza por partida 0.16 y error estándar 0.04
+    marcador = _marcador(60, 20, 20)
+    assert marcador.puntuacion == pytest.approx(0.7)
+    assert marcador.elo() == pytest.approx(400 * math.log10(7 / 3))
+    bajo, alto = marcador.intervalo()
+    assert bajo == pytest.approx(-400 * math.log10(1 / (0.7 - Z_95 * 0.04) - 1))
+    assert alto == pytest.approx(-400 * math.log10(1 / (0.7 + Z_95 * 0.04) - 1))
+    assert bajo < marcador.elo() < alto
+
+
+def test_llr_con_conteos_conocidos():
+    # La varianza se estima con una victoria y una derrota ficticias: +61 =20 -21
+    marcador = _marcador(60, 20, 20)
+    s = 71 / 102
+    varianza = (61 * (1 - s) ** 2 + 20 * (0.5 - s) ** 2 + 21 * s**2) / 102 / 100
+    s1 = puntuacion_esperada(10)
+    assert marcador.llr(0, 10) == pytest.approx((s1 - 0.5) * (2 * 0.7 - 0.5 - s1) / (2 * varianza))
+    assert marcador.llr(0, 10) == pytest.approx(1.7066874793)
+    # Resultados espejados dan el LLR opuesto entre hipótesis simétricas
+    assert _marcador(20, 20, 60).llr(-10, 10) == pytest.approx(-marcador.llr(-10, 10))
+
+
+def test_casos_limite():
+    vacio = Marcador()
+    assert (vacio.puntuacion, vacio.llr(0, 10)) == (0.5, 0.0)
+    assert vacio.intervalo() == (-math.inf, math.inf)
+    # Sin la previa una racha de victorias tendría varianza 0
+    racha = _marcador(10, 0, 0)
+    assert 0 < racha.llr(0, 10) < math.inf
+    assert racha.elo() == math.inf
+    inferior, superior = limites_sprt(0.05, 0.05)
+    assert inferior == pytest.approx(-math.log(19)) and superior == pytest.approx(math.log(19))